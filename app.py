@@ -1,80 +1,86 @@
+import copy
 import os
-import time
-from datetime import datetime, timedelta, timezone
+from datetime import datetime
 from typing import Tuple
 
 import numpy as np
 import pandas as pd
-import requests
 import streamlit as st
 import altair as alt
 import streamlit_authenticator as stauth
 
+from src.credentials import load_credentials
+from src.market_poller import MarketPoller
+from src.online_ridge import OnlineRidge, load_or_create
+
+MODEL_STATE_PATH = os.path.join("models", "fgi_ridge.npz")
+
 
 # -----------------------------
 # Authentication Configuration
 # -----------------------------
-def init_authenticator() -> Tuple[stauth.Authenticate, dict]:
-	"""Initialize Streamlit Authenticator with a demo user.
+@st.cache_resource
+def load_app_credentials() -> dict:
+	"""Hashed credentials, loaded once per process.
 
-	Password can be provided via DEMO_PASSWORD environment variable; defaults to 'demo'.
+	Users come from the credentials file written by generate_hashes.py if there is one;
+	otherwise a demo user whose password can be set via DEMO_PASSWORD (defaults to 'demo').
 	"""
-	password = os.getenv("DEMO_PASSWORD", "demo")
-	hashed_password = stauth.Hasher([password]).generate()[0]
-	credentials = {
+	defaults = {
 		"usernames": {
 			"demo_user": {
 				"name": "Demo User",
-				"password": hashed_password,
+				"email": "demo@example.com",
+				"password": os.getenv("DEMO_PASSWORD", "demo"),
 			}
 		}
 	}
-	cookie = {"name": "marketmind_auth", "key": "abcdef", "expiry_days": 7}
-	authenticator = stauth.Authenticate(credentials, cookie["name"], cookie["key"], cookie["expiry_days"])
-	return authenticator, credentials
+	return load_credentials(defaults)
+
+
+def init_authenticator() -> Tuple[stauth.Authenticate, dict]:
+	"""Streamlit Authenticator for this session, created on its first run.
+
+	Passwords are already hashed, so neither this nor later reruns spend time in bcrypt.
+	"""
+	if "authenticator" not in st.session_state:
+		# The authenticator writes login flags and failed attempts into its dict, so each session gets a copy
+		credentials = copy.deepcopy(load_app_credentials())
+		cookie = {"name": "marketmind_auth", "key": "abcdef", "expiry_days": 7}
+		st.session_state["credentials"] = credentials
+		st.session_state["authenticator"] = stauth.Authenticate(
+			credentials, cookie["name"], cookie["key"], cookie["expiry_days"], auto_hash=False
+		)
+	return st.session_state["authenticator"], st.session_state["credentials"]
 
 
 # -----------------------------
-# Data Fetching Utilities
+# Market Data
 # -----------------------------
-@st.cache_data(ttl=300)
-def fetch_coingecko_btc_market_chart(days: int = 90) -> pd.DataFrame:
-	"""Fetch BTC market chart (prices) from CoinGecko for the last `days` days."""
-	url = (
-		"https://api.coingecko.com/api/v3/coins/bitcoin/market_chart?vs_currency=usd&days="
-		+ str(days)
-	)
-	resp = requests.get(url, timeout=20)
-	resp.raise_for_status()
-	data = resp.json()
-	prices = data.get("prices", [])
-	if not prices:
-		return pd.DataFrame(columns=["timestamp", "price"])
-	df = pd.DataFrame(prices, columns=["timestamp_ms", "price"])  # [ms, price]
-	df["timestamp"] = pd.to_datetime(df["timestamp_ms"], unit="ms", utc=True).dt.tz_convert(None)
-	df = df.drop(columns=["timestamp_ms"]).sort_values("timestamp").reset_index(drop=True)
-	return df
-
-
-@st.cache_data(ttl=300)
-def fetch_fear_greed_history(limit_days: int = 365) -> pd.DataFrame:
-	"""Fetch Crypto Fear & Greed Index history from alternative.me API."""
-	url = f"https://api.alternative.me/fng/?limit=0&format=json"
-	resp = requests.get(url, timeout=20)
-	resp.raise_for_status()
-	data = resp.json()
-	values = data.get("data", [])
-	if not values:
-		return pd.DataFrame(columns=["date", "value"])
-	df = pd.DataFrame(values)
-	# API provides timestamp (unix), value (string), time_until_update, classification
-	df["date"] = pd.to_datetime(df["timestamp"].astype(int), unit="s", utc=True).dt.tz_convert(None)
-	df["value"] = pd.to_numeric(df["value"], errors="coerce")
-	df = df[["date", "value"]].sort_values("date").reset_index(drop=True)
-	# Limit to last N days
-	cutoff = datetime.now() - timedelta(days=limit_days)
-	df = df[df["date"] >= cutoff].reset_index(drop=True)
-	return df
+@st.cache_resource
+def get_market_poller() -> MarketPoller:
+	"""One background poller per server process, shared by every session."""
+	return MarketPoller().start()
+
+
+def read_market_data(price_days: int, fgi_days: int) -> Tuple[pd.DataFrame, pd.DataFrame]:
+	"""Latest BTC prices and FGI from the shared poller (no network I/O) for this session."""
+	poller = get_market_poller()
+	poller.wait_until_ready(timeout=30)
+	snapshot = poller.snapshot(price_days=price_days, fgi_days=fgi_days)
+	st.session_state["market_version"] = snapshot["version"]
+	st.session_state["market_errors"] = snapshot["errors"]
+	return snapshot["price_df"], snapshot["fgi_df"]
+
+
+def rerun_on_new_market_data(check_every: int) -> None:
+	"""Rerun the page when the poller has landed data this session has not rendered yet."""
+	@st.fragment(run_every=check_every)
+	def watch():
+		if get_market_poller().version != st.session_state.get("market_version"):
+			st.rerun()
+
+	watch()
 
 
 def build_overlay_dataframe(price_df: pd.DataFrame, fgi_df: pd.DataFrame) -> pd.DataFrame:
@@ -110,17 +116,17 @@ def prepare_features(df: pd.DataFrame, lookback_days: int = 7) -> Tuple[pd.DataF
 	return X, y
 
 
-def fit_linear_regression(X: pd.DataFrame, y: pd.Series):
-	from sklearn.linear_model import Ridge
-	from sklearn.preprocessing import StandardScaler
-	from sklearn.pipeline import Pipeline
+def update_online_regression(X: pd.DataFrame, y: pd.Series, dates: pd.Series, path: str = MODEL_STATE_PATH) -> Tuple[OnlineRidge, int]:
+	"""Load the persisted Ridge state, absorb rows newer than its last date and save it back.
 
-	model = Pipeline([
-		("scaler", StandardScaler()),
-		("ridge", Ridge(alpha=1.0, random_state=42)),
-	])
-	model.fit(X, y)
-	return model
+	Equivalent to StandardScaler + Ridge(alpha=1.0) refitted on every row absorbed so far,
+	but each visit only costs the new days. Returns the model and the number of new rows.
+	"""
+	model = load_or_create(path, X.columns, alpha=1.0)
+	added = model.update_from(X, y, dates)
+	if added:
+		model.save(path)
+	return model, added
 
 
 def predict_tomorrow_fgi(model, df: pd.DataFrame, lookback_days: int = 7) -> float:
@@ -144,7 +150,10 @@ st.set_page_config(page_title="Web3 MarketMind", page_icon="🧠", layout="wide"
 def main():
 	# Auth
 	authenticator, _ = init_authenticator()
-	name, auth_status, username = authenticator.login(fields={"Form name": "Login", "Username": "Username", "Password": "Password"})
+	authenticator.login(fields={"Form name": "Login", "Username": "Username", "Password": "Password"})
+	name = st.session_state.get("name")
+	auth_status = st.session_state.get("authentication_status")
+	username = st.session_state.get("username")
 
 	if auth_status is False:
 		st.error("Username/password is incorrect")
@@ -159,8 +168,8 @@ def main():
 		st.divider()
 		st.caption(f"Logged in as {name} ({username})")
 		if st.button("Logout"):
-			authenticator.logout(location="sidebar")
-			st.experimental_rerun()
+			authenticator.logout(location="unrendered")
+			st.rerun()
 
 	st.title("🧠 Web3 MarketMind")
 	st.caption("Overlay crypto sentiment vs BTC prices with a simple predictive model")
@@ -168,16 +177,15 @@ def main():
 	if page == "Dashboard":
 		col1, col2 = st.columns([4, 1])
 		with col2:
-			refresh_sec = st.slider("Auto-refresh (seconds)", 10, 300, 60, step=10)
-			st.caption("Data refreshes on rerun")
-			st.button("Manual refresh", on_click=lambda: st.cache_data.clear())
+			refresh_sec = st.slider("Check for new data (seconds)", 5, 300, 30, step=5)
+			st.caption("Prices and FGI are polled once per server, not per viewer")
+			st.button("Manual refresh", on_click=lambda: get_market_poller().refresh_now())
 			st.write(" ")
 			st.metric("Current Time", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
 		with col1:
 			st.subheader("BTC Price vs Fear & Greed Index")
 			with st.spinner("Fetching market and sentiment data..."):
-				price_df = fetch_coingecko_btc_market_chart(days=120)
-				fgi_df = fetch_fear_greed_history(limit_days=400)
+				price_df, fgi_df = read_market_data(price_days=120, fgi_days=400)
 				merged = build_overlay_dataframe(price_df, fgi_df)
 			if merged.empty:
 				st.warning("No data available.")
@@ -203,15 +211,16 @@ def main():
 				st.altair_chart(chart, use_container_width=True)
 
 		st.caption("BTC prices from CoinGecko; sentiment from alternative.me Fear & Greed Index.")
-		# Auto refresh
-		st.autorefresh = st.experimental_rerun if False else None
-		st.experimental_set_query_params(_=int(time.time() // refresh_sec))
+		for source, error in st.session_state.get("market_errors", {}).items():
+			st.caption(f"⚠️ Last {source} poll failed: {error}")
+		rerun_on_new_market_data(refresh_sec)
 
 	elif page == "Model":
 		st.subheader("Predict Tomorrow's Sentiment (FGI)")
-		with st.spinner("Preparing features and training model..."):
-			price_df = fetch_coingecko_btc_market_chart(days=240)
-			fgi_df = fetch_fear_greed_history(limit_days=500)
+		if st.button("Rebuild model from scratch") and os.path.exists(MODEL_STATE_PATH):
+			os.remove(MODEL_STATE_PATH)
+		with st.spinner("Preparing features and updating model..."):
+			price_df, fgi_df = read_market_data(price_days=240, fgi_days=500)
 			merged = build_overlay_dataframe(price_df, fgi_df)
 			if len(merged) < 50:
 				st.warning("Not enough data to train the model.")
@@ -220,23 +229,22 @@ def main():
 			if X.empty:
 				st.warning("Not enough data after feature preparation.")
 				st.stop()
-			model = fit_linear_regression(X, y)
+			model, added = update_online_regression(X, y, merged.loc[X.index, "date"])
 			pred = predict_tomorrow_fgi(model, merged, lookback_days=7)
 			last_fgi = merged["fgi"].iloc[-1]
 			st.metric("Predicted FGI (tomorrow)", f"{pred:.1f}", delta=f"{pred - last_fgi:+.1f}")
-			st.caption("Simple Ridge regression on lagged returns and FGI.")
+			st.caption(
+				f"Incremental Ridge regression on lagged returns and FGI: {model.n} days absorbed "
+				f"through {model.last_date:%Y-%m-%d} ({added} new this visit)."
+			)
 
 			# Show feature importances (coefficients)
-			from sklearn.linear_model import Ridge
-			from sklearn.pipeline import Pipeline
-			if isinstance(model, Pipeline) and isinstance(model[-1], Ridge):
-				coefs = model[-1].coef_
-				feat_importance = (
-					pd.DataFrame({"feature": X.columns, "coef": coefs})
-					.sort_values("coef", key=lambda s: s.abs(), ascending=False)
-					.head(15)
-				)
-				st.dataframe(feat_importance, use_container_width=True)
+			feat_importance = (
+				pd.DataFrame({"feature": model.feature_names, "coef": model.coef_})
+				.sort_values("coef", key=lambda s: s.abs(), ascending=False)
+				.head(15)
+			)
+			st.dataframe(feat_importance, use_container_width=True)
 
 	elif page == "About":
 		st.markdown(
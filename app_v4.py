@@ -15,6 +15,7 @@ Features:
 """
 
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 import pandas as pd
 import numpy as np
 import plotly.express as px
@@ -22,21 +23,41 @@ import toml
 import plotly.graph_objects as go
 import seaborn as sns
 import matplotlib.pyplot as plt
-from fpdf import FPDF
-import io
 import base64
+import copy
 import os
-import requests
+import time
 import joblib
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import streamlit_authenticator as stauth
 import yaml
 
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
-from sklearn.preprocessing import LabelEncoder
+from src.data_preprocessing import (
+    clean_trader_data,
+    clean_sentiment_data,
+    aggregate_daily,
+    merge_sentiment,
+    attach_btc_returns,
+)
+from src.partitioning import available_keys, run_partitioned_pipeline
+from src.synthetic_data import demo_dataset, freeze
+from src.data_io import DATA_DIR, UPLOAD_TYPES, list_data_files, read_sentiment, read_trades
+from src.ingest import ingest_trades
+from src.rolling_stats import rolling_input, sentiment_rolling_stats
+from src.rollups import METRIC_NAMES as ROLLUP_METRICS, build_pyramid
+from src.trade_store import PAGE_SIZE, TradeStore, build_store
+from src.scenario_simulator import HORIZON, LEVERAGES, N_PATHS, ScenarioSimulator, scenario_input
+from src.sentimental_analysis import prepare_ml_dataset, build_model_bundle, predict_next_day
+from src.drift_monitor import MIN_ROWS as DRIFT_MIN_ROWS, BackgroundRetrainer, DriftMonitor, save_bundle
+from src.markov_baseline import FORECAST_DAYS, MarkovBaseline, collapse_extremes, walk_forward
+from src.memory_governor import MemoryGovernor, process_rss_bytes
+from src.streaming_cov import daily_features, iter_chunks, stream_covariance, trade_covariance
+from src.anomaly_and_report import create_pdf_report
+from src import market_data, perf, shared_cache
+from src.profiling import RunProfiler
+from src.credentials import load_credentials
+from src.inference_service import INFERENCE_URL_ENV, predict_remote
 
 # Load environment variables
 load_dotenv()
@@ -75,8 +96,11 @@ st.markdown("""
 # -----------------------------------------------------------
 # AUTHENTICATION SETUP
 # -----------------------------------------------------------
-def init_authenticator():
-    """Initialize Streamlit Authenticator with demo credentials"""
+ADMIN_USERNAME = "admin"
+
+@st.cache_resource
+def write_streamlit_defaults():
+    """Create the default .streamlit theme and secrets files once per process"""
     # Create .streamlit directory if it doesn't exist
     os.makedirs('.streamlit', exist_ok=True)
     
@@ -108,7 +132,10 @@ usernames = {
     }
 }
 """)
-    
+
+@st.cache_resource
+def load_app_credentials():
+    """Hashed login credentials, loaded once per process (config file from generate_hashes.py, else demo users)"""
     # Define default credentials with properly hashed passwords and required email field
     default_credentials = {
         "usernames": {
@@ -124,56 +151,39 @@ usernames = {
             }
         }
     }
-    
-    # Initialize the authenticator with default credentials
-    authenticator = stauth.Authenticate(
-        default_credentials,
-        "marketmind_cookie",
-        "marketmind_signature_key",
-        cookie_expiry_days=7,
-        preauthorized=None
-    )
-    
-    return authenticator
+    return load_credentials(default_credentials)
+
+def init_authenticator():
+    """Streamlit Authenticator for this session, created on its first run only"""
+    write_streamlit_defaults()
+    if "authenticator" not in st.session_state:
+        # The authenticator writes login flags and failed attempts into its dict, so each session gets a copy
+        st.session_state["authenticator"] = stauth.Authenticate(
+            copy.deepcopy(load_app_credentials()),
+            "marketmind_cookie",
+            "marketmind_signature_key",
+            cookie_expiry_days=7,
+            auto_hash=False
+        )
+    return st.session_state["authenticator"]
 
 # -----------------------------------------------------------
 # CRYPTO PRICE API FUNCTIONS
 # -----------------------------------------------------------
-@st.cache_data(ttl=300)  # Cache for 5 minutes
+@perf.instrument_cache("coingecko", st.cache_data(ttl=300))  # Cache for 5 minutes
 def fetch_coingecko_market_chart(coin_id="bitcoin", vs_currency="usd", days="max"):
     """Fetch historical daily prices from CoinGecko"""
     try:
-        url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart"
-        params = {"vs_currency": vs_currency, "days": days}
-        response = requests.get(url, params=params, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-        
-        # data['prices'] = list of [timestamp_ms, price]
-        prices = pd.DataFrame(data['prices'], columns=['ts', 'price'])
-        prices['date'] = pd.to_datetime(prices['ts'], unit='ms').dt.date
-        daily = prices.groupby('date').price.last().reset_index()
-        daily.columns = ['date', f'{coin_id}_close']
-        return daily
+        return market_data.fetch_coingecko_daily(coin_id=coin_id, vs_currency=vs_currency, days=days)
     except Exception as e:
         st.warning(f"CoinGecko API error: {e}. Trying Binance fallback...")
         return pd.DataFrame()
 
-@st.cache_data(ttl=300)
+@perf.instrument_cache("binance", st.cache_data(ttl=300))
 def fetch_binance_daily(symbol='BTCUSDT', limit=1000):
     """Fetch daily klines from Binance as fallback"""
     try:
-        url = "https://api.binance.com/api/v3/klines"
-        params = {"symbol": symbol, "interval": "1d", "limit": limit}
-        response = requests.get(url, params=params, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-        
-        # kline: [openTime, open, high, low, close, ...]
-        df = pd.DataFrame(data)
-        df['date'] = pd.to_datetime(df[0], unit='ms').dt.date
-        df['btc_close'] = df[4].astype(float)
-        return df[['date', 'btc_close']]
+        return market_data.fetch_binance_daily(symbol=symbol, limit=limit)
     except Exception as e:
         st.error(f"Binance API also failed: {e}")
         return pd.DataFrame()
@@ -184,122 +194,549 @@ def get_crypto_prices(coin="bitcoin", days=365):
     
     if df.empty and coin == "bitcoin":
         df = fetch_binance_daily(symbol='BTCUSDT', limit=min(days, 1000))
+        df = df.rename(columns={'btc_close': 'bitcoin_close'})
     
     return df
 
 # -----------------------------------------------------------
-# ML MODEL FUNCTIONS
+# PARTITIONED BREAKDOWN
 # -----------------------------------------------------------
-def prepare_ml_dataset(df, n_lags=3):
-    """Prepare dataset for ML model with lag features"""
-    df = df.sort_values('date').reset_index(drop=True)
-    ml = df[['date', 'closedPnL', 'leverage', 'size', 'btc_return', 'Sentiment']].copy()
-    
-    # Encode sentiment labels
-    le = LabelEncoder()
-    ml['label'] = le.fit_transform(ml['Sentiment'])
-    
-    # Create lag features
-    for lag in range(1, n_lags + 1):
-        ml[f'closedPnL_lag{lag}'] = ml['closedPnL'].shift(lag)
-        ml[f'leverage_lag{lag}'] = ml['leverage'].shift(lag)
-        ml[f'size_lag{lag}'] = ml['size'].shift(lag)
-        ml[f'btc_return_lag{lag}'] = ml['btc_return'].shift(lag)
+@perf.instrument_cache("partition_breakdown", st.cache_data(show_spinner=False, max_entries=4))
+@shared_cache.cached(name="partition_breakdown")
+def compute_partition_breakdown(_trader_df, dataset_key):
+    """Per symbol/trader type daily aggregates and risk, processed in parallel
+
+    Cached by `dataset_key` rather than by hashing the (possibly multi-million
+    row) frame on every rerun.
+    """
+    return run_partitioned_pipeline(_trader_df)
+
+@perf.instrument_cache("daily_aggregate", st.cache_data(show_spinner=False, max_entries=4))
+@shared_cache.cached(name="daily_aggregate")
+def compute_daily(_trader_df, dataset_key):
+    """Cleaned trade log aggregated per day, cached by `dataset_key`"""
+    return aggregate_daily(clean_trader_data(_trader_df))
+
+@perf.instrument_cache("rollups", st.cache_resource(max_entries=2, show_spinner=False))
+def compute_rollups(_trader_df, dataset_key):
+    """Minute/hour/day/week rollups of the cleaned trade log, built once per dataset and shared"""
+    return build_pyramid(clean_trader_data(_trader_df))
+
+# -----------------------------------------------------------
+# CORRELATIONS
+# -----------------------------------------------------------
+CORRELATION_ASSETS = {'ethereum': 'eth', 'solana': 'sol'}
+ANNOTATE_MAX_FEATURES = 12
+
+def correlation_features(merged_df, sentiment_df, partition_daily):
+    """Wide daily feature frame for the correlation tab, with ETH/SOL returns where prices are available"""
+    asset_returns = {}
+    for coin, name in CORRELATION_ASSETS.items():
+        prices = get_crypto_prices(coin=coin, days=365)
+        if not prices.empty:
+            asset_returns[name] = prices.set_index('date')[f'{coin}_close'].pct_change(fill_method=None)
+    return daily_features(merged_df, sentiment_df, partition_daily, asset_returns)
+
+@perf.instrument_cache("trade_correlations", st.cache_resource(max_entries=2, show_spinner="Streaming trades..."))
+def compute_trade_correlations(_trader_df, _features, dataset_key, features_key):
+    """Per-day covariance accumulators of trades against their day's context, one pass per dataset
+
+    Any date range or sentiment regime is then a merge of its days.
+    """
+    return trade_covariance(_trader_df, _features)
+
+def strongest_pairs(corr, n=10):
+    """The `n` feature pairs with the largest absolute correlation"""
+    upper = corr.where(np.triu(np.ones(corr.shape, dtype=bool), k=1)).stack()
+    top = upper.abs().nlargest(n).index
+    return pd.DataFrame({
+        'feature': [a for a, _ in top],
+        'with': [b for _, b in top],
+        'correlation': upper[top].round(3).to_numpy(),
+    })
+
+# -----------------------------------------------------------
+# SCENARIO SIMULATOR
+# -----------------------------------------------------------
+SCENARIO_PATH_OPTIONS = [10_000, 100_000, 500_000, 1_000_000]
+SCENARIO_LEVERAGE_OPTIONS = [1, 2, 3, 5, 10, 20, 50]
+
+@perf.instrument_cache("scenarios", st.cache_data(show_spinner="Simulating scenarios...", max_entries=16))
+def run_scenarios(_scenario_df, data_key, source, regime, horizon, n_paths, leverages, markov, side):
+    """Leverage scenario summary for one set of simulator inputs, cached by `data_key` and the parameters
+
+    `data_key` names the trade and sentiment sources and hashes `_scenario_df`,
+    which also depends on the fetched BTC closes.
+    """
+    simulator = ScenarioSimulator(
+        _scenario_df['ret'], _scenario_df['Sentiment'], horizon=horizon, leverages=leverages, markov=markov, side=side
+    )
+    return simulator.run(regime, n_paths, n_workers=os.cpu_count()).summary(), simulator.days, simulator.pooled
+
+def render_scenario_simulator(merged_df, rollups, dataset_key, sentiment_key):
+    """Monte Carlo loss distribution and liquidation odds of leveraged positions, by sentiment regime"""
+    with st.expander("🎲 Leverage Scenario Simulator"):
+        sources = {}
+        btc = scenario_input(merged_df)
+        if len(btc) >= 2:
+            sources["BTC daily return"] = btc
+        day = rollups.levels['day']
+        book = pd.Series((day['pnl_sum'] / day['size']).to_numpy(), index=day.index.date)
+        sources["Traders' PnL per $ traded"] = scenario_input(merged_df, book)
+
+        regimes = sorted(merged_df['Sentiment'].unique())
+        latest = merged_df.sort_values('date')['Sentiment'].iloc[-1]
+        with st.form("scenario_form"):
+            sc1, sc2, sc3 = st.columns(3)
+            source = sc1.selectbox("Daily returns", list(sources))
+            regime = sc2.selectbox("Starting regime", regimes, index=regimes.index(latest))
+            side = sc3.radio("Position", ["Long", "Short"], horizontal=True)
+            horizon = sc1.slider("Horizon (days)", 1, 180, HORIZON)
+            n_paths = sc2.select_slider("Paths", SCENARIO_PATH_OPTIONS, value=N_PATHS, format_func=lambda n: f"{n:,}")
+            leverages = sc3.multiselect("Leverage", SCENARIO_LEVERAGE_OPTIONS, default=list(LEVERAGES))
+            markov = st.checkbox("Follow the Fear/Greed transition chain (otherwise stay in the starting regime)", value=True)
+            if st.form_submit_button("▶️ Run simulation"):
+                st.session_state["scenario_params"] = (
+                    source, regime, horizon, n_paths, tuple(sorted(leverages)), markov, 1 if side == "Long" else -1
+                )
+
+        params = st.session_state.get("scenario_params")
+        if params is None:
+            st.caption("Bootstraps daily returns by sentiment regime and reports the loss distribution per leverage.")
+            return
+        if params[0] not in sources or not params[4]:
+            st.info("Pick a return series and at least one leverage.")
+            return
+        start = time.perf_counter()
+        try:
+            scenario_df = sources[params[0]]
+            data_key = (dataset_key, sentiment_key, int(pd.util.hash_pandas_object(scenario_df).sum()))
+            summary, days, pooled = run_scenarios(scenario_df, data_key, *params)
+        except ValueError as e:
+            st.warning(f"Cannot simulate: {e}")
+            return
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        source, regime, horizon, n_paths, leverages, markov, side = params
+        table = summary.set_index('leverage')
+        table.index = [f"{lev}x" for lev in table.index]
+        table = (table * 100).round(1).rename(columns=lambda c: c.replace('_', ' ').replace('prob', '%').upper())
+        st.dataframe(table, use_container_width=True)
+        fig_sc = px.bar(
+            summary.assign(leverage=summary['leverage'].astype(str) + "x"),
+            x='leverage', y='liquidation_prob', title=f"Liquidation probability within {horizon} days",
+            labels={'leverage': 'Leverage', 'liquidation_prob': 'P(liquidation)'}
+        )
+        fig_sc.update_yaxes(tickformat=".0%")
+        st.plotly_chart(fig_sc, use_container_width=True)
+        st.caption(
+            f"{'Long' if side > 0 else 'Short'} on {source}, starting in {regime}: "
+            f"{n_paths:,} paths × {horizon} days in {elapsed_ms:,.0f} ms. "
+            "Returns are % of margin; VaR/ES at 95%. "
+            f"History days per regime: {', '.join(f'{r} {n}' for r, n in days.items())}."
+            + (f" Too few days to bootstrap alone, drawn from all days: {', '.join(pooled)}." if pooled else "")
+        )
+
+# -----------------------------------------------------------
+# TRADE DRILL-DOWN
+# -----------------------------------------------------------
+@perf.instrument_cache("trade_store", st.cache_resource(max_entries=4, show_spinner="Indexing trades for drill-down..."))
+def open_trade_store(_trader_df, dataset_key):
+    """SQLite store of the dataset's individual trades, built on first use and kept on disk"""
+    return TradeStore.open_or_build(clean_trader_data(_trader_df), dataset_key)
+
+def get_trade_store(trader_df, dataset_key):
+    """The cached store, rebuilt in place if another process pruned its file"""
+    store = open_trade_store(trader_df, dataset_key)
+    if not store.is_built():
+        with st.spinner("Indexing trades for drill-down..."):
+            build_store(clean_trader_data(trader_df), store.path)
+    return store
+
+def render_trade_drilldown(store, selection, date_min, date_max):
+    """Page through one day's trades, picked by clicking the timeline or in the date box"""
+    points = selection.selection.points if selection else []
+    picked = pd.Timestamp(points[-1]['x']).date() if points else date_max
     
-    # Drop rows with NaN from lagging
-    ml = ml.dropna().reset_index(drop=True)
+    dc1, dc2, dc3 = st.columns([2, 2, 1])
+    # The date box follows the latest chart click (its default changes with it)
+    day = dc1.date_input("Day", picked, min_value=date_min, max_value=date_max)
+    symbol = dc2.selectbox("Symbol", ["All"] + store.symbols(), key="drill_symbol")
+    symbol = None if symbol == "All" else symbol
     
-    # Feature columns
-    feature_cols = [c for c in ml.columns if 'lag' in c]
-    X = ml[feature_cols]
-    y = ml['label']
+    count = store.count_day(day, symbol)
+    n_pages = max(1, -(-count // PAGE_SIZE))
+    page = int(dc3.number_input("Page", min_value=1, max_value=n_pages, value=1, key=f"drill_page_{day}_{symbol}"))
+    trades, seconds = store.fetch_day(day, symbol, page=page - 1)
     
-    return X, y, le, ml
+    st.caption(f"{count:,} trades on {day} · page {page}/{n_pages} · fetched in {seconds * 1000:.1f} ms")
+    st.dataframe(trades, hide_index=True, use_container_width=True)
 
-def train_and_evaluate_model(X, y):
-    """Train Random Forest classifier and return metrics"""
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, shuffle=False, random_state=42
+# -----------------------------------------------------------
+# SESSION MEMORY
+# -----------------------------------------------------------
+@st.cache_resource
+def get_memory_governor():
+    """Process-wide byte budget over the large objects sessions keep between reruns"""
+    return MemoryGovernor()
+
+def current_session_id():
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else "local"
+
+def cached_export(name, key, build):
+    """Bytes of an export for `key`, rebuilt only when the key changes or the governor dropped them"""
+    governor = get_memory_governor()
+    cached = governor.get(current_session_id(), name)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    data = build()
+    governor.put(current_session_id(), name, (key, data), spill=False)
+    return data
+
+def render_memory_panel():
+    """Admin view of per-session memory held through the governor"""
+    governor = get_memory_governor()
+    usage = governor.usage()
+    with st.sidebar.expander("🧠 Session Memory (admin)"):
+        mb = 1024 * 1024
+        rss = process_rss_bytes()
+        mc1, mc2 = st.columns(2)
+        mc1.metric("Held", f"{usage['in_memory'].sum() / mb:,.0f} / {governor.budget_bytes / mb:,.0f} MB")
+        mc2.metric("Process RSS", f"{rss / mb:,.0f} MB" if rss is not None else "N/A")
+        st.caption(
+            f"Spilled to `{governor.spill_dir}`: {usage['spilled'].sum() / mb:,.1f} MB · "
+            f"{governor.evictions} eviction(s), {governor.reloads} reload(s)"
+        )
+        if len(usage):
+            current = current_session_id()
+            usage = usage.sort_values('idle_s').assign(
+                session=lambda d: [s[:8] + (" (you)" if s == current else "") for s in d['session']],
+                idle_s=lambda d: d['idle_s'].round(0),
+                in_memory=lambda d: (d['in_memory'] / mb).round(1),
+                spilled=lambda d: (d['spilled'] / mb).round(1),
+            ).rename(columns={'idle_s': 'idle (s)', 'in_memory': 'memory (MB)', 'spilled': 'spilled (MB)'})
+            st.dataframe(usage, hide_index=True, use_container_width=True)
+
+# -----------------------------------------------------------
+# UPLOADS
+# -----------------------------------------------------------
+def ingest_trader_uploads(files):
+    """Parse the uploaded trade files (or zips) concurrently, once per set of uploads
+
+    The result belongs to this session, so it is held by the memory governor,
+    which spills it to disk if the process runs over its budget.
+    """
+    upload_key = tuple(f.file_id for f in files)
+    cached = get_memory_governor().get(current_session_id(), "trader_ingest")
+    if cached is not None and cached[0] == upload_key:
+        return cached[1]
+
+    progress = st.progress(0.0, text=f"Parsing {len(files)} upload(s)...")
+
+    def on_progress(done, total, stats):
+        progress.progress(done / total, text=(
+            f"Parsed {stats['name']} ({stats['rows']:,} rows, {stats['seconds'] * 1000:,.0f} ms) · {done}/{total}"
+        ))
+
+    result = ingest_trades(files, on_progress=on_progress)
+    progress.empty()
+    get_memory_governor().put(current_session_id(), "trader_ingest", (upload_key, result))
+    return result
+
+# -----------------------------------------------------------
+# INCREMENTAL STATE
+# -----------------------------------------------------------
+def history_fingerprint(frame, columns, through=None, date_col='date'):
+    """Hash of `columns` over the rows dated up to `through` (default: all rows)
+
+    Incremental objects only absorb days after their last one, so they compare
+    this with the value at their last update to notice relabelled or refilled history.
+    """
+    if through is not None:
+        frame = frame[(pd.to_datetime(frame[date_col]) <= through).to_numpy()]
+    return int(pd.util.hash_pandas_object(frame[columns], index=False).sum())
+
+def get_incremental_state(name, key, frame, columns, build):
+    """This session's incremental object `name` for `key`, extended with the days of `frame` it hasn't seen
+
+    Kept in the memory governor as `(key, fingerprint, obj)`. `build()` makes a
+    fresh object when `key` changed, when an absorbed day differs in `columns`,
+    or when the old object rejects the new days with a `ValueError` (e.g. a
+    sentiment class the Markov chain hasn't seen).
+    """
+    governor, session_id = get_memory_governor(), current_session_id()
+    state = governor.get(session_id, name)
+    obj = None
+    if state is not None and state[0] == key and state[1] == history_fingerprint(frame, columns, state[2].last_date):
+        obj = state[2]
+        try:
+            obj.update_from(frame)
+        except ValueError:
+            obj = None
+    if obj is None:
+        obj = build()
+        obj.update_from(frame)
+    governor.put(session_id, name, (key, history_fingerprint(frame, columns, obj.last_date), obj), spill=False)
+    return obj
+
+# -----------------------------------------------------------
+# ROLLING ANALYTICS
+# -----------------------------------------------------------
+ROLLING_WINDOW_OPTIONS = [7, 30, 90, 180, 365]
+
+def get_rolling_stats(source_key, sentiment_key, windows, frame):
+    """This session's rolling statistics for the data sources, extended with any new days
+
+    History is only recomputed when a source or the windows change, or when
+    any absorbed day changed (e.g. BTC returns filled in by a later fetch);
+    otherwise just the days after the last absorbed one are added.
+    """
+    return get_incremental_state(
+        "rolling_stats", (source_key, sentiment_key, tuple(windows)), frame, list(frame.columns),
+        lambda: sentiment_rolling_stats(windows),
     )
-    
-    model = RandomForestClassifier(
-        n_estimators=200,
-        max_depth=10,
-        random_state=42,
-        n_jobs=-1
+
+# -----------------------------------------------------------
+# MODEL & DRIFT MONITOR
+# -----------------------------------------------------------
+@st.cache_resource(max_entries=2, show_spinner=False)
+def load_model_bundle(model_path, mtime):
+    """The saved model bundle, loaded once per file version"""
+    return joblib.load(model_path)
+
+@st.cache_resource
+def get_retrainer(model_path):
+    """Process-wide background retrainer: one retrain at a time across all sessions"""
+    return BackgroundRetrainer(model_path)
+
+def retrain_job(merged_df):
+    """Training callable for the background retrainer"""
+    def train():
+        X, y, label_encoder, ml_df = prepare_ml_dataset(merged_df, n_lags=3)
+        bundle, model, acc, cm = build_model_bundle(X, y, label_encoder, ml_df)
+        return bundle, acc
+    return train
+
+def get_drift_monitor(source_key, sentiment_key, model_version, reference, ml_df):
+    """This session's drift monitor for the data sources and model, extended with any new days
+
+    Restarted when a source or the model changes, or when a day it already
+    absorbed has different features (e.g. BTC returns filled in by a later fetch).
+    """
+    return get_incremental_state(
+        "drift_monitor", (source_key, sentiment_key, model_version), ml_df, ['date'] + reference.features,
+        lambda: DriftMonitor(reference),
     )
-    model.fit(X_train, y_train)
-    
-    preds = model.predict(X_test)
-    acc = accuracy_score(y_test, preds)
-    clf_report = classification_report(y_test, preds, output_dict=True)
-    cm = confusion_matrix(y_test, preds)
-    
-    return model, acc, clf_report, cm, X_train, X_test, y_train, y_test
 
-def predict_next_day(model, label_encoder, ml_df, n_lags=3):
-    """Predict tomorrow's sentiment"""
-    X_next = ml_df.filter(regex='lag').tail(1)
-    
-    if X_next.empty:
-        return "Unknown", [0.5, 0.5]
-    
-    pred = model.predict(X_next)[0]
-    prob = model.predict_proba(X_next)[0]
-    label = label_encoder.inverse_transform([pred])[0]
-    
-    return label, prob
+def render_drift_panel(model_path, source_key, sentiment_key, merged_df):
+    """PSI/KS drift of the lag features since training, and retraining gated on it"""
+    retrainer = get_retrainer(model_path)
+    job = retrainer.snapshot()
+    with st.expander("📉 Feature Drift Monitor"):
+        if job['state'] == 'running':
+            st.info(f"⏳ Retraining in the background ({job['reason']})...")
+        elif job['state'] == 'done':
+            finished = datetime.fromtimestamp(job['finished_at']).strftime('%H:%M:%S')
+            st.success(f"✅ Background retrain finished at {finished} in {job['seconds']:.1f}s · test accuracy {job['accuracy']:.2%}")
+        elif job['state'] == 'failed':
+            st.error(f"Background retrain failed: {job['error']}")
+
+        if not os.path.exists(model_path):
+            st.caption("Train a model to start monitoring drift.")
+            return
+        model_version = os.path.getmtime(model_path)
+        reference = load_model_bundle(model_path, model_version).get('drift_reference')
+        if reference is None:
+            st.caption("This model was saved without drift reference histograms; retrain it to enable monitoring.")
+            return
+
+        X, y, label_encoder, ml_df = prepare_ml_dataset(merged_df, n_lags=3)
+        monitor = get_drift_monitor(source_key, sentiment_key, model_version, reference, ml_df)
+        report = monitor.report()
+        status = monitor.status(report)
+        st.caption(
+            f"Reference: {reference.rows} training days through {status['through']:%Y-%m-%d} · "
+            f"{status['rows']} new days since (window {monitor.window})"
+        )
+        if not status['ready']:
+            st.info(f"Drift is judged once {DRIFT_MIN_ROWS} new days have arrived ({status['rows']} so far).")
+        elif status['retrain']:
+            st.warning(
+                f"⚠️ {len(status['drifted'])} of {len(report)} features drifted "
+                f"({', '.join(status['drifted'])}); retraining recommended."
+            )
+        else:
+            st.success("No significant drift; the model does not need retraining.")
+        st.dataframe(report.round(3), use_container_width=True, hide_index=True)
+
+        auto = st.toggle("Retrain automatically when drift crosses the threshold", key="auto_retrain")
+        if status['retrain'] and not retrainer.running():
+            reason = f"{len(status['drifted'])} features drifted"
+            if auto and job['state'] != 'failed':
+                retrainer.start(retrain_job(merged_df), reason=reason)
+                st.toast("🔄 Drift detected: retraining in the background")
+            elif st.button("🔄 Retrain in background"):
+                retrainer.start(retrain_job(merged_df), reason=reason)
+                st.toast("🔄 Retraining in the background")
 
 # -----------------------------------------------------------
-# PDF REPORT GENERATOR
+# MARKOV BASELINE
 # -----------------------------------------------------------
-def create_pdf_report(dataframe, metrics_dict):
-    """Generate PDF report with summary statistics"""
-    buffer = io.BytesIO()
-    pdf = FPDF()
-    pdf.add_page()
-    
-    # Title
-    pdf.set_font("Arial", "B", 16)
-    pdf.cell(0, 10, "Web3 MarketMind 4.0 - Analytics Report", ln=True, align="C")
-    pdf.ln(5)
-    
-    # Date
-    pdf.set_font("Arial", "", 10)
-    pdf.cell(0, 10, f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", ln=True, align="C")
-    pdf.ln(10)
-    
-    # Key Metrics
-    pdf.set_font("Arial", "B", 14)
-    pdf.cell(0, 10, "Key Metrics", ln=True)
-    pdf.set_font("Arial", "", 11)
-    
-    for key, value in metrics_dict.items():
-        pdf.cell(0, 8, f"{key}: {value}", ln=True)
-    
-    pdf.ln(10)
-    
-    # Data Summary
-    pdf.set_font("Arial", "B", 14)
-    pdf.cell(0, 10, "Data Summary (First 20 rows)", ln=True)
-    pdf.set_font("Arial", "", 9)
-    
-    for idx, row in dataframe.head(20).iterrows():
-        line = f"{row['date']} | {row['Sentiment']}: PnL={row['closedPnL']:.2f}, Lev={row['leverage']:.2f}, Vol={row['size']:.2f}"
-        pdf.cell(0, 6, line, ln=True)
+MARKOV_COLUMNS = ['date', 'Sentiment', 'btc_return']
+
+def get_markov_baseline(source_key, sentiment_key, collapse, frame):
+    """This session's transition-count baseline for the data sources, extended with any new days
+
+    Rebuilt when either source changes or an absorbed day was relabelled or
+    got a different BTC return.
+    """
+    return get_incremental_state(
+        "markov_baseline", (source_key, sentiment_key, collapse), frame, MARKOV_COLUMNS,
+        lambda: MarkovBaseline.fit(frame['Sentiment'], frame['btc_return'], frame['date']),
+    )
+
+@perf.instrument_cache("markov_walk_forward", st.cache_data(show_spinner=False, max_entries=8))
+def markov_walk_forward(_merged_df, data_key, test_start, collapse):
+    """Baseline accuracy over the days from `test_start`, cached by `data_key` (sources and a hash of the frame)"""
+    return walk_forward(_merged_df, test_start, collapse=collapse)[0]
+
+def render_markov_baseline(merged_df, source_key, dataset_key, sentiment_key, model_path, rf_ms):
+    """Markov-chain forecast next to the Random Forest's, with accuracy and inference cost of both"""
+    st.markdown("**📐 Markov Baseline**")
+    collapse = st.toggle("3 classes (fold Extreme into Fear/Greed)", key="markov_collapse")
+    frame = merged_df.sort_values('date')
+    if collapse:
+        frame = frame.assign(Sentiment=collapse_extremes(frame['Sentiment']).to_numpy())
+    baseline = get_markov_baseline(source_key, sentiment_key, collapse, frame)
+
+    start = time.perf_counter()
+    for _ in range(100):
+        baseline.predict_proba()
+    markov_us = (time.perf_counter() - start) / 100 * 1e6
+    st.metric("📅 Baseline Prediction", baseline.predict())
+    st.dataframe(baseline.forecast(FORECAST_DAYS).round(3), use_container_width=True)
+
+    bundle = load_model_bundle(model_path, os.path.getmtime(model_path)) if os.path.exists(model_path) else {}
+    dates = frame['date'].drop_duplicates()
+    test_start = bundle.get('test_start', dates.iloc[int(len(dates) * 0.8)] if len(dates) else None)
+    data_key = (dataset_key, sentiment_key, history_fingerprint(frame, MARKOV_COLUMNS))
+    rows = [{
+        'Model': "Markov chain",
+        'Test accuracy': markov_walk_forward(frame, data_key, test_start, collapse) if test_start is not None else np.nan,
+        'Inference (µs)': markov_us,
+    }]
+    if bundle:
+        rows.insert(0, {
+            'Model': "Random Forest",
+            'Test accuracy': bundle.get('accuracy', np.nan),
+            'Inference (µs)': rf_ms * 1000 if rf_ms is not None else np.nan,
+        })
+    st.dataframe(pd.DataFrame(rows).round({'Test accuracy': 3, 'Inference (µs)': 1}), use_container_width=True, hide_index=True)
+    st.caption(
+        (f"Scored on the days from {pd.Timestamp(test_start):%Y-%m-%d}, the baseline updating day by day. "
+         if test_start is not None else "Not enough days to score. ")
+        + ("Transitions are conditioned on BTC return terciles." if len(baseline.edges)
+           else "No BTC price data, so transitions are unconditional.")
+        + (" The Random Forest predicts all classes, the baseline only three." if collapse and bundle else "")
+    )
+
+# -----------------------------------------------------------
+# DEMO DATA
+# -----------------------------------------------------------
+DEMO_SIZE_LABELS = {
+    'sample': "90 days · 9k trades",
+    'year': "1 year · 250k trades",
+    'million': "3 years · 1M trades",
+    'production': "3 years · 5M trades",
+}
+
+@perf.instrument_cache("demo_data", st.cache_resource(max_entries=2, show_spinner="Generating demo data..."))
+def load_demo_data(size, seed, end_date):
+    """Seeded demo trades and sentiment, generated once per (size, seed, day) and shared read-only"""
+    trades, sentiment = generate_demo_data(size, seed, end_date)
+    return freeze(trades), freeze(sentiment)
+
+@shared_cache.cached(name="demo_data")
+def generate_demo_data(size, seed, end_date):
+    """Demo frames from the host-wide cache when another worker already built them"""
+    return demo_dataset(size, seed=seed, end=end_date, workers=os.cpu_count() or 1)
+
+# -----------------------------------------------------------
+# PERFORMANCE PANEL
+# -----------------------------------------------------------
+def render_performance_panel():
+    """Show this run's span timings and cache/fetch counters in the sidebar"""
+    spans = perf.run_spans()
+    counters = perf.run_counters()
     
-    pdf.output(buffer)
-    return buffer.getvalue()
+    with st.sidebar.expander("⏱️ Performance", expanded=True):
+        if spans:
+            spans_df = pd.DataFrame(spans, columns=['span', 'seconds', 'depth'])
+            spans_df['span'] = ['\u2003' * d + n for n, d in zip(spans_df['span'], spans_df['depth'])]
+            spans_df['ms'] = (spans_df['seconds'] * 1000).round(1)
+            st.dataframe(spans_df[['span', 'ms']], hide_index=True, use_container_width=True)
+        
+        for cache, (hits, misses) in perf.cache_stats(counters).items():
+            st.caption(f"Cache `{cache}`: {hits} hit(s), {misses} miss(es)")
+        
+        fetched = sum(v for (name, _), v in counters.items() if name == "bytes_fetched_total")
+        st.caption(f"Bytes fetched this run: {fetched:,.0f}")
+        st.caption(f"Exported to `{perf.PERF_DIR}/{perf.JSONL_FILE}` and `{perf.PERF_DIR}/{perf.PROMETHEUS_FILE}`")
+
+# -----------------------------------------------------------
+# PROFILER (ADMIN ONLY)
+# -----------------------------------------------------------
+def is_admin():
+    """True only for an authenticated admin session"""
+    return (
+        st.session_state.get("authentication_status") is True
+        and st.session_state.get("username") == ADMIN_USERNAME
+    )
+
+def request_profile():
+    """Button callback: mark the run it triggers for profiling"""
+    if is_admin():
+        st.session_state["profile_next_run"] = True
+
+def render_profiler_controls():
+    """Sidebar controls for capturing a profile of the next run"""
+    with st.sidebar.expander("🧪 Profiler (admin)"):
+        st.checkbox("Deterministic (cProfile)", key="profile_deterministic")
+        st.button("Profile next run", on_click=request_profile, use_container_width=True)
+        
+        last_profile = st.session_state.get("last_profile")
+        if last_profile and os.path.exists(last_profile['top']):
+            st.caption(f"Flamegraph (folded stacks): `{last_profile['folded']}`")
+            with open(last_profile['top']) as f:
+                st.code(f.read(), language=None)
+
+def start_requested_profile():
+    """Start a profiler if an admin asked for this run to be profiled"""
+    requested = st.session_state.pop("profile_next_run", False)
+    if not (requested and is_admin()):
+        return None
+    profiler = RunProfiler(deterministic=st.session_state.get("profile_deterministic", False))
+    profiler.start()
+    return profiler
+
+def finish_profile(profiler):
+    """Stop the profiler and save its output"""
+    profiler.stop()
+    paths = profiler.save(label=ADMIN_USERNAME)
+    st.session_state["last_profile"] = paths
+    st.toast(f"🧪 Profile saved to {os.path.dirname(paths['folded'])}/")
 
 # -----------------------------------------------------------
 # MAIN APP
 # -----------------------------------------------------------
 def main():
-    # Initialize authentication
-    authenticator = init_authenticator()
-    
-    # Call login method (stores results in authenticator object)
-    authenticator.login(location="sidebar")
+    with perf.span("auth"):
+        # Initialize authentication
+        authenticator = init_authenticator()
+        
+        # Call login method (stores results in authenticator object)
+        authenticator.login(location="sidebar")
     
     # Access authentication status from the authenticator object
     if st.session_state.get("authentication_status") == False:
@@ -313,6 +750,7 @@ def main():
     # Get user info from session state
     name = st.session_state.get("name")
     username = st.session_state.get("username")
+    get_memory_governor().touch(current_session_id(), username)
     
     # Logout button
     with st.sidebar:
@@ -320,6 +758,9 @@ def main():
         authenticator.logout(location="sidebar")
         st.divider()
     
+    if is_admin():
+        render_profiler_controls()
+    
     # -----------------------------------------------------------
     # HEADER
     # -----------------------------------------------------------
@@ -333,131 +774,154 @@ def main():
     st.sidebar.header("⚙️ Controls")
     
     demo_mode = st.sidebar.toggle("Use Demo Data (Sample)", value=True)
-    trader_file = st.sidebar.file_uploader("📂 Upload Trader Data", type=["csv"])
-    sentiment_file = st.sidebar.file_uploader("📂 Upload Sentiment Data", type=["csv"])
+    st.sidebar.toggle("⏱️ Performance Panel", key="perf_panel")
+    trader_files = st.sidebar.file_uploader(
+        "📂 Upload Trader Data", type=UPLOAD_TYPES + ["zip"], accept_multiple_files=True,
+        help="One or more files (e.g. one per day or symbol), or zip archives of them"
+    )
+    sentiment_file = st.sidebar.file_uploader("📂 Upload Sentiment Data", type=UPLOAD_TYPES)
+    server_files = [None] + list_data_files()
+    if len(server_files) > 1:
+        # Files in $MARKETMIND_DATA_DIR are read (and memory-mapped) in place, no upload needed
+        server_trader = st.sidebar.selectbox("🗄️ Server Trader File", server_files, format_func=lambda f: f or "—")
+        server_sentiment = st.sidebar.selectbox("🗄️ Server Sentiment File", server_files, format_func=lambda f: f or "—")
+    else:
+        server_trader = server_sentiment = None
     
     # Load data
-    if demo_mode:
-        # Create sample data for demo
-        st.sidebar.info("Using generated demo data")
-        dates = pd.date_range(end=datetime.now(), periods=90, freq='D')
-        trader_df = pd.DataFrame({
-            'time': dates,
-            'closedPnL': np.random.randn(90) * 100 + 50,
-            'leverage': np.random.uniform(1, 20, 90),
-            'size': np.random.uniform(1000, 50000, 90)
-        })
-        
-        sentiment_df = pd.DataFrame({
-            'Date': dates,
-            'Classification': np.random.choice(['Fear', 'Greed', 'Neutral'], 90, p=[0.3, 0.3, 0.4])
-        })
-    elif trader_file and sentiment_file:
-        trader_df = pd.read_csv(trader_file)
-        sentiment_df = pd.read_csv(sentiment_file)
-    else:
-        st.warning("⚠️ Upload both CSV files or enable demo mode to continue.")
-        st.stop()
+    with perf.span("load"):
+        daily_df = rollups = None
+        if demo_mode:
+            # Seeded demo data, cached once per size/seed/day
+            demo_size = st.sidebar.selectbox(
+                "Demo Dataset Size", list(DEMO_SIZE_LABELS), format_func=DEMO_SIZE_LABELS.get
+            )
+            demo_seed = int(st.sidebar.number_input("Demo Seed", min_value=0, value=42, step=1))
+            end_date = datetime.now().date()
+            trader_df, sentiment_df = load_demo_data(demo_size, demo_seed, end_date)
+            dataset_key = ('demo', demo_size, demo_seed, str(end_date))
+            source_key = ('demo', demo_size, demo_seed)
+            sentiment_key = dataset_key
+            st.sidebar.info(f"Using generated demo data ({len(trader_df):,} trades)")
+        elif (trader_files and sentiment_file) or (server_trader and server_sentiment):
+            load_start = time.perf_counter()
+            try:
+                if trader_files and sentiment_file:
+                    ingest = ingest_trader_uploads(trader_files)
+                    trader_df, daily_df, rollups = ingest['trades'], ingest['daily'], ingest['rollups']
+                    sentiment_df = read_sentiment(sentiment_file)
+                    dataset_key = source_key = ('upload',) + tuple(f.file_id for f in trader_files)
+                    sentiment_key = ('upload', sentiment_file.file_id)
+                    n_files = len(ingest['files'])
+                    trader_name = trader_files[0].name if n_files == 1 else f"{n_files} trade files"
+                    source_names = (trader_name, sentiment_file.name)
+                    if n_files > 1:
+                        with st.sidebar.expander(f"📄 Ingested files ({n_files})"):
+                            st.dataframe(ingest['files'], hide_index=True, use_container_width=True)
+                else:
+                    trader_path = os.path.join(DATA_DIR, server_trader)
+                    sentiment_path = os.path.join(DATA_DIR, server_sentiment)
+                    trader_df = read_trades(trader_path)
+                    sentiment_df = read_sentiment(sentiment_path)
+                    dataset_key = ('server', trader_path, os.path.getmtime(trader_path))
+                    source_key = ('server', trader_path, sentiment_path)
+                    sentiment_key = ('server', sentiment_path, os.path.getmtime(sentiment_path))
+                    source_names = (server_trader, server_sentiment)
+            except ValueError as e:
+                st.error(f"Could not read data: {e}")
+                st.stop()
+            load_ms = (time.perf_counter() - load_start) * 1000
+            st.sidebar.caption(
+                f"Loaded {len(trader_df):,} trades from {' + '.join(source_names)} in {load_ms:,.0f} ms"
+            )
+        else:
+            st.warning("⚠️ Upload both data files (CSV, Parquet or Arrow) or enable demo mode to continue.")
+            st.stop()
     
     # -----------------------------------------------------------
     # DATA CLEANING & MERGE
     # -----------------------------------------------------------
-    with st.spinner("Processing data..."):
-        trader_df['time'] = pd.to_datetime(trader_df['time'], errors='coerce')
-        sentiment_df['Date'] = pd.to_datetime(sentiment_df['Date'], errors='coerce')
+    with st.spinner("Processing data..."), perf.span("clean_merge"):
+        partition_keys = available_keys(trader_df)
+        if partition_keys:
+            with perf.span("partition_breakdown"):
+                partition_daily, partition_risk = compute_partition_breakdown(trader_df, dataset_key)
         
-        trader_df.dropna(subset=['closedPnL', 'leverage', 'size'], inplace=True)
-        trader_df = trader_df[trader_df['leverage'] > 0]
-        trader_df['date'] = trader_df['time'].dt.date
-        sentiment_df['date'] = sentiment_df['Date'].dt.date
+        sentiment_df = clean_sentiment_data(sentiment_df)
         
-        merged_df = trader_df.groupby('date').agg({
-            'closedPnL': 'mean',
-            'leverage': 'mean',
-            'size': 'sum'
-        }).reset_index()
-        
-        merged_df = merged_df.merge(
-            sentiment_df[['date', 'Classification']], 
-            on='date', 
-            how='left'
-        )
-        merged_df.rename(columns={'Classification': 'Sentiment'}, inplace=True)
-        merged_df.dropna(subset=['Sentiment'], inplace=True)
+        if daily_df is None:
+            daily_df = compute_daily(trader_df, dataset_key)
+        if rollups is None:
+            with perf.span("rollups"):
+                rollups = compute_rollups(trader_df, dataset_key)
+        merged_df = merge_sentiment(daily_df, sentiment_df)
         
         # Fetch BTC prices
-        btc_daily = get_crypto_prices(coin="bitcoin", days=365)
-        
-        if not btc_daily.empty:
-            btc_daily['date'] = pd.to_datetime(btc_daily['date']).dt.date
-            merged_df = merged_df.merge(btc_daily, on='date', how='left')
-            
-            # Compute BTC daily return
-            merged_df = merged_df.sort_values('date')
-            merged_df['btc_return'] = merged_df['bitcoin_close'].pct_change().fillna(0)
-        else:
-            merged_df['bitcoin_close'] = np.nan
-            merged_df['btc_return'] = 0
+        with perf.span("price_fetch"):
+            btc_daily = get_crypto_prices(coin="bitcoin", days=365)
+        merged_df = attach_btc_returns(merged_df, btc_daily)
     
     # -----------------------------------------------------------
     # FILTERS
     # -----------------------------------------------------------
-    st.sidebar.subheader("🔍 Filters")
+    with perf.span("filter"):
+        st.sidebar.subheader("🔍 Filters")
     
-    sentiment_options = merged_df['Sentiment'].unique().tolist()
-    sentiment_filter = st.sidebar.multiselect(
-        "Select Sentiment:", 
-        sentiment_options, 
-        default=sentiment_options
-    )
+        sentiment_options = merged_df['Sentiment'].unique().tolist()
+        sentiment_filter = st.sidebar.multiselect(
+            "Select Sentiment:", 
+            sentiment_options, 
+            default=sentiment_options
+        )
     
-    date_min = merged_df['date'].min()
-    date_max = merged_df['date'].max()
-    date_range = st.sidebar.date_input(
-        "Select Date Range:", 
-        [date_min, date_max],
-        min_value=date_min,
-        max_value=date_max
-    )
+        date_min = merged_df['date'].min()
+        date_max = merged_df['date'].max()
+        date_range = st.sidebar.date_input(
+            "Select Date Range:", 
+            [date_min, date_max],
+            min_value=date_min,
+            max_value=date_max
+        )
     
-    lev_min = float(merged_df['leverage'].min())
-    lev_max = float(merged_df['leverage'].max())
-    lev_range = st.sidebar.slider(
-        "Leverage Range:", 
-        lev_min, 
-        lev_max, 
-        (lev_min, lev_max)
-    )
+        lev_min = float(merged_df['leverage'].min())
+        lev_max = float(merged_df['leverage'].max())
+        lev_range = st.sidebar.slider(
+            "Leverage Range:", 
+            lev_min, 
+            lev_max, 
+            (lev_min, lev_max)
+        )
     
-    # Apply filters
-    filtered_df = merged_df[
-        (merged_df['Sentiment'].isin(sentiment_filter)) &
-        (merged_df['date'] >= date_range[0]) & 
-        (merged_df['date'] <= date_range[1]) &
-        (merged_df['leverage'].between(lev_range[0], lev_range[1]))
-    ]
+        # Apply filters
+        filtered_df = merged_df[
+            (merged_df['Sentiment'].isin(sentiment_filter)) &
+            (merged_df['date'] >= date_range[0]) & 
+            (merged_df['date'] <= date_range[1]) &
+            (merged_df['leverage'].between(lev_range[0], lev_range[1]))
+        ]
     
-    st.sidebar.success(f"✅ {len(filtered_df)} records after filtering")
+        st.sidebar.success(f"✅ {len(filtered_df)} records after filtering")
     
     # -----------------------------------------------------------
     # METRICS SECTION
     # -----------------------------------------------------------
     st.subheader("📊 Key Market Metrics")
-    col1, col2, col3, col4 = st.columns(4)
+    with perf.span("metrics"):
+        col1, col2, col3, col4 = st.columns(4)
     
-    avg_pnl = filtered_df['closedPnL'].mean()
-    avg_lev = filtered_df['leverage'].mean()
-    total_vol = filtered_df['size'].sum()
+        avg_pnl = filtered_df['closedPnL'].mean()
+        avg_lev = filtered_df['leverage'].mean()
+        total_vol = filtered_df['size'].sum()
     
-    col1.metric("💰 Avg PnL", f"${avg_pnl:.2f}")
-    col2.metric("📈 Avg Leverage", f"{avg_lev:.2f}x")
-    col3.metric("📊 Total Volume", f"${total_vol:,.0f}")
+        col1.metric("💰 Avg PnL", f"${avg_pnl:.2f}")
+        col2.metric("📈 Avg Leverage", f"{avg_lev:.2f}x")
+        col3.metric("📊 Total Volume", f"${total_vol:,.0f}")
     
-    if 'bitcoin_close' in filtered_df.columns and not filtered_df['bitcoin_close'].isna().all():
-        latest_btc = filtered_df['bitcoin_close'].iloc[-1]
-        col4.metric("₿ BTC Price", f"${latest_btc:,.2f}")
-    else:
-        col4.metric("₿ BTC Price", "N/A")
+        if 'bitcoin_close' in filtered_df.columns and not filtered_df['bitcoin_close'].isna().all():
+            latest_btc = filtered_df['bitcoin_close'].iloc[-1]
+            col4.metric("₿ BTC Price", f"${latest_btc:,.2f}")
+        else:
+            col4.metric("₿ BTC Price", "N/A")
     
     # -----------------------------------------------------------
     # INSIGHTS
@@ -483,38 +947,81 @@ def main():
     else:
         st.info("Not enough data to compare sentiment states.")
     
+    with perf.span("scenarios"):
+        render_scenario_simulator(merged_df, rollups, dataset_key, sentiment_key)
+    
     # -----------------------------------------------------------
     # VISUALS
     # -----------------------------------------------------------
     st.subheader("📈 Interactive Analytics")
     
-    tab1, tab2, tab3, tab4 = st.tabs([
+    tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs([
         "PnL Distribution", 
         "Leverage Correlation", 
         "Sentiment Timeline",
-        "BTC Price Overlay"
+        "BTC Price Overlay",
+        "Symbol / Trader Breakdown",
+        "Rolling Analytics",
+        "Zoomable Timeline"
     ])
     
-    with tab1:
+    with tab1, perf.span("chart.pnl_distribution"):
         fig1 = px.box(
             filtered_df, 
             x='Sentiment', 
             y='closedPnL', 
             color='Sentiment',
             title="PnL Distribution by Sentiment",
-            color_discrete_map={'Fear': '#ef4444', 'Greed': '#22c55e', 'Neutral': '#6b7280'}
+            color_discrete_map={
+                'Extreme Fear': '#b91c1c', 'Fear': '#ef4444', 'Neutral': '#6b7280',
+                'Greed': '#22c55e', 'Extreme Greed': '#15803d'
+            }
         )
         fig1.update_layout(showlegend=False)
         st.plotly_chart(fig1, use_container_width=True)
     
-    with tab2:
-        corr_data = filtered_df[['closedPnL', 'leverage', 'size']].corr()
-        fig2, ax = plt.subplots(figsize=(8, 6))
-        sns.heatmap(corr_data, annot=True, cmap='YlGnBu', ax=ax, fmt='.2f')
-        ax.set_title("Correlation Heatmap")
-        st.pyplot(fig2)
+    with tab2, perf.span("chart.correlation"):
+        cc1, cc2 = st.columns(2)
+        granularity = cc1.radio(
+            "Rows", ["Days", "Trades"], horizontal=True, key="corr_granularity",
+            help="Days: one row per day, with per-symbol and lagged features. "
+                 "Trades: each trade's PnL, leverage and size against its day's market context."
+        )
+        condition = cc2.selectbox("Sentiment", ["All selected"] + list(sentiment_filter), key="corr_condition")
+        
+        features = correlation_features(merged_df, sentiment_df, partition_daily if partition_keys else None)
+        day_sentiment = features['Sentiment']
+        days = day_sentiment.index[day_sentiment.index.isin(set(filtered_df['date']))]
+        if condition != "All selected":
+            days = days[(day_sentiment[days] == condition).to_numpy()]
+        
+        if granularity == "Trades":
+            features_key = int(pd.util.hash_pandas_object(features).sum())
+            acc = compute_trade_correlations(trader_df, features, dataset_key, features_key).total(days)
+        else:
+            columns = [c for c in features.columns if c != 'Sentiment']
+            acc = stream_covariance(iter_chunks(features.loc[days]), columns)
+        corr_data = acc.correlation().dropna(how='all').dropna(axis=1, how='all')
+        
+        if len(corr_data) > 1:
+            side = max(8, 0.3 * len(corr_data))
+            fig2, ax = plt.subplots(figsize=(side, side * 0.75))
+            sns.heatmap(
+                corr_data, annot=len(corr_data) <= ANNOTATE_MAX_FEATURES, cmap='YlGnBu',
+                vmin=-1, vmax=1, ax=ax, fmt='.2f'
+            )
+            ax.set_title(f"Correlation Heatmap ({condition})")
+            st.pyplot(fig2)
+            st.caption(
+                f"{len(corr_data)} features over {acc.rows:,} {granularity.lower()}; "
+                "missing values are dropped pair by pair."
+            )
+            st.write("**Strongest pairs:**")
+            st.dataframe(strongest_pairs(corr_data), hide_index=True, use_container_width=True)
+        else:
+            st.info("Not enough data in this selection to correlate.")
     
-    with tab3:
+    with tab3, perf.span("chart.timeline"):
         fig3 = px.line(
             filtered_df, 
             x='date', 
@@ -523,9 +1030,13 @@ def main():
             title="Daily PnL vs Sentiment",
             markers=True
         )
-        st.plotly_chart(fig3, use_container_width=True)
+        timeline_event = st.plotly_chart(
+            fig3, use_container_width=True, on_select="rerun", selection_mode="points", key="timeline_chart"
+        )
+        if st.toggle("🔎 Drill into a day's trades (click a point)", key="drilldown"):
+            render_trade_drilldown(get_trade_store(trader_df, dataset_key), timeline_event, date_min, date_max)
     
-    with tab4:
+    with tab4, perf.span("chart.btc_overlay"):
         if 'bitcoin_close' in filtered_df.columns and not filtered_df['bitcoin_close'].isna().all():
             # Create dual-axis chart
             fig4 = go.Figure()
@@ -558,6 +1069,88 @@ def main():
         else:
             st.info("BTC price data not available")
     
+    with tab5, perf.span("chart.breakdown"):
+        if partition_keys:
+            in_range = partition_daily[
+                (partition_daily['date'] >= date_range[0]) &
+                (partition_daily['date'] <= date_range[1])
+            ]
+            group_totals = in_range.groupby(partition_keys, observed=True).agg(
+                total_pnl=('pnl_sum', 'sum'),
+                total_volume=('size', 'sum'),
+                trades=('trades', 'sum')
+            ).reset_index()
+            
+            fig5 = px.bar(
+                group_totals,
+                x=partition_keys[0],
+                y='total_pnl',
+                color=partition_keys[-1] if len(partition_keys) > 1 else None,
+                barmode='group',
+                title=f"Total PnL by {' / '.join(partition_keys)}"
+            )
+            st.plotly_chart(fig5, use_container_width=True)
+            
+            st.write("**Risk by partition (full history):**")
+            st.dataframe(partition_risk, use_container_width=True)
+        else:
+            st.info("Upload trade data with `symbol` and/or `trader_type` columns to see the per-partition breakdown.")
+    
+    with tab6, perf.span("chart.rolling"):
+        windows = st.multiselect(
+            "Windows (days)", ROLLING_WINDOW_OPTIONS, default=[30, 90, 365], key="rolling_windows"
+        )
+        if windows:
+            rolling = get_rolling_stats(source_key, sentiment_key, sorted(windows), rolling_input(merged_df, sentiment_df))
+            metrics = rolling.frame.columns.get_level_values('metric').unique().tolist()
+            metric = st.selectbox("Statistic", metrics, key="rolling_metric")
+            
+            # Full history feeds the windows; the date filter only limits what is shown
+            series = rolling.frame.xs(metric, axis=1, level='metric')
+            shown_dates = series.index.date
+            series = series[(shown_dates >= date_range[0]) & (shown_dates <= date_range[1])]
+            long = series.rename(columns=lambda w: f"{w}d").reset_index().melt(
+                id_vars='date', var_name='window', value_name=metric
+            )
+            fig6 = px.line(long, x='date', y=metric, color='window', title=f"Rolling {metric}")
+            if metric.startswith('corr'):
+                fig6.update_yaxes(range=[-1, 1])
+            st.plotly_chart(fig6, use_container_width=True)
+            
+            latest = rolling.frame.iloc[-1].unstack('metric')
+            latest.index = [f"{w}d" for w in latest.index]
+            st.write("**Latest values:**")
+            st.dataframe(latest.round(3), use_container_width=True)
+        else:
+            st.info("Pick at least one window length.")
+    
+    with tab7, perf.span("chart.rollups"):
+        # Reads precomputed rollups: the level is the coarsest giving enough points for the range
+        zoom = st.date_input(
+            "Zoom range", [date_range[0], date_range[-1]], min_value=date_min, max_value=date_max, key="zoom_range"
+        )
+        if len(zoom) == 2:
+            zoom_start, zoom_end = pd.Timestamp(zoom[0]), pd.Timestamp(zoom[1]) + pd.Timedelta(days=1)
+            zoom_metric = st.selectbox("Metric", ROLLUP_METRICS, key="zoom_metric")
+            
+            query_start = time.perf_counter()
+            level, buckets = rollups.query(zoom_start, zoom_end, metrics=[zoom_metric])
+            totals = rollups.totals(zoom_start, zoom_end)
+            query_ms = (time.perf_counter() - query_start) * 1000
+            
+            if totals:
+                zc1, zc2, zc3, zc4 = st.columns(4)
+                zc1.metric("Trades", f"{totals['Trades']:,.0f}")
+                zc2.metric("Avg PnL / Trade", f"${totals['Avg PnL']:.2f}")
+                zc3.metric("Win Rate", f"{totals['Win Rate']:.1%}")
+                zc4.metric("Avg Leverage / Trade", f"{totals['Avg Leverage']:.2f}x")
+            
+            fig7 = px.line(buckets.reset_index(), x='time', y=zoom_metric, title=f"{zoom_metric} per {level}")
+            st.plotly_chart(fig7, use_container_width=True)
+            st.caption(f"{len(buckets):,} {level} buckets · queried in {query_ms:.1f} ms")
+        else:
+            st.info("Pick a start and an end date.")
+    
     # -----------------------------------------------------------
     # ML MODEL SECTION
     # -----------------------------------------------------------
@@ -568,7 +1161,7 @@ def main():
     
     col_ml1, col_ml2 = st.columns([2, 1])
     
-    with col_ml1:
+    with col_ml1, perf.span("ml.train"):
         if st.button("🔄 Train/Retrain Model", type="primary"):
             with st.spinner("Training Random Forest model..."):
                 try:
@@ -577,14 +1170,10 @@ def main():
                     if len(X) < 20:
                         st.warning("Not enough data to train model (need at least 20 samples)")
                     else:
-                        model, acc, clf_report, cm, X_train, X_test, y_train, y_test = train_and_evaluate_model(X, y)
+                        bundle, model, acc, cm = build_model_bundle(X, y, label_encoder, ml_df)
                         
                         # Save model
-                        joblib.dump({
-                            'model': model,
-                            'label_encoder': label_encoder,
-                            'feature_names': X.columns.tolist()
-                        }, model_path)
+                        save_bundle(bundle, model_path)
                         
                         st.success(f"✅ Model trained! Test accuracy: {acc:.2%}")
                         
@@ -608,34 +1197,62 @@ def main():
                 except Exception as e:
                     st.error(f"Error training model: {e}")
     
-    with col_ml2:
-        if os.path.exists(model_path):
+    with col_ml2, perf.span("ml.predict"):
+        inference_url = os.getenv(INFERENCE_URL_ENV)
+        prediction = None
+        rf_ms = None
+        
+        if inference_url:
+            try:
+                X, y, label_encoder, ml_df = prepare_ml_dataset(merged_df, n_lags=3)
+                X_next = ml_df.filter(regex='lag').tail(1)
+                if not X_next.empty:
+                    start = time.perf_counter()
+                    labels, probs, classes = predict_remote(inference_url, X_next)
+                    rf_ms = (time.perf_counter() - start) * 1000
+                    prediction = (labels[0], classes, probs[0])
+                    st.info("✅ Served by the inference service")
+            except Exception as e:
+                st.warning(f"Inference service unavailable, using local model: {e}")
+        
+        if prediction is None and os.path.exists(model_path):
             st.info("✅ Model loaded from disk")
             
             try:
-                model_bundle = joblib.load(model_path)
+                model_bundle = load_model_bundle(model_path, os.path.getmtime(model_path))
                 X, y, label_encoder, ml_df = prepare_ml_dataset(merged_df, n_lags=3)
                 
+                start = time.perf_counter()
                 pred_label, pred_prob = predict_next_day(
-                    model_bundle['model'],
+                    model_bundle.get('flat_model', model_bundle['model']),
                     model_bundle['label_encoder'],
                     ml_df,
                     n_lags=3
                 )
-                
-                st.metric("📅 Tomorrow's Prediction", pred_label)
-                
-                # Show probabilities
-                prob_df = pd.DataFrame({
-                    'Sentiment': model_bundle['label_encoder'].classes_,
-                    'Probability': pred_prob
-                })
-                st.dataframe(prob_df, use_container_width=True)
+                rf_ms = (time.perf_counter() - start) * 1000
+                prediction = (pred_label, model_bundle['label_encoder'].classes_, pred_prob)
                 
             except Exception as e:
                 st.warning(f"Could not make prediction: {e}")
-        else:
+        elif prediction is None:
             st.warning("⚠️ No trained model found. Click 'Train Model' to create one.")
+        
+        if prediction is not None:
+            pred_label, classes, pred_prob = prediction
+            st.metric("📅 Tomorrow's Prediction", pred_label)
+            
+            # Show probabilities
+            prob_df = pd.DataFrame({
+                'Sentiment': classes,
+                'Probability': pred_prob
+            })
+            st.dataframe(prob_df, use_container_width=True)
+        
+        with perf.span("ml.baseline"):
+            render_markov_baseline(merged_df, source_key, dataset_key, sentiment_key, model_path, rf_ms)
+    
+    with perf.span("ml.drift"):
+        render_drift_panel(model_path, source_key, sentiment_key, merged_df)
     
     # -----------------------------------------------------------
     # DOWNLOADABLES
@@ -644,9 +1261,10 @@ def main():
     
     col_exp1, col_exp2 = st.columns(2)
     
-    with col_exp1:
+    with col_exp1, perf.span("export.csv"):
         # CSV Export
-        csv_bytes = filtered_df.to_csv(index=False).encode('utf-8')
+        export_key = (dataset_key, tuple(sentiment_filter), tuple(date_range), tuple(lev_range))
+        csv_bytes = cached_export("csv_export", export_key, lambda: filtered_df.to_csv(index=False).encode('utf-8'))
         st.download_button(
             "⬇️ Download Cleaned Data (CSV)",
             csv_bytes,
@@ -655,7 +1273,7 @@ def main():
             use_container_width=True
         )
     
-    with col_exp2:
+    with col_exp2, perf.span("export.pdf"):
         # PDF Export
         if st.button("📥 Generate PDF Report", use_container_width=True):
             with st.spinner("Generating PDF..."):
@@ -679,6 +1297,19 @@ def main():
     st.divider()
     st.caption("🎯 Web3 MarketMind 4.0 | Powered by Streamlit | Data sources: CoinGecko, Binance")
     st.caption("⚠️ **Disclaimer:** This tool is for educational purposes only. Not financial advice.")
+    
+    if is_admin():
+        render_memory_panel()
+    
+    if perf.enabled():
+        render_performance_panel()
 
 if __name__ == "__main__":
-    main()
+    perf.begin_run(enabled=perf.PERF_ENV or st.session_state.get("perf_panel", False))
+    profiler = start_requested_profile()
+    try:
+        main()
+    finally:
+        if profiler is not None:
+            finish_profile(profiler)
+        perf.end_run(user=st.session_state.get("username"))
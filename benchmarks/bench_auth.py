@@ -0,0 +1,89 @@
+"""
+Rerun latency of the dashboard login path, before and after caching credentials.
+
+"before" is the old app.py flow: every script rerun bcrypt-hashes the demo
+password and builds a new `stauth.Authenticate`. "after" is the current
+flow: credentials are hashed once per process (`st.cache_resource`) and each
+session keeps its authenticator in `st.session_state`.
+
+Each variant logs in once through the form, then times `--reruns` reruns of
+the logged-in session with Streamlit's AppTest harness.
+
+Usage:
+    python -m benchmarks.bench_auth
+    python -m benchmarks.bench_auth --reruns 50
+"""
+
+import argparse
+import time
+
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+
+def before_script():
+    import streamlit as st
+    import streamlit_authenticator as stauth
+
+    credentials = {"usernames": {"demo_user": {
+        "name": "Demo User", "email": "demo@example.com", "password": stauth.Hasher.hash("demo")
+    }}}
+    authenticator = stauth.Authenticate(credentials, "marketmind_auth", "abcdef", 7)
+    authenticator.login()
+    st.write(st.session_state["authentication_status"])
+
+
+def after_script():
+    import streamlit as st
+    import streamlit_authenticator as stauth
+
+    from src.credentials import load_credentials
+
+    @st.cache_resource
+    def load_app_credentials():
+        return load_credentials({"usernames": {"demo_user": {
+            "name": "Demo User", "email": "demo@example.com", "password": "demo"
+        }}})
+
+    credentials = load_app_credentials()
+    if "authenticator" not in st.session_state:
+        st.session_state["authenticator"] = stauth.Authenticate(
+            credentials, "marketmind_auth", "abcdef", 7, auto_hash=False
+        )
+    st.session_state["authenticator"].login()
+    st.write(st.session_state["authentication_status"])
+
+
+def time_reruns(script, reruns):
+    at = AppTest.from_function(script, default_timeout=60)
+    at.run()
+    at.text_input[0].input("demo_user")
+    at.text_input[1].input("demo")
+    at.button[0].click().run()
+    if at.exception or at.session_state["authentication_status"] is not True:
+        raise RuntimeError(f"Login failed in {script.__name__}: {[e.value for e in at.exception]}")
+
+    timings = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        at.run()
+        timings.append(time.perf_counter() - start)
+    return np.array(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark login rerun latency before/after credential caching")
+    parser.add_argument("--reruns", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'variant':<8} {'p50':>10} {'p95':>10} {'max':>10}")
+    results = {}
+    for name, script in (("before", before_script), ("after", after_script)):
+        ms = time_reruns(script, args.reruns)
+        results[name] = np.median(ms)
+        print(f"{name:<8} {np.median(ms):>8.1f}ms {np.percentile(ms, 95):>8.1f}ms {ms.max():>8.1f}ms")
+    print(f"\n⚡ Median rerun {results['before'] / results['after']:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Load time of the same trade log stored as CSV, Parquet and Arrow IPC.
+
+Writes each tier's synthetic trades in all three formats, then times
+`read_trades` (column projection, memory-mapped for Parquet/Arrow) and
+`read_trades` + `clean_trader_data` (which includes parsing the `time`
+column) against the old path, a full `pd.read_csv`. Each timing is the best of
+`--repeat` runs, so the OS page cache is warm for every format.
+
+Usage:
+    python -m benchmarks.bench_formats
+    python -m benchmarks.bench_formats --tiers tiny small medium --repeat 5
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from src.data_io import read_trades
+from src.data_preprocessing import clean_trader_data
+from src.synthetic_data import SIZE_TIERS, default_days, iter_chunks, write_dataset
+
+FORMATS = {'csv': '.csv', 'parquet': '.parquet', 'arrow': '.arrow'}
+
+
+def best_time(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def write_fixtures(tier, workdir, seed=42):
+    """Write the tier's trades once per format; returns {fmt: (path, size in MB)}"""
+    n_rows = SIZE_TIERS[tier]
+    paths = {}
+    for fmt, ext in FORMATS.items():
+        path = os.path.join(workdir, f'trades_{tier}{ext}')
+        chunks = iter_chunks(n_rows, days=default_days(n_rows), seed=seed, workers=os.cpu_count() or 1)
+        write_dataset(path, chunks, fmt=fmt)
+        paths[fmt] = (path, os.path.getsize(path) / 1e6)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark trade log load time per file format")
+    parser.add_argument("--tiers", nargs='+', default=['tiny', 'small', 'medium'], choices=list(SIZE_TIERS))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for tier in args.tiers:
+            paths = write_fixtures(tier, workdir)
+            csv_path = paths['csv'][0]
+            baseline = best_time(lambda: pd.read_csv(csv_path), args.repeat)
+            baseline_clean = best_time(lambda: clean_trader_data(pd.read_csv(csv_path)), args.repeat)
+
+            print(f"\n{tier} ({SIZE_TIERS[tier]:,} rows)")
+            print(f"{'path':<22} {'size':>9} {'read':>10} {'read+clean':>12} {'vs csv':>8}")
+            print(f"{'pd.read_csv (before)':<22} {paths['csv'][1]:>7.1f}MB {baseline * 1000:>8.1f}ms "
+                  f"{baseline_clean * 1000:>10.1f}ms {'1.0x':>8}")
+            for fmt, (path, size_mb) in paths.items():
+                read = best_time(lambda: read_trades(path), args.repeat)
+                read_clean = best_time(lambda: clean_trader_data(read_trades(path)), args.repeat)
+                print(f"{'read_trades ' + fmt:<22} {size_mb:>7.1f}MB {read * 1000:>8.1f}ms "
+                      f"{read_clean * 1000:>10.1f}ms {baseline_clean / read_clean:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
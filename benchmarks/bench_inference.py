@@ -0,0 +1,72 @@
+"""
+Compare sklearn RandomForest inference with the flattened FlatForest path.
+
+Trains the app's model on synthetic data, checks that both paths return the
+same probabilities and labels, then times predict + predict_proba (sklearn)
+against one predict_with_proba pass (flat) for several batch sizes.
+
+Usage:
+    python -m benchmarks.bench_inference
+    python -m benchmarks.bench_inference --rows 1 10 100 1000 --repeat 50
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.run_benchmarks import synthetic_btc_prices
+from src.data_preprocessing import (
+    aggregate_daily,
+    attach_btc_returns,
+    clean_sentiment_data,
+    clean_trader_data,
+    merge_sentiment,
+)
+from src.forest_inference import FlatForest
+from src.sentimental_analysis import prepare_ml_dataset, train_and_evaluate_model
+from src.synthetic_data import generate_sentiment, generate_trades
+
+DAYS = 1000
+
+
+def build_model():
+    trades = clean_trader_data(generate_trades(250_000, days=DAYS))
+    merged = merge_sentiment(aggregate_daily(trades), clean_sentiment_data(generate_sentiment(DAYS)))
+    merged = attach_btc_returns(merged, synthetic_btc_prices(DAYS))
+    X, y, _, _ = prepare_ml_dataset(merged, n_lags=3)
+    return train_and_evaluate_model(X, y)[0], X
+
+
+def best_time(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark flattened forest inference against sklearn")
+    parser.add_argument("--rows", nargs='+', type=int, default=[1, 10, 100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    model, X = build_model()
+    flat = FlatForest.from_sklearn(model)
+    diff = flat.verify(model, X)
+    print(f"✅ Flat forest matches sklearn on {len(X)} rows (max |Δp| = {diff:.1e})")
+
+    pool = np.vstack([X.to_numpy()] * (max(args.rows) // len(X) + 1))
+    print(f"\n{'rows':>8} {'sklearn':>12} {'flat':>12} {'speedup':>9}")
+    for n in args.rows:
+        batch = pd.DataFrame(pool[:n], columns=X.columns)
+        sk = best_time(lambda: (model.predict(batch), model.predict_proba(batch)), args.repeat)
+        fl = best_time(lambda: flat.predict_with_proba(pool[:n]), args.repeat)
+        print(f"{n:>8} {sk * 1000:>10.2f}ms {fl * 1000:>10.2f}ms {sk / fl:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+"""
+Equivalence checks for the incremental and streaming numeric code.
+
+Each check compares a fast path with a slow reference on seeded synthetic
+data (or with an identity that must hold exactly) and fails past a fixed
+tolerance, so a regression shows up as a failed check rather than as a
+subtly wrong chart.
+
+Usage:
+    python -m benchmarks.check_numerics              # every check
+    python -m benchmarks.check_numerics --only scenario_short_is_minus_long
+"""
+
+import argparse
+import io
+import os
+import sys
+import tempfile
+import zipfile
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import Ridge
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from src.data_preprocessing import aggregate_daily, clean_trader_data
+from src.ingest import ingest_trades
+from src.markov_baseline import MarkovBaseline
+from src.online_ridge import OnlineRidge
+from src.rolling_stats import RollingStats
+from src.rollups import LEVELS, build_pyramid, merge_pyramids
+from src.scenario_simulator import ScenarioResult, ScenarioSimulator
+from src.streaming_cov import CovarianceAccumulator, GroupedCovariance, iter_chunks, stream_covariance
+from src.synthetic_data import generate_trades
+
+CHECKS = {}
+
+
+def check(fn):
+    CHECKS[fn.__name__] = fn
+    return fn
+
+
+def assert_close(name, actual, expected, atol):
+    actual, expected = np.asarray(actual, dtype=np.float64), np.asarray(expected, dtype=np.float64)
+    if actual.shape != expected.shape:
+        raise AssertionError(f"{name}: shape {actual.shape} != {expected.shape}")
+    if not np.array_equal(np.isnan(actual), np.isnan(expected)):
+        raise AssertionError(f"{name}: NaNs in different places")
+    err = np.nanmax(np.abs(actual - expected)) if actual.size and not np.isnan(actual).all() else 0.0
+    if err > atol:
+        raise AssertionError(f"{name}: max abs error {err:.3g} > {atol:.0e}")
+    return err
+
+
+# -----------------------------------------------------------
+# INGESTION
+# -----------------------------------------------------------
+@check
+def ingest_partials_match_aggregate():
+    """Per-file partials of interleaved files and a zip combine to `aggregate_daily` of the whole log"""
+    rng = np.random.default_rng(5)
+    log = generate_trades(6_000, days=20, seed=5)
+    log.loc[rng.choice(len(log), 50, replace=False), 'leverage'] = 0.0  # dropped by the cleaning
+    log.loc[rng.choice(len(log), 50, replace=False), 'closedPnL'] = np.nan
+    # Round-robin rows over four files, so every day is split across all of them
+    parts = [log.iloc[i::4] for i in range(4)]
+
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w') as zf:
+        zf.writestr('2024/part-2.csv', parts[2].to_csv(index=False))
+        zf.writestr('2024/part-3.csv', parts[3].to_csv(index=False))
+        zf.writestr('__MACOSX/2024/._part-3.csv', b'junk')
+    parquet = io.BytesIO()
+    parts[1].to_parquet(parquet, index=False)
+    files = [
+        ('part-0.csv', parts[0].to_csv(index=False).encode()),
+        ('part-1.parquet', parquet.getvalue()),
+        ('parts.zip', archive.getvalue()),
+    ]
+    result = ingest_trades(files, n_workers=1)
+
+    expected = aggregate_daily(clean_trader_data(pd.concat(parts, ignore_index=True)))
+    daily = result['daily']
+    assert_close("files", len(result['files']), 4, 0)
+    assert_close("rows", len(result['trades']), len(clean_trader_data(log)), 0)
+    if list(daily['date']) != list(expected['date']):
+        raise AssertionError("daily: dates differ")
+    for col in ['closedPnL', 'leverage', 'size']:
+        scale = np.abs(expected[col]).max()
+        assert_close(f"daily {col}", daily[col] / scale, expected[col] / scale, 1e-12)
+
+
+# -----------------------------------------------------------
+# MARKOV BASELINE
+# -----------------------------------------------------------
+@check
+def markov_extend_matches_fit():
+    """MarkovBaseline extended day by day, or by `update_from` in blocks, equals `fit` on the full history"""
+    rng = np.random.default_rng(13)
+    n = 900
+    classes = ['Extreme Fear', 'Fear', 'Neutral', 'Greed', 'Extreme Greed']
+    history = pd.DataFrame({
+        'date': pd.date_range('2022-01-01', periods=n),
+        'Sentiment': rng.choice(classes, n),
+        'btc_return': rng.normal(0, 0.03, n),
+    })
+    history.loc[rng.random(n) < 0.05, 'btc_return'] = np.nan  # missing prices fall in the middle bucket
+    fitted = MarkovBaseline.fit(history['Sentiment'], history['btc_return'], history['date'])
+
+    by_day = MarkovBaseline(fitted.classes, fitted.edges)
+    for i in range(n):
+        row = history.iloc[i:i + 1]
+        by_day.extend(row['Sentiment'], row['btc_return'], row['date'])
+    by_block = MarkovBaseline(fitted.classes, fitted.edges)
+    for stop in (1, 250, 251, 700, n, n):  # a repeated stop absorbs nothing
+        by_block.update_from(history.iloc[:stop].sample(frac=1, random_state=stop))
+
+    # Reference: one count per consecutive pair of days, filed under the earlier day's bucket
+    states = np.array([fitted.classes.index(label) for label in history['Sentiment']])
+    buckets = np.searchsorted(fitted.edges, np.nan_to_num(history['btc_return'].to_numpy()), side='right')
+    expected = np.zeros_like(fitted.counts)
+    for t in range(1, n):
+        expected[buckets[t - 1], states[t - 1], states[t]] += 1
+
+    for label, model in [('fit', fitted), ('day by day', by_day), ('update_from blocks', by_block)]:
+        assert_close(f"{label} counts", model.counts, expected, 0)
+        assert_close(f"{label} matrices", model.matrices, fitted.matrices, 1e-15)
+        assert_close(f"{label} last day", [model.last_state, model.last_bucket], [states[-1], buckets[-1]], 0)
+        if model.last_date != history['date'].iloc[-1]:
+            raise AssertionError(f"{label}: last_date {model.last_date}")
+
+
+# -----------------------------------------------------------
+# ONLINE RIDGE
+# -----------------------------------------------------------
+@check
+def online_ridge_matches_sklearn():
+    """OnlineRidge fitted in one batch, in chunks and row by row equals StandardScaler + Ridge"""
+    rng = np.random.default_rng(0)
+    n, p = 600, 8
+    X = rng.normal(50, 10, (n, p)) * rng.uniform(0.01, 100, p)
+    X[:, 3] = 7.0  # a constant feature keeps scale 1, as in StandardScaler
+    y = X @ rng.normal(size=p) + rng.normal(0, 5, n)
+    names = [f"f{i}" for i in range(p)]
+    reference = Pipeline([('scaler', StandardScaler()), ('ridge', Ridge(alpha=2.0))]).fit(X, y)
+    ridge = reference.named_steps['ridge']
+
+    batch = OnlineRidge(names, alpha=2.0).partial_fit(X, y)
+    chunked = OnlineRidge(names, alpha=2.0)
+    for lo in range(0, n, 97):
+        chunked.partial_fit(X[lo:lo + 97], y[lo:lo + 97])
+    rows = OnlineRidge(names, alpha=2.0)
+    for i in range(n):
+        rows.partial_fit(X[i], y[i:i + 1])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'ridge.npz')
+        rows.save(path)
+        reloaded = OnlineRidge.load(path)
+
+    for label, model in [('batch', batch), ('chunked', chunked), ('row by row', rows), ('reloaded', reloaded)]:
+        assert_close(f"{label} coef", model.coef_, ridge.coef_, 1e-8 * np.abs(ridge.coef_).max())
+        assert_close(f"{label} intercept", model.intercept_, ridge.intercept_, 1e-8 * abs(ridge.intercept_))
+        assert_close(f"{label} predict", model.predict(X), reference.predict(X), 1e-8 * np.abs(y).max())
+
+
+# -----------------------------------------------------------
+# ROLLING STATISTICS
+# -----------------------------------------------------------
+@check
+def rolling_stats_match_pandas():
+    """RollingStats over bulk blocks and single-row appends (past a resync) equals pandas `rolling()`"""
+    rng = np.random.default_rng(1)
+    n = 1_200
+    df = pd.DataFrame({
+        'a': 1e4 + np.cumsum(rng.normal(0, 1, n)),  # a large offset exercises the centring
+        'b': rng.normal(0, 0.02, n),
+        'c': rng.normal(5, 1, n),
+    }, index=pd.date_range('2022-01-01', periods=n, name='date'))
+    windows, min_periods = (7, 30, 90), 10
+    stats = RollingStats(
+        ['a', 'b', 'c'], windows=windows, corr_pairs=[('a', 'b'), ('b', 'c')], sharpe=['b'], zscore=['c'],
+        min_periods=min_periods,
+    )
+    stats.extend(df.iloc[:500])
+    stats.extend(df.iloc[500:620])
+    for i in range(620, n):  # more appends than the capacity, so the running sums resync
+        stats.extend(df.iloc[i:i + 1])
+    frame = stats.frame
+
+    for w in windows:
+        roll = df.rolling(w, min_periods=min(min_periods, w))
+        mean, std = roll.mean(), roll.std()
+        expected = {
+            'corr(a, b)': roll['a'].corr(df['b']),
+            'corr(b, c)': roll['b'].corr(df['c']),
+            'sharpe(b)': mean['b'] / std['b'] * np.sqrt(365),
+            'zscore(c)': (df['c'] - mean['c']) / std['c'],
+        }
+        for metric, reference in expected.items():
+            assert_close(f"{w}d {metric}", frame[(w, metric)].to_numpy(), reference.to_numpy(), 1e-7)
+
+
+# -----------------------------------------------------------
+# ROLLUPS
+# -----------------------------------------------------------
+@check
+def merged_pyramids_match_single():
+    """`merge_pyramids` of per-split pyramids equals one `build_pyramid` of all trades, level by level"""
+    rng = np.random.default_rng(9)
+    trades = clean_trader_data(generate_trades(20_000, days=40, seed=9))
+    # Uneven random splits, so hours, days and weeks straddle several of them
+    split_of = rng.integers(0, 5, len(trades))
+    splits = [trades[split_of == i] for i in range(5)]
+    splits.append(trades.iloc[:1])  # a repeated trade: its minute is in two splits
+    whole = build_pyramid(pd.concat(splits, ignore_index=True))
+    merged = merge_pyramids(build_pyramid(split) for split in splits)
+
+    assert_close("trades", len(merged), len(whole), 0)
+    for level in LEVELS:
+        actual, expected = merged.levels[level], whole.levels[level]
+        if not actual.index.equals(expected.index) or list(actual.columns) != list(expected.columns):
+            raise AssertionError(f"{level}: buckets or columns differ")
+        for col in expected.columns:
+            scale = max(np.abs(expected[col]).max(), 1.0)
+            assert_close(f"{level} {col}", actual[col] / scale, expected[col] / scale, 1e-12)
+
+
+# -----------------------------------------------------------
+# SCENARIO SIMULATOR
+# -----------------------------------------------------------
+@check
+def scenario_short_is_minus_long():
+    """A fixed-notional short's path return is minus the long's on the same draws"""
+    rng = np.random.default_rng(7)
+    returns = rng.normal(0, 0.04, 400)
+    regimes = rng.choice(['Fear', 'Greed', 'Neutral'], 400)
+
+    # +10% then -10%: the long loses 1%, a fixed short gains 1%
+    two_days = ScenarioSimulator([0.1, -0.1], ['Fear', 'Fear'], horizon=2, leverages=[1], markov=False, side=-1)
+    two_days._paths = lambda n, start, rng: np.tile([0.1, -0.1], (n, 1))
+    summary = two_days.simulate_chunk(10, 0, 0).summary()
+    assert_close("short +10%/-10%", summary['p50'], [0.01], 2e-3)
+
+    # Same seed, same draws: without liquidations the short's outcomes mirror the long's
+    long = ScenarioSimulator(returns, regimes, horizon=10, leverages=[1], side=1).simulate_chunk(5_000, 0, 3)
+    short = ScenarioSimulator(returns, regimes, horizon=10, leverages=[1], side=-1).simulate_chunk(5_000, 0, 3)
+    assert_close("short vs long liquidations", np.r_[long.liquidated, short.liquidated], [0, 0], 0)
+    long, short = long.summary(), short.summary()
+    assert_close("short vs long mean", short['mean'], -long['mean'], 2e-3)
+    assert_close("short vs long median", short['p50'], -long['p50'], 2e-3)
+
+
+@check
+def scenario_summary_matches_exact():
+    """Histogram percentiles, VaR/ES and liquidation odds match the exact ones of the simulated paths"""
+    rng = np.random.default_rng(11)
+    returns = rng.normal(0.001, 0.03, 500)
+    regimes = rng.choice(['Fear', 'Greed'], 500)
+    simulator = ScenarioSimulator(returns, regimes, horizon=30, leverages=[1, 2, 5])
+    n, seed = 20_000, 5
+    result = simulator.simulate_chunk(n, 0, seed)
+
+    # The same draws, with outcomes kept path by path
+    path = np.cumprod(1 + simulator._paths(n, 0, np.random.default_rng(seed)), axis=1) - 1
+    leverage = np.array(simulator.leverages, dtype=np.float64)[:, None]
+    liquidated = path.min(axis=1)[None, :] <= -(1 / leverage - simulator.maintenance_margin)
+    final = np.where(liquidated, -1.0, leverage * path[None, :, -1])
+
+    summary = result.summary()
+    # Bins are 0.2% wide in log equity, so a value is off by at most half a bin: ~0.1% of equity
+    tol = 1e-3 * (1 + final.max())
+    assert_close("liquidation_prob", summary['liquidation_prob'], liquidated.mean(axis=1), 0)
+    assert_close("mean", summary['mean'], final.mean(axis=1), tol)
+    for p in (1, 5, 25, 50, 75, 95, 99):
+        assert_close(f"p{p}", summary[f'p{p}'], np.quantile(final, p / 100, axis=1, method='inverted_cdf'), tol)
+    worst = np.sort(final, axis=1)[:, :int(0.05 * n)]
+    assert_close("var_95", summary['var_95'], -worst[:, -1], tol)
+    assert_close("es_95", summary['es_95'], -worst.mean(axis=1), tol)
+
+    # Merging histograms of two halves equals one histogram of all paths
+    whole = ScenarioResult(simulator.leverages)
+    whole.add(final, liquidated)
+    first, second = ScenarioResult(simulator.leverages), ScenarioResult(simulator.leverages)
+    first.add(final[:, :7_000], liquidated[:, :7_000])
+    second.add(final[:, 7_000:], liquidated[:, 7_000:])
+    merged = first.merge(second)
+    assert_close("merged counts", merged.counts, whole.counts, 0)
+    assert_close("merged summary", merged.summary(), whole.summary(), 0)
+    assert_close("chunk vs path-by-path", result.counts, whole.counts, 0)
+
+
+# -----------------------------------------------------------
+# STREAMING COVARIANCE
+# -----------------------------------------------------------
+@check
+def streaming_cov_matches_pandas():
+    """Chunked, merged and grouped accumulators equal pandas `corr`/`cov` with pairwise NaNs"""
+    rng = np.random.default_rng(3)
+    n, k = 20_000, 12
+    X = rng.normal(size=(n, k)) @ rng.normal(size=(k, k)) + 1e6  # large offset: precision of the centring
+    X[rng.random((n, k)) < 0.1] = np.nan
+    X[rng.random(n) < 0.5, 5] = np.nan  # a sparse column, so pair counts differ a lot
+    df = pd.DataFrame(X, columns=[f"c{i}" for i in range(k)])
+    corr, cov = df.corr(min_periods=3).to_numpy(), df.cov(min_periods=3).to_numpy()
+
+    single = CovarianceAccumulator.from_chunk(X, df.columns)
+    streamed = stream_covariance(iter_chunks(df, 1_234), df.columns)
+    halves = CovarianceAccumulator(df.columns).update(X[:8_000]).merge(
+        CovarianceAccumulator(df.columns).update(X[8_000:])
+    )
+    for label, acc in [('one chunk', single), ('streamed', streamed), ('merged halves', halves)]:
+        assert_close(f"{label} corr", acc.correlation().to_numpy(), corr, 1e-9)
+        assert_close(f"{label} cov", acc.covariance().to_numpy() / np.nanmax(np.abs(cov)), cov / np.nanmax(np.abs(cov)), 1e-9)
+        assert_close(f"{label} count", acc.count().to_numpy(), df.notna().astype(int).T @ df.notna().astype(int), 0)
+        assert_close(f"{label} means", acc.means().to_numpy(), df.mean().to_numpy(), 1e-6)
+
+    # Grouped by key in one pass: any subset of keys merges to that subset's matrix
+    df['key'] = rng.integers(0, 30, n)
+    grouped = stream_covariance(iter_chunks(df, 5_000), df.columns[:k], key='key')
+    subset = [2, 3, 17, 29]
+    assert_close("grouped total", grouped.total().correlation().to_numpy(), corr, 1e-9)
+    assert_close(
+        "grouped subset", grouped.total(subset).correlation().to_numpy(),
+        df[df['key'].isin(subset)].iloc[:, :k].corr(min_periods=3).to_numpy(), 1e-9,
+    )
+    by_parity = grouped.by_label({key: key % 2 for key in range(30)})
+    assert_close(
+        "grouped by label", by_parity[1].correlation().to_numpy(),
+        df[df['key'] % 2 == 1].iloc[:, :k].corr(min_periods=3).to_numpy(), 1e-9,
+    )
+    other = GroupedCovariance(df.columns[:k]).update(X[:100], df['key'].to_numpy()[:100])
+    again = GroupedCovariance(df.columns[:k]).update(X[:50], df['key'].to_numpy()[:50])
+    again.merge(GroupedCovariance(df.columns[:k]).update(X[50:100], df['key'].to_numpy()[50:100]))
+    assert_close("grouped merge", again.total().comoment, other.total().comoment, 1e-6 * np.abs(other.total().comoment).max())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check incremental/streaming numerics against reference computations")
+    parser.add_argument("--only", nargs="+", choices=sorted(CHECKS), help="run only these checks")
+    args = parser.parse_args()
+
+    failed = []
+    for name in args.only or CHECKS:
+        try:
+            CHECKS[name]()
+            print(f"✅ {name}")
+        except AssertionError as e:
+            print(f"❌ {name}: {e}")
+            failed.append(name)
+    print(f"\n{len(CHECKS if not args.only else args.only) - len(failed)} passed, {len(failed)} failed")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
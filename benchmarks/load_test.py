@@ -0,0 +1,391 @@
+"""
+Concurrent-session load test of the Streamlit apps.
+
+Drives `app_v4.py` and `app.py` headlessly with Streamlit's AppTest harness:
+N simulated sessions run at once on threads in this process, which is also
+how one Streamlit server runs its sessions. They share the process's
+`st.cache_*` caches, the GIL and the machine's cores. Each session runs a
+scripted visit, and the time of every rerun it triggers is recorded:
+
+- app_v4: open → login → sentiment filter → leverage filter → rolling
+  windows tab → timeline metric → trade drill-down → train → PDF export →
+  idle rerun.
+- app: open → login → Model page → About page → Dashboard page → idle
+  rerun.
+
+Streamlit renders every tab on each rerun, so "tab switches" in app_v4 are
+interactions with widgets inside the tabs. `requests.get` is stubbed with
+synthetic CoinGecko, Binance and Fear & Greed responses, optionally delayed
+by `--api-latency-ms`, so no network is used. The apps run in a temporary
+working directory, so models, secrets and stores don't touch the repo.
+
+For each concurrency level it reports p50/p95/p99/max rerun latency, reruns
+per second, process CPU (100% = one core busy) and peak RSS.
+
+Usage:
+    python -m benchmarks.load_test
+    python -m benchmarks.load_test --apps app_v4 --sessions 1 2 4 8 16 --iterations 2
+    python -m benchmarks.load_test --api-latency-ms 150 --steps
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from datetime import datetime
+from unittest import mock
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+DEFAULT_SESSIONS = [1, 2, 4, 8]
+SAMPLE_SECONDS = 0.05
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# -----------------------------------------------------------
+# NETWORK STUBS
+# -----------------------------------------------------------
+class StubResponse:
+    """Enough of `requests.Response` for src.market_data"""
+
+    def __init__(self, payload):
+        self._payload = payload
+        self.content = json.dumps(payload).encode()
+        self.status_code = 200
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        pass
+
+
+def _walk(n, seed, start=30000.0):
+    rng = np.random.default_rng(seed)
+    return start * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+
+
+def stub_payload(url, params):
+    """Synthetic CoinGecko / Binance / alternative.me payload for a request"""
+    params = params or {}
+    seed = zlib.crc32(url.encode())
+    now_ms = int(time.time() // 86400 * 86400 * 1000)
+    day_ms = 86_400_000
+    if 'coingecko' in url:
+        days = params.get('days', 365)
+        n = 2000 if days == 'max' else int(days) * 4  # 6-hourly points
+        prices = _walk(n, seed)
+        return {'prices': [[now_ms - (n - 1 - i) * day_ms // 4, float(p)] for i, p in enumerate(prices)]}
+    if 'binance' in url:
+        n = int(params.get('limit', 1000))
+        closes = _walk(n, seed)
+        return [[now_ms - (n - 1 - i) * day_ms, 0, 0, 0, str(c), 0] for i, c in enumerate(closes)]
+    if 'alternative.me' in url:
+        rng = np.random.default_rng(seed)
+        values = np.clip(50 + np.cumsum(rng.normal(0, 4, 1000)), 1, 99).astype(int)
+        return {'data': [{'timestamp': str((now_ms - i * day_ms) // 1000), 'value': str(v)}
+                         for i, v in enumerate(values)]}
+    raise ConnectionError(f"Unstubbed URL in load test: {url}")
+
+
+def make_stub_get(latency):
+    def get(url, params=None, timeout=None, **kwargs):
+        if latency:
+            time.sleep(latency)
+        return StubResponse(stub_payload(url, params))
+    return get
+
+
+# -----------------------------------------------------------
+# SCENARIOS
+# -----------------------------------------------------------
+def _labelled(widgets, text):
+    for widget in widgets:
+        if text in (widget.label or ''):
+            return widget
+    raise LookupError(f"No widget labelled {text!r}")
+
+
+def _login(username, password):
+    def step(at):
+        _labelled(at.text_input, "Username").input(username)
+        _labelled(at.text_input, "Password").input(password)
+        _labelled(at.button, "Login").click()
+    return step
+
+
+def _narrow_leverage(at):
+    slider = _labelled(at.slider, "Leverage Range")
+    lo, hi = slider.value
+    slider.set_value((lo, lo + (hi - lo) / 2))
+
+
+def _drop_one_sentiment(at):
+    select = _labelled(at.multiselect, "Select Sentiment")
+    select.set_value(select.value[:-1] or select.value)
+
+
+APP_V4_STEPS = [
+    ('open', lambda at: None),
+    ('login', _login('demo', 'demo123')),
+    ('filter.sentiment', _drop_one_sentiment),
+    ('filter.leverage', _narrow_leverage),
+    ('tab.rolling', lambda at: at.multiselect(key='rolling_windows').set_value([30, 90])),
+    ('tab.timeline', lambda at: at.selectbox(key='zoom_metric').set_value('Win Rate')),
+    ('tab.drilldown', lambda at: at.toggle(key='drilldown').set_value(True)),
+    ('train', lambda at: _labelled(at.button, "Train/Retrain").click()),
+    ('export.pdf', lambda at: _labelled(at.button, "Generate PDF").click()),
+    ('rerun', lambda at: None),
+]
+
+APP_STEPS = [
+    ('open', lambda at: None),
+    ('login', _login('demo_user', 'demo')),
+    ('page.model', lambda at: at.radio[0].set_value('Model')),
+    ('page.about', lambda at: at.radio[0].set_value('About')),
+    ('page.dashboard', lambda at: at.radio[0].set_value('Dashboard')),
+    ('rerun', lambda at: None),
+]
+
+SCENARIOS = {
+    'app_v4': ('app_v4.py', APP_V4_STEPS),
+    'app': ('app.py', APP_STEPS),
+}
+
+
+@contextlib.contextmanager
+def concurrent_apptest():
+    """Let AppTest instances run at the same time on several threads
+
+    Each `AppTest.run` installs a mock Streamlit runtime and config override
+    for its duration, then removes them, which breaks runs still in progress
+    on other threads. Here one mock runtime and the override stay in place
+    for the whole load test, as a real server's runtime would.
+    """
+    from streamlit import config
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.testing.v1 import app_test
+    from streamlit.testing.v1.util import build_mock_config_get_option
+
+    runtime = mock.MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    with mock.patch.object(Runtime, 'instance', classmethod(lambda cls: runtime)), \
+            mock.patch.object(Runtime, 'exists', classmethod(lambda cls: True)), \
+            mock.patch.object(config, 'get_option', build_mock_config_get_option({"global.appTest": True})), \
+            mock.patch.object(app_test, 'patch_config_options', lambda overrides: contextlib.nullcontext()):
+        yield
+
+
+def run_session(script, steps, timeout):
+    """One scripted visit; returns `(step, seconds, error)` per rerun"""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(script, default_timeout=timeout)
+    records = []
+    for name, prepare in steps:
+        try:
+            prepare(at)
+        except Exception as e:
+            records.append((name, None, f"{type(e).__name__}: {e}"))
+            break
+        start = time.perf_counter()
+        at.run()
+        elapsed = time.perf_counter() - start
+        error = at.exception[0].value if at.exception else None
+        records.append((name, elapsed, error))
+        if error:
+            break
+    return records
+
+
+# -----------------------------------------------------------
+# PROCESS METRICS
+# -----------------------------------------------------------
+def rss_mb():
+    """Current resident set size in MB (peak so far where /proc is unavailable)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if resource is None:
+        return float('nan')
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / (1024 if sys.platform == 'darwin' else 1)
+
+
+class Sampler:
+    """Samples RSS on a thread; CPU comes from the process's CPU time over the wall time"""
+
+    def __init__(self, interval=SAMPLE_SECONDS):
+        self.interval = interval
+        self.peak_rss = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak_rss = max(self.peak_rss, rss_mb())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.wall, self.cpu = time.perf_counter(), time.process_time()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_rss = max(self.peak_rss, rss_mb())
+        self.wall = time.perf_counter() - self.wall
+        self.cpu = time.process_time() - self.cpu
+
+
+# -----------------------------------------------------------
+# LOAD LEVELS
+# -----------------------------------------------------------
+def run_level(script, steps, sessions, iterations, timeout):
+    """Run `sessions` concurrent sessions, each doing `iterations` visits"""
+    records = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(sessions)
+
+    def worker():
+        barrier.wait()
+        for _ in range(iterations):
+            result = run_session(script, steps, timeout)
+            with lock:
+                records.extend(result)
+
+    threads = [threading.Thread(target=worker, name=f"session-{i}") for i in range(sessions)]
+    with Sampler() as sampler:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    return records, sampler
+
+
+def summarize(records, sampler, sessions):
+    ms = np.array([r[1] for r in records if r[1] is not None]) * 1000
+    errors = [r[2] for r in records if r[2]]
+    steps = {}
+    for name, seconds, _ in records:
+        if seconds is not None:
+            steps.setdefault(name, []).append(seconds * 1000)
+    return {
+        'sessions': sessions,
+        'reruns': len(ms),
+        'p50_ms': float(np.percentile(ms, 50)) if len(ms) else None,
+        'p95_ms': float(np.percentile(ms, 95)) if len(ms) else None,
+        'p99_ms': float(np.percentile(ms, 99)) if len(ms) else None,
+        'max_ms': float(ms.max()) if len(ms) else None,
+        'reruns_per_s': len(ms) / sampler.wall if sampler.wall else None,
+        'cpu_percent': 100 * sampler.cpu / sampler.wall if sampler.wall else None,
+        'peak_rss_mb': sampler.peak_rss,
+        'wall_s': sampler.wall,
+        'errors': len(errors),
+        'first_error': errors[0] if errors else None,
+        'steps_p50_ms': {name: float(np.median(v)) for name, v in steps.items()},
+    }
+
+
+def print_report(app, levels, show_steps):
+    print(f"\n{app}")
+    print(f"  {'sessions':>8} {'reruns':>7} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9} "
+          f"{'rerun/s':>8} {'CPU':>6} {'RSS':>8} {'errors':>6}")
+    for level in levels:
+        if not level['reruns']:
+            print(f"  {level['sessions']:>8} no reruns completed: {level['first_error']}")
+            continue
+        print(f"  {level['sessions']:>8} {level['reruns']:>7} {level['p50_ms']:>7.0f}ms {level['p95_ms']:>7.0f}ms "
+              f"{level['p99_ms']:>7.0f}ms {level['max_ms']:>7.0f}ms {level['reruns_per_s']:>8.2f} "
+              f"{level['cpu_percent']:>5.0f}% {level['peak_rss_mb']:>6.0f}MB {level['errors']:>6}")
+    if show_steps:
+        names = list(levels[0]['steps_p50_ms'])
+        print(f"\n  p50 per step (ms)  " + ' '.join(f"{level['sessions']:>8}" for level in levels))
+        for name in names:
+            cells = ' '.join(f"{level['steps_p50_ms'].get(name, float('nan')):>8.0f}" for level in levels)
+            print(f"  {name:<18} {cells}")
+    errors = [level['first_error'] for level in levels if level['first_error']]
+    if errors:
+        print(f"  ⚠️ first error: {errors[0]}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Concurrent-session load test of the Streamlit apps")
+    parser.add_argument("--apps", nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--sessions", nargs='+', type=int, default=DEFAULT_SESSIONS,
+                        help="Concurrency levels to run, in order")
+    parser.add_argument("--iterations", type=int, default=1, help="Visits per session at each level")
+    parser.add_argument("--api-latency-ms", type=float, default=0, help="Delay added to every stubbed API call")
+    parser.add_argument("--timeout", type=float, default=300, help="Per-rerun AppTest timeout (seconds)")
+    parser.add_argument("--no-warmup", action='store_true', help="Measure the cold first session too")
+    parser.add_argument("--steps", action='store_true', help="Also print p50 latency per scripted step")
+    parser.add_argument("--output", help="Result JSON path (default: benchmarks/results/load-<timestamp>.json)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    results = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'api_latency_ms': args.api_latency_ms,
+        'iterations': args.iterations,
+        'apps': {},
+    }
+    output = os.path.abspath(args.output or os.path.join(RESULTS_DIR, f"load-{datetime.now():%Y%m%d-%H%M%S}.json"))
+
+    cwd = os.getcwd()
+    sys.path.insert(0, REPO_DIR)
+    with tempfile.TemporaryDirectory() as workdir, \
+            mock.patch('requests.get', make_stub_get(args.api_latency_ms / 1000)), \
+            concurrent_apptest():
+        os.chdir(workdir)
+        try:
+            for app in args.apps:
+                script, steps = SCENARIOS[app]
+                script = os.path.join(REPO_DIR, script)
+                if not args.no_warmup:
+                    print(f"Warming up {app} caches...", flush=True)
+                    run_session(script, steps, args.timeout)
+                levels = []
+                for sessions in args.sessions:
+                    print(f"{app}: {sessions} concurrent session(s)...", flush=True)
+                    records, sampler = run_level(script, steps, sessions, args.iterations, args.timeout)
+                    levels.append(summarize(records, sampler, sessions))
+                results['apps'][app] = levels
+                print_report(app, levels, args.steps)
+        finally:
+            os.chdir(cwd)
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n📁 Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
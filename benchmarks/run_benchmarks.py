@@ -0,0 +1,312 @@
+"""
+End-to-end benchmark of the app_v4 pipeline on synthetic data.
+
+Every stage (CSV read → datetime parse → clean → daily groupby → merges →
+ML dataset → train → compile → predict → CSV/PDF export) is timed, then the pipeline is
+re-run under tracemalloc to record each stage's peak allocation. Results are
+written as JSON and can be compared against a baseline run using the
+per-stage limits in benchmarks/thresholds.json. Promote a known-good result
+to benchmarks/baseline.json to track it between releases.
+
+Usage:
+    python -m benchmarks.run_benchmarks                          # tiny/small/medium
+    python -m benchmarks.run_benchmarks --tiers tiny small medium large
+    python -m benchmarks.run_benchmarks --baseline benchmarks/baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.anomaly_and_report import create_pdf_report
+from src.data_preprocessing import (
+    aggregate_daily,
+    attach_btc_returns,
+    clean_sentiment_data,
+    clean_trader_data,
+    merge_sentiment,
+)
+from src.sentimental_analysis import (
+    compile_model,
+    predict_next_day,
+    prepare_ml_dataset,
+    train_and_evaluate_model,
+)
+from src.synthetic_data import (
+    DEFAULT_START,
+    SIZE_TIERS,
+    default_days,
+    generate_sentiment,
+    iter_chunks,
+    write_dataset,
+)
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+THRESHOLDS_PATH = os.path.join(BENCH_DIR, 'thresholds.json')
+DEFAULT_TIERS = ['tiny', 'small', 'medium']
+
+
+# -----------------------------------------------------------
+# FIXTURES
+# -----------------------------------------------------------
+def synthetic_btc_prices(days, seed=42):
+    """Offline stand-in for the CoinGecko daily close series"""
+    rng = np.random.default_rng(seed)
+    closes = 30_000 * np.exp(np.cumsum(rng.normal(0, 0.03, days)))
+    return pd.DataFrame({
+        'date': pd.date_range(DEFAULT_START, periods=days, freq='D').date,
+        'bitcoin_close': closes,
+    })
+
+
+def write_fixtures(tier, workdir, seed=42):
+    """Write the tier's trade and sentiment CSVs; returns their paths and day count"""
+    n_rows = SIZE_TIERS[tier]
+    days = default_days(n_rows)
+    trader_path = os.path.join(workdir, f'trades_{tier}.csv')
+    sentiment_path = os.path.join(workdir, f'sentiment_{tier}.csv')
+    if not os.path.exists(trader_path):
+        chunks = iter_chunks(n_rows, days=days, seed=seed, workers=os.cpu_count() or 1, as_csv=True)
+        write_dataset(trader_path, chunks, fmt='csv')
+        generate_sentiment(days, seed=seed).to_csv(sentiment_path, index=False)
+    return trader_path, sentiment_path, days
+
+
+# -----------------------------------------------------------
+# PIPELINE STAGES
+# -----------------------------------------------------------
+def stage_csv_read(ctx):
+    ctx['trader_df'] = pd.read_csv(ctx['trader_path'])
+    ctx['sentiment_df'] = pd.read_csv(ctx['sentiment_path'])
+
+
+def stage_datetime_parse(ctx):
+    ctx['trader_df']['time'] = pd.to_datetime(ctx['trader_df']['time'], errors='coerce')
+
+
+def stage_clean(ctx):
+    ctx['trader_df'] = clean_trader_data(ctx['trader_df'])
+    ctx['sentiment_df'] = clean_sentiment_data(ctx['sentiment_df'])
+
+
+def stage_daily_groupby(ctx):
+    ctx['daily_df'] = aggregate_daily(ctx['trader_df'])
+
+
+def stage_merge(ctx):
+    merged = merge_sentiment(ctx['daily_df'], ctx['sentiment_df'])
+    ctx['merged_df'] = attach_btc_returns(merged, ctx['btc_daily'])
+
+
+def stage_prepare_ml_dataset(ctx):
+    ctx['X'], ctx['y'], ctx['label_encoder'], ctx['ml_df'] = prepare_ml_dataset(ctx['merged_df'], n_lags=3)
+
+
+def stage_train_and_evaluate_model(ctx):
+    ctx['model'], _, _, _, _, ctx['X_test'], _, _ = train_and_evaluate_model(ctx['X'], ctx['y'])
+
+
+def stage_compile_model(ctx):
+    ctx['flat_model'] = compile_model(ctx['model'], ctx['X_test'])
+
+
+def stage_predict_next_day(ctx):
+    ctx['prediction'] = predict_next_day(ctx['flat_model'], ctx['label_encoder'], ctx['ml_df'], n_lags=3)
+
+
+def stage_csv_export(ctx):
+    ctx['csv_bytes'] = ctx['merged_df'].to_csv(index=False).encode('utf-8')
+
+
+def stage_pdf_export(ctx):
+    merged = ctx['merged_df']
+    metrics = {
+        "Total Records": len(merged),
+        "Average PnL": f"${merged['closedPnL'].mean():.2f}",
+        "Average Leverage": f"{merged['leverage'].mean():.2f}x",
+        "Total Volume": f"${merged['size'].sum():,.0f}",
+    }
+    ctx['pdf_bytes'] = create_pdf_report(merged, metrics)
+
+
+STAGES = [
+    ('csv_read', stage_csv_read),
+    ('datetime_parse', stage_datetime_parse),
+    ('clean', stage_clean),
+    ('daily_groupby', stage_daily_groupby),
+    ('merge', stage_merge),
+    ('prepare_ml_dataset', stage_prepare_ml_dataset),
+    ('train_and_evaluate_model', stage_train_and_evaluate_model),
+    ('compile_model', stage_compile_model),
+    ('predict_next_day', stage_predict_next_day),
+    ('csv_export', stage_csv_export),
+    ('pdf_export', stage_pdf_export),
+]
+
+
+def run_pipeline(trader_path, sentiment_path, btc_daily, measure_memory=False):
+    """Run every stage once; returns {stage: seconds} or {stage: peak MB}"""
+    ctx = {'trader_path': trader_path, 'sentiment_path': sentiment_path, 'btc_daily': btc_daily}
+    results = {}
+    if measure_memory:
+        tracemalloc.start()
+    try:
+        for name, stage in STAGES:
+            if measure_memory:
+                tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+                stage(ctx)
+                results[name] = (tracemalloc.get_traced_memory()[1] - base) / 1e6
+            else:
+                start = time.perf_counter()
+                stage(ctx)
+                results[name] = time.perf_counter() - start
+    finally:
+        if measure_memory:
+            tracemalloc.stop()
+    return results
+
+
+def bench_tier(tier, workdir, repeat=1, measure_memory=True):
+    """Benchmark one size tier: best-of-`repeat` timings plus one memory pass"""
+    trader_path, sentiment_path, days = write_fixtures(tier, workdir)
+    btc_daily = synthetic_btc_prices(days)
+
+    runs = [run_pipeline(trader_path, sentiment_path, btc_daily) for _ in range(repeat)]
+    peaks = run_pipeline(trader_path, sentiment_path, btc_daily, measure_memory=True) if measure_memory else {}
+
+    stages = {
+        name: {
+            'seconds': round(min(run[name] for run in runs), 6),
+            'peak_mb': round(peaks[name], 3) if name in peaks else None,
+        }
+        for name, _ in STAGES
+    }
+    return {
+        'rows': SIZE_TIERS[tier],
+        'days': days,
+        'file_mb': round(os.path.getsize(trader_path) / 1e6, 2),
+        'total_seconds': round(sum(s['seconds'] for s in stages.values()), 6),
+        'stages': stages,
+    }
+
+
+# -----------------------------------------------------------
+# REGRESSION CHECK
+# -----------------------------------------------------------
+def load_thresholds(path=THRESHOLDS_PATH):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(current, baseline, thresholds):
+    """List regressions of `current` against `baseline` as human-readable strings"""
+    defaults = thresholds['default']
+    regressions = []
+    for tier, result in current['tiers'].items():
+        base_tier = baseline['tiers'].get(tier)
+        if not base_tier:
+            continue
+        for stage, stats in result['stages'].items():
+            base = base_tier['stages'].get(stage)
+            if not base:
+                continue
+            limits = {**defaults, **thresholds.get('stages', {}).get(stage, {})}
+
+            allowed = max(base['seconds'] * limits['time_ratio'], base['seconds'] + limits['min_seconds'])
+            if stats['seconds'] > allowed:
+                regressions.append(
+                    f"{tier}/{stage}: {stats['seconds']:.3f}s > {allowed:.3f}s "
+                    f"(baseline {base['seconds']:.3f}s)"
+                )
+
+            if stats.get('peak_mb') is not None and base.get('peak_mb') is not None:
+                allowed_mb = max(base['peak_mb'] * limits['memory_ratio'], base['peak_mb'] + limits['min_mb'])
+                if stats['peak_mb'] > allowed_mb:
+                    regressions.append(
+                        f"{tier}/{stage}: peak {stats['peak_mb']:.1f} MB > {allowed_mb:.1f} MB "
+                        f"(baseline {base['peak_mb']:.1f} MB)"
+                    )
+    return regressions
+
+
+def print_report(results):
+    for tier, result in results['tiers'].items():
+        print(f"\n{tier}: {result['rows']:,} rows, {result['file_mb']} MB, {result['total_seconds']:.2f}s total")
+        for stage, stats in result['stages'].items():
+            peak = f"{stats['peak_mb']:>9.1f} MB" if stats['peak_mb'] is not None else ''
+            print(f"  {stage:<26} {stats['seconds']:>9.3f}s {peak}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the ingestion → merge → features → model pipeline")
+    parser.add_argument("--tiers", nargs='+', choices=SIZE_TIERS, default=DEFAULT_TIERS)
+    parser.add_argument("--repeat", type=int, default=1, help="Timing runs per tier (best is kept)")
+    parser.add_argument("--no-memory", action='store_true', help="Skip the tracemalloc pass")
+    parser.add_argument("--workdir", help="Where to keep generated fixtures (default: temp dir)")
+    parser.add_argument("--output", help="Result JSON path (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--baseline", help="Result JSON to compare against; exits 1 on regression")
+    parser.add_argument("--thresholds", default=THRESHOLDS_PATH)
+    args = parser.parse_args()
+    if args.baseline and not os.path.exists(args.baseline):
+        # Fail before the (long) run rather than after it
+        parser.error(
+            f"baseline {args.baseline} not found; run `make bench` on the reference machine and "
+            f"copy the result from {os.path.relpath(RESULTS_DIR)}/ to {args.baseline}"
+        )
+    return args
+
+
+def main():
+    args = parse_args()
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    results = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'tiers': {},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = args.workdir or tmp
+        os.makedirs(workdir, exist_ok=True)
+        for tier in args.tiers:
+            print(f"Benchmarking {tier} ({SIZE_TIERS[tier]:,} rows)...", flush=True)
+            results['tiers'][tier] = bench_tier(tier, workdir, args.repeat, not args.no_memory)
+
+    print_report(results)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n📁 Results written to {output}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, load_thresholds(args.thresholds))
+        if regressions:
+            print("\n❌ Performance regressions:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print("\n✅ No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,45 +1,74 @@
-import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
-
-print("Generating sample CSV file (approximately 150 MB)...")
-
-# Set random seed for reproducibility
-np.random.seed(42)
-
-# Generate approximately 750,000 rows for ~150MB file
-n_rows = 750000
-
-# Generate timestamps
-start_date = datetime(2020, 1, 1)
-dates = [start_date + timedelta(minutes=i) for i in range(n_rows)]
-
-# Generate sample trading data
-df = pd.DataFrame({
-    'timestamp': dates,
-    'symbol': np.random.choice(['BTC/USDT', 'ETH/USDT', 'BNB/USDT', 'SOL/USDT', 'ADA/USDT'], n_rows),
-    'open': np.random.uniform(20000, 70000, n_rows),
-    'high': np.random.uniform(20000, 70000, n_rows),
-    'low': np.random.uniform(20000, 70000, n_rows),
-    'close': np.random.uniform(20000, 70000, n_rows),
-    'volume': np.random.uniform(1000000, 10000000, n_rows),
-    'sentiment': np.random.choice(['Bullish', 'Bearish', 'Neutral', 'Extreme Greed', 'Extreme Fear'], n_rows),
-    'leverage': np.random.uniform(1, 100, n_rows),
-    'pnl': np.random.uniform(-10000, 10000, n_rows),
-    'trade_count': np.random.randint(1, 1000, n_rows),
-    'trader_type': np.random.choice(['Retail', 'Institutional', 'Whale', 'Market Maker'], n_rows),
-    'risk_score': np.random.uniform(0, 100, n_rows)
-})
-
-# Save to CSV
-output_file = 'sample_trading_data_150mb.csv'
-df.to_csv(output_file, index=False)
-
-# Get file size
+"""
+Generate synthetic trader/sentiment fixtures for demos and load testing.
+
+Examples:
+    python create_sample_csv.py                          # 750k rows, CSV (~150 MB)
+    python create_sample_csv.py --tier small             # 250k rows
+    python create_sample_csv.py --tier large --format parquet --workers 8
+    python create_sample_csv.py --rows 25000000 --output data/trades.arrow
+"""
+
+import argparse
 import os
-file_size_mb = os.path.getsize(output_file) / (1024 * 1024)
+import time
+
+from src.synthetic_data import (
+    DEFAULT_CHUNK_ROWS,
+    FORMATS,
+    SIZE_TIERS,
+    default_days,
+    format_from_path,
+    generate_sentiment,
+    iter_chunks,
+    write_dataset,
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate synthetic trade logs in CSV, Parquet or Arrow format")
+    parser.add_argument("--tier", choices=SIZE_TIERS, default="medium", help="Row count preset")
+    parser.add_argument("--rows", type=int, help="Explicit row count (overrides --tier)")
+    parser.add_argument("--days", type=int, help="Days of history to spread the trades over")
+    parser.add_argument("--format", choices=FORMATS, help="Output format (default: from --output, else csv)")
+    parser.add_argument("--output", help="Trade log path (default: sample_trading_data_<tier>.<ext>)")
+    parser.add_argument("--sentiment-output", help="Sentiment CSV path (default: next to the trade log)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Generator processes")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="Rows per generated chunk")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    n_rows = args.rows or SIZE_TIERS[args.tier]
+    days = args.days or default_days(n_rows)
+    label = str(n_rows) if args.rows else args.tier
+
+    fmt = args.format or (format_from_path(args.output) if args.output else 'csv')
+    output = args.output or f"sample_trading_data_{label}{FORMATS[fmt]}"
+    sentiment_output = args.sentiment_output or os.path.join(
+        os.path.dirname(output), f"sample_sentiment_data_{label}.csv"
+    )
+
+    print(f"Generating {n_rows:,} rows over {days} days ({fmt}, {args.workers} workers)...")
+    start = time.perf_counter()
+
+    chunks = iter_chunks(
+        n_rows, days=days, seed=args.seed, chunk_rows=args.chunk_rows,
+        workers=args.workers, as_csv=(fmt == 'csv')
+    )
+    rows = write_dataset(output, chunks, fmt=fmt)
+    generate_sentiment(days, seed=args.seed).to_csv(sentiment_output, index=False)
+
+    elapsed = time.perf_counter() - start
+    file_size_mb = os.path.getsize(output) / (1024 * 1024)
+
+    print(f"✅ Created {fmt} file: {output}")
+    print(f"✅ Created sentiment file: {sentiment_output}")
+    print(f"📊 Rows: {rows:,}")
+    print(f"📁 File size: {file_size_mb:.2f} MB")
+    print(f"⏱️ Elapsed: {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)")
+
 
-print(f"✅ Created CSV file: {output_file}")
-print(f"📊 Rows: {len(df):,}")
-print(f"📁 File size: {file_size_mb:.2f} MB")
-print(f"📋 Columns: {', '.join(df.columns)}")
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,51 @@
-import streamlit_authenticator as stauth
+"""
+Precompute bcrypt password hashes for the dashboards' login.
 
-# Generate password hashes using bcrypt directly
-import bcrypt
+Hashes are written to the `credentials` section of a YAML config (default:
+config.yaml, or $MARKETMIND_CREDENTIALS_FILE) that app.py and app_v4.py load at
+startup, so they never hash passwords themselves.
 
-passwords = {'demo123': 'demo123', 'admin123': 'admin123'}
+Examples:
+    python generate_hashes.py                       # demo/demo123 and admin/admin123
+    python generate_hashes.py --user alice "Alice" alice@example.com s3cret
+    python generate_hashes.py --print-only          # just print the hashes
+"""
 
-print("Generating password hashes...")
-for label, password in passwords.items():
-    hashed = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
-    print(f"{label}: {hashed}")
+import argparse
+
+from src.credentials import CREDENTIALS_FILE, hash_credentials, write_credentials_file
+
+DEFAULT_USERS = [
+    ("demo", "Demo User", "demo@example.com", "demo123"),
+    ("admin", "Admin User", "admin@example.com", "admin123"),
+]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate password hashes for the dashboard login")
+    parser.add_argument("--user", nargs=4, action="append", metavar=("USERNAME", "NAME", "EMAIL", "PASSWORD"),
+                        help="User to add; repeat for more (default: the demo and admin users)")
+    parser.add_argument("--output", default=CREDENTIALS_FILE, help=f"YAML config to write (default: {CREDENTIALS_FILE})")
+    parser.add_argument("--print-only", action="store_true", help="Print the hashes without writing a file")
+    args = parser.parse_args(argv)
+
+    credentials = {
+        "usernames": {
+            username: {"name": name, "email": email, "password": password}
+            for username, name, email, password in (args.user or DEFAULT_USERS)
+        }
+    }
+
+    print("Generating password hashes...")
+    if args.print_only:
+        credentials = hash_credentials(credentials)
+    else:
+        credentials = write_credentials_file(credentials, args.output)
+    for username, user in credentials["usernames"].items():
+        print(f"{username}: {user['password']}")
+    if not args.print_only:
+        print(f"📁 Credentials written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
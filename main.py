@@ -0,0 +1,213 @@
+"""
+Web3 MarketMind — headless batch pipeline.
+
+Runs the same clean → merge → train → predict → report flow as app_v4 over
+one or more trader/sentiment file pairs, concurrently on a process pool,
+without a browser.
+
+Examples:
+    python main.py --pair data/trades.csv data/sentiment.csv
+    python main.py --pair data/trades.parquet data/sentiment.parquet
+    python main.py --pair a_trades.csv a_sent.csv --pair b_trades.csv b_sent.csv \\
+        --output-dir out --workers 4
+    python main.py --pair trades.csv sentiment.csv --offline   # skip BTC price fetch
+
+Each pair gets its own directory under --output-dir with the merged dataset,
+model bundle, prediction and PDF report; summary.json collects the per-stage
+timings of every pair. The exit code is 1 if any pair failed.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from src import market_data, perf
+from src.anomaly_and_report import create_pdf_report
+from src.data_io import read_sentiment, read_trades
+from src.data_preprocessing import (
+    aggregate_daily,
+    attach_btc_returns,
+    clean_sentiment_data,
+    clean_trader_data,
+    merge_sentiment,
+)
+from src.drift_monitor import save_bundle
+from src.sentimental_analysis import build_model_bundle, predict_next_day, prepare_ml_dataset
+
+MIN_TRAINING_SAMPLES = 20
+
+
+# -----------------------------------------------------------
+# PIPELINE
+# -----------------------------------------------------------
+def run_pair(name, trader_path, sentiment_path, output_dir, btc_daily, n_lags=3):
+    """Run the full pipeline for one file pair; returns a result summary dict"""
+    perf.begin_run(enabled=True)
+    out_dir = os.path.join(output_dir, name)
+    os.makedirs(out_dir, exist_ok=True)
+    result = {'name': name, 'trader': trader_path, 'sentiment': sentiment_path, 'outputs': {}}
+
+    try:
+        with perf.span("read"):
+            trader_df = read_trades(trader_path)
+            sentiment_df = read_sentiment(sentiment_path)
+
+        with perf.span("clean_merge"):
+            trader_df = clean_trader_data(trader_df)
+            sentiment_df = clean_sentiment_data(sentiment_df)
+            merged_df = merge_sentiment(aggregate_daily(trader_df), sentiment_df)
+            merged_df = attach_btc_returns(merged_df, btc_daily)
+
+        with perf.span("export.merged"):
+            merged_path = os.path.join(out_dir, 'merged.csv')
+            merged_df.to_csv(merged_path, index=False)
+            result['outputs']['merged'] = merged_path
+        result['rows'] = {'trades': len(trader_df), 'days': len(merged_df)}
+
+        with perf.span("ml_dataset"):
+            X, y, label_encoder, ml_df = prepare_ml_dataset(merged_df, n_lags=n_lags)
+
+        if len(X) < MIN_TRAINING_SAMPLES:
+            result['warning'] = f"Not enough data to train model ({len(X)} < {MIN_TRAINING_SAMPLES} samples)"
+        else:
+            with perf.span("train"):
+                bundle, model, acc, cm = build_model_bundle(X, y, label_encoder, ml_df)
+                flat_model = bundle['flat_model']
+                model_path = os.path.join(out_dir, 'sentiment_rf.joblib')
+                save_bundle(bundle, model_path)
+                result['outputs']['model'] = model_path
+                result['accuracy'] = acc
+
+            with perf.span("predict"):
+                label, prob = predict_next_day(flat_model, label_encoder, ml_df, n_lags=n_lags)
+                prediction = {
+                    'last_date': str(ml_df['date'].iloc[-1]),
+                    'prediction': label,
+                    'probabilities': dict(zip(label_encoder.classes_.tolist(), map(float, prob))),
+                }
+                prediction_path = os.path.join(out_dir, 'prediction.json')
+                with open(prediction_path, 'w') as f:
+                    json.dump(prediction, f, indent=2)
+                result['outputs']['prediction'] = prediction_path
+                result['prediction'] = label
+
+        with perf.span("report"):
+            metrics_dict = {
+                "Total Records": len(merged_df),
+                "Average PnL": f"${merged_df['closedPnL'].mean():.2f}",
+                "Average Leverage": f"{merged_df['leverage'].mean():.2f}x",
+                "Total Volume": f"${merged_df['size'].sum():,.0f}",
+                "Date Range": f"{merged_df['date'].min()} to {merged_df['date'].max()}"
+            }
+            report_path = os.path.join(out_dir, 'report.pdf')
+            with open(report_path, 'wb') as f:
+                f.write(create_pdf_report(merged_df, metrics_dict))
+            result['outputs']['report'] = report_path
+
+        result['status'] = 'ok'
+    except Exception as e:
+        result['status'] = 'failed'
+        result['error'] = f"{type(e).__name__}: {e}"
+        result['traceback'] = traceback.format_exc()
+
+    result['timings'] = {name: round(seconds, 4) for name, seconds, _ in perf.run_spans()}
+    return result
+
+
+def pair_names(pairs):
+    """Unique output directory names derived from the trader file names"""
+    names, seen = [], {}
+    for trader_path, _ in pairs:
+        stem = os.path.splitext(os.path.basename(trader_path))[0]
+        seen[stem] = seen.get(stem, 0) + 1
+        names.append(stem if seen[stem] == 1 else f"{stem}_{seen[stem]}")
+    return names
+
+
+# -----------------------------------------------------------
+# CLI
+# -----------------------------------------------------------
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the MarketMind pipeline headlessly over trader/sentiment file pairs")
+    parser.add_argument("--pair", nargs=2, action='append', required=True, metavar=("TRADER", "SENTIMENT"),
+                        help="Trader and sentiment file (CSV, Parquet or Arrow); repeat for more pairs")
+    parser.add_argument("--output-dir", default="output", help="Where results are written (default: output)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--days", type=int, default=365, help="Days of BTC prices to fetch")
+    parser.add_argument("--n-lags", type=int, default=3, help="Lag features for the ML model")
+    parser.add_argument("--offline", action='store_true', help="Skip the BTC price fetch (btc_return = 0)")
+    return parser.parse_args(argv)
+
+
+def print_summary(results, fetch_seconds, total_seconds):
+    stages = []
+    for result in results:
+        stages += [s for s in result['timings'] if s not in stages]
+
+    print(f"\n{'pair':<24} {'status':<8} " + " ".join(f"{s:>13}" for s in stages))
+    for result in results:
+        cells = " ".join(
+            f"{result['timings'][s]:>12.3f}s" if s in result['timings'] else f"{'-':>13}"
+            for s in stages
+        )
+        print(f"{result['name'][:24]:<24} {result['status']:<8} {cells}")
+
+    print(f"\n⏱️ Price fetch: {fetch_seconds:.2f}s | Total wall time: {total_seconds:.2f}s")
+    for result in results:
+        if result['status'] != 'ok':
+            print(f"❌ {result['name']}: {result['error']}")
+        elif 'warning' in result:
+            print(f"⚠️  {result['name']}: {result['warning']}")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    start = time.perf_counter()
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    fetch_start = time.perf_counter()
+    btc_daily = pd.DataFrame() if args.offline else market_data.fetch_btc_daily(days=args.days)
+    fetch_seconds = time.perf_counter() - fetch_start
+    if btc_daily.empty and not args.offline:
+        print("⚠️  BTC prices unavailable; continuing with btc_return = 0")
+
+    pairs = [tuple(pair) for pair in args.pair]
+    names = pair_names(pairs)
+    results = []
+
+    print(f"Running {len(pairs)} pair(s) on {min(args.workers, len(pairs))} worker(s)...")
+    with ProcessPoolExecutor(max_workers=min(args.workers, len(pairs))) as pool:
+        futures = {
+            pool.submit(run_pair, name, trader, sentiment, args.output_dir, btc_daily, args.n_lags): name
+            for name, (trader, sentiment) in zip(names, pairs)
+        }
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print(f"  {'✅' if result['status'] == 'ok' else '❌'} {result['name']} "
+                  f"({sum(result['timings'].values()):.2f}s)", flush=True)
+
+    results.sort(key=lambda r: names.index(r['name']))
+    total_seconds = time.perf_counter() - start
+    print_summary(results, fetch_seconds, total_seconds)
+
+    summary_path = os.path.join(args.output_dir, 'summary.json')
+    with open(summary_path, 'w') as f:
+        json.dump({
+            'price_fetch_seconds': round(fetch_seconds, 4),
+            'total_seconds': round(total_seconds, 4),
+            'pairs': results,
+        }, f, indent=2, default=str)
+    print(f"📁 Summary written to {summary_path}")
+
+    return 0 if all(r['status'] == 'ok' for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+"""
+Report generation for the analytics dashboard.
+"""
+
+from datetime import datetime
+
+from fpdf import FPDF
+
+
+def create_pdf_report(dataframe, metrics_dict):
+    """Generate PDF report with summary statistics"""
+    pdf = FPDF()
+    pdf.add_page()
+    
+    # Title
+    pdf.set_font("Arial", "B", 16)
+    pdf.cell(0, 10, "Web3 MarketMind 4.0 - Analytics Report", ln=True, align="C")
+    pdf.ln(5)
+    
+    # Date
+    pdf.set_font("Arial", "", 10)
+    pdf.cell(0, 10, f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", ln=True, align="C")
+    pdf.ln(10)
+    
+    # Key Metrics
+    pdf.set_font("Arial", "B", 14)
+    pdf.cell(0, 10, "Key Metrics", ln=True)
+    pdf.set_font("Arial", "", 11)
+    
+    for key, value in metrics_dict.items():
+        pdf.cell(0, 8, f"{key}: {value}", ln=True)
+    
+    pdf.ln(10)
+    
+    # Data Summary
+    pdf.set_font("Arial", "B", 14)
+    pdf.cell(0, 10, "Data Summary (First 20 rows)", ln=True)
+    pdf.set_font("Arial", "", 9)
+    
+    for idx, row in dataframe.head(20).iterrows():
+        line = f"{row['date']} | {row['Sentiment']}: PnL={row['closedPnL']:.2f}, Lev={row['leverage']:.2f}, Vol={row['size']:.2f}"
+        pdf.cell(0, 6, line, ln=True)
+    
+    # fpdf 1.x returns the document as a latin-1 str for dest='S'
+    return pdf.output(dest='S').encode('latin-1')
@@ -0,0 +1,40 @@
+"""
+Risk metrics computed from daily trade aggregates.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def max_drawdown(pnl):
+    """Largest peak-to-trough drop of the cumulative PnL curve"""
+    equity = np.cumsum(np.asarray(pnl, dtype=float))
+    if equity.size == 0:
+        return 0.0
+    peaks = np.maximum.accumulate(np.maximum(equity, 0.0))
+    return float((peaks - equity).max())
+
+
+def compute_risk_metrics(daily_df, by=None):
+    """Summarise risk per group from a daily frame with `pnl_sum`, `trades` and `wins`"""
+    by = list(by or [])
+
+    def summarise(group):
+        pnl = group.sort_values('date')['pnl_sum'].to_numpy()
+        trades = group['trades'].sum()
+        return pd.Series({
+            'days': len(group),
+            'trades': int(trades),
+            'total_pnl': pnl.sum(),
+            'daily_pnl_std': pnl.std(ddof=1) if len(pnl) > 1 else 0.0,
+            'var_95': -np.percentile(pnl, 5) if len(pnl) else 0.0,
+            'max_drawdown': max_drawdown(pnl),
+            'win_rate': group['wins'].sum() / max(trades, 1),
+            'avg_leverage': (group['leverage'] * group['trades']).sum() / max(trades, 1),
+            'max_leverage': group['max_leverage'].max(),
+            'total_volume': group['size'].sum(),
+        })
+
+    if not by:
+        return summarise(daily_df).to_frame().T
+    return daily_df.groupby(by, observed=True).apply(summarise, include_groups=False).reset_index()
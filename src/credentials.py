@@ -0,0 +1,65 @@
+"""
+Credential store for the dashboards' streamlit-authenticator login.
+
+Passwords are bcrypt-hashed once, when the store is loaded, or not at all
+when they come precomputed from a credentials file written by
+`generate_hashes.py`. The dashboards keep the loaded store for the life of
+the process (`st.cache_resource`) and pass it to `stauth.Authenticate` with
+`auto_hash=False`, so no script rerun pays for bcrypt. Returning sessions are
+restored from the signed re-authentication cookie, which is an HMAC check
+rather than a password hash.
+"""
+
+import copy
+import os
+import re
+
+import bcrypt
+import yaml
+
+CREDENTIALS_FILE = os.getenv("MARKETMIND_CREDENTIALS_FILE", "config.yaml")
+# Same check streamlit-authenticator uses to tell hashes from plain text
+BCRYPT_HASH = re.compile(r"^\$2[aby]\$\d+\$.{53}$")
+
+
+def hash_password(password):
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+
+
+def hash_credentials(credentials):
+    """Copy of a stauth credentials dict with every plain-text password hashed"""
+    credentials = copy.deepcopy(credentials)
+    for user in credentials.get("usernames", {}).values():
+        if "password" in user and not BCRYPT_HASH.match(user["password"]):
+            user["password"] = hash_password(user["password"])
+    return credentials
+
+
+def read_credentials_file(path=CREDENTIALS_FILE):
+    """The `credentials` section of a YAML config, or None if the file has none"""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        config = yaml.safe_load(f) or {}
+    credentials = config.get("credentials")
+    return credentials if credentials and credentials.get("usernames") else None
+
+
+def load_credentials(defaults, path=CREDENTIALS_FILE):
+    """Credentials from `path` if it defines users, else `defaults`; hashed either way"""
+    return hash_credentials(read_credentials_file(path) or defaults)
+
+
+def write_credentials_file(credentials, path=CREDENTIALS_FILE):
+    """Hash `credentials` and store them in the YAML config at `path`, keeping other sections"""
+    config = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            config = yaml.safe_load(f) or {}
+    config["credentials"] = hash_credentials(credentials)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        yaml.safe_dump(config, f, sort_keys=False)
+    os.replace(tmp_path, path)
+    return config["credentials"]
@@ -0,0 +1,101 @@
+"""
+Readers for trade and sentiment files in CSV, Parquet and Arrow IPC (Feather v2).
+
+Only the columns the pipeline uses are read: `time`, `closedPnL`, `leverage`
+and `size` for trades (plus the partition keys when present), and `Date`,
+`Classification` and, if present, the index `value` for sentiment. Parquet
+and Arrow files on disk are memory-mapped. Uploaded files are read straight
+from the upload buffer without copying it, and numeric columns are converted
+to pandas without another copy where Arrow allows.
+"""
+
+import os
+
+import pandas as pd
+
+from src.data_preprocessing import VALUE_COLUMNS
+from src.partitioning import PARTITION_KEYS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # CSV only
+    pa = pq = None
+
+TRADER_COLUMNS = ['time'] + VALUE_COLUMNS
+SENTIMENT_COLUMNS = ['Date', 'Classification']
+OPTIONAL_SENTIMENT_COLUMNS = ['value']  # Fear & Greed Index value, when the export has it
+EXTENSIONS = {
+    '.csv': 'csv',
+    '.parquet': 'parquet', '.pq': 'parquet',
+    '.feather': 'arrow', '.arrow': 'arrow', '.ipc': 'arrow',
+}
+UPLOAD_TYPES = sorted(ext.lstrip('.') for ext in EXTENSIONS)
+DATA_DIR = os.getenv("MARKETMIND_DATA_DIR")
+
+
+def format_of(name):
+    """`csv`, `parquet` or `arrow` from a file name's extension"""
+    ext = os.path.splitext(str(name))[1].lower()
+    if ext not in EXTENSIONS:
+        raise ValueError(f"Unsupported file type '{ext}' (expected one of {', '.join(EXTENSIONS)})")
+    return EXTENSIONS[ext]
+
+
+def _projection(available, columns, optional):
+    missing = [c for c in columns if c not in available]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+    return list(columns) + [c for c in optional if c in available]
+
+
+def _arrow_source(source):
+    """Memory map for a path, zero-copy buffer reader for an in-memory upload"""
+    if isinstance(source, (str, os.PathLike)):
+        return pa.memory_map(os.fspath(source), 'r')
+    return pa.BufferReader(pa.py_buffer(source.getbuffer()))
+
+
+def read_frame(source, columns, optional=(), fmt=None):
+    """Read `columns` (required) and any present `optional` columns from a file
+
+    `source` is a path or a file-like upload with a `name` (e.g. Streamlit's
+    UploadedFile); the format comes from its extension unless `fmt` is given.
+    """
+    fmt = fmt or format_of(getattr(source, 'name', source))
+    if fmt == 'csv':
+        projection = _projection(pd.read_csv(source, nrows=0).columns, columns, optional)
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        return pd.read_csv(source, usecols=projection)[projection]
+
+    if pa is None:
+        raise ImportError(f"Reading {fmt} files requires pyarrow")
+    with _arrow_source(source) as f:
+        if fmt == 'parquet':
+            parquet = pq.ParquetFile(f)
+            table = parquet.read(columns=_projection(parquet.schema_arrow.names, columns, optional))
+        else:
+            reader = pa.ipc.open_file(f)
+            table = reader.read_all()
+            table = table.select(_projection(table.schema.names, columns, optional))
+    # split_blocks keeps numeric columns as views of the mapped Arrow buffers
+    return table.to_pandas(split_blocks=True)
+
+
+def read_trades(source, fmt=None):
+    return read_frame(source, TRADER_COLUMNS, PARTITION_KEYS, fmt)
+
+
+def read_sentiment(source, fmt=None):
+    return read_frame(source, SENTIMENT_COLUMNS, OPTIONAL_SENTIMENT_COLUMNS, fmt)
+
+
+def list_data_files(directory=DATA_DIR):
+    """Readable data files in `directory`, sorted by name (empty if unset or missing)"""
+    if not directory or not os.path.isdir(directory):
+        return []
+    return sorted(
+        name for name in os.listdir(directory)
+        if os.path.splitext(name)[1].lower() in EXTENSIONS and os.path.isfile(os.path.join(directory, name))
+    )
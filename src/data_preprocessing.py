@@ -0,0 +1,89 @@
+"""
+Data cleaning and merge steps shared by the dashboard and offline jobs.
+
+The functions here never mutate their inputs so callers can safely pass
+cached frames.
+"""
+
+import numpy as np
+import pandas as pd
+
+VALUE_COLUMNS = ['closedPnL', 'leverage', 'size']
+
+
+# -----------------------------------------------------------
+# CLEANING
+# -----------------------------------------------------------
+def clean_trader_data(trader_df):
+    """Parse trade timestamps, drop invalid rows and add a `date` column"""
+    df = trader_df.dropna(subset=VALUE_COLUMNS)
+    df = df[df['leverage'] > 0]
+    time = pd.to_datetime(df['time'], errors='coerce')
+    return df.assign(time=time, date=time.dt.date)
+
+
+def clean_sentiment_data(sentiment_df):
+    """Parse sentiment dates and add a `date` column"""
+    dates = pd.to_datetime(sentiment_df['Date'], errors='coerce')
+    return sentiment_df.assign(Date=dates, date=dates.dt.date)
+
+
+# -----------------------------------------------------------
+# AGGREGATION & MERGE
+# -----------------------------------------------------------
+def partial_daily(trader_df, by=None):
+    """Per-day sums and trade counts of cleaned trades, mergeable across chunks (see `combine_daily`)"""
+    keys = list(by or []) + ['date']
+    return trader_df.groupby(keys, observed=True, sort=True).agg(
+        pnl_sum=('closedPnL', 'sum'),
+        leverage_sum=('leverage', 'sum'),
+        size=('size', 'sum'),
+        trades=('closedPnL', 'size'),
+    ).reset_index()
+
+
+def combine_daily(partials, by=None):
+    """Merge `partial_daily` results from several chunks into daily means
+
+    Means are total sum over total trade count, so a day split across chunks
+    is weighted by how many trades each chunk holds.
+    """
+    keys = list(by or []) + ['date']
+    total = partials[0] if len(partials) == 1 else (
+        pd.concat(partials, ignore_index=True)
+        .groupby(keys, observed=True, sort=True)[['pnl_sum', 'leverage_sum', 'size', 'trades']]
+        .sum()
+        .reset_index()
+    )
+    return total[keys].assign(
+        closedPnL=total['pnl_sum'] / total['trades'],
+        leverage=total['leverage_sum'] / total['trades'],
+        size=total['size'],
+    )
+
+
+def aggregate_daily(trader_df, by=None):
+    """Aggregate cleaned trades to one row per day (and optional group keys)"""
+    return combine_daily([partial_daily(trader_df, by)], by)
+
+
+def merge_sentiment(daily_df, sentiment_df):
+    """Attach the daily sentiment label and drop days without one"""
+    merged = daily_df.merge(
+        sentiment_df[['date', 'Classification']],
+        on='date',
+        how='left'
+    )
+    merged = merged.rename(columns={'Classification': 'Sentiment'})
+    return merged.dropna(subset=['Sentiment'])
+
+
+def attach_btc_returns(merged_df, btc_daily):
+    """Join daily BTC closes and compute the daily BTC return"""
+    if btc_daily.empty:
+        return merged_df.assign(bitcoin_close=np.nan, btc_return=0)
+
+    btc_daily = btc_daily.assign(date=pd.to_datetime(btc_daily['date']).dt.date)
+    merged_df = merged_df.merge(btc_daily, on='date', how='left').sort_values('date')
+    merged_df['btc_return'] = merged_df['bitcoin_close'].pct_change().fillna(0)
+    return merged_df
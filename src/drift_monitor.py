@@ -0,0 +1,238 @@
+"""
+Feature drift monitoring for the sentiment model, and retraining gated on it.
+
+At training time `build_reference` bins every lag feature at its training
+deciles and keeps only the bin edges and counts (a few hundred numbers),
+which are stored in the model bundle. `DriftMonitor` bins the daily rows that
+arrive after the training data ended and keeps their counts over a sliding
+window, so each new day costs one binary search per feature. It compares
+them with the reference:
+
+- PSI (population stability index) between the binned distributions;
+- KS, the largest gap between the binned CDFs (a lower bound on the exact
+  two-sample statistic).
+
+With a few weeks of daily rows both statistics are noisy, so a feature only
+counts as drifted when it beats both the conventional cut-off and what
+sampling noise alone would give at this many rows (the chi-square bound for
+PSI, the 1% critical value for KS). A retrain is recommended once
+`DRIFT_SHARE` of the features have drifted over at least `MIN_ROWS` new days.
+`BackgroundRetrainer` runs that retrain on a thread and swaps the bundle file
+atomically, so the inference service and other sessions pick it up on their
+next load.
+"""
+
+import os
+import threading
+import time
+import uuid
+
+import joblib
+import numpy as np
+import pandas as pd
+
+N_BINS = 10
+WINDOW = 90            # days of new rows compared with the reference
+MIN_ROWS = 14          # no verdict before two weeks of new days
+PSI_THRESHOLD = 0.25   # conventional "significant shift"
+KS_ALPHA_COEF = 1.628  # two-sample KS critical value coefficient at alpha = 0.01
+NOISE_Z = 2.326        # one-sided 99% normal quantile, for the PSI noise bound
+DRIFT_SHARE = 0.25     # share of drifted features that triggers a retrain
+EPSILON = 1e-4         # smoothing for empty bins in PSI
+
+
+def _chi2_quantile(df):
+    """Wilson-Hilferty approximation of the 99% chi-square quantile"""
+    df = np.maximum(np.asarray(df, dtype=np.float64), 1)
+    return df * (1 - 2 / (9 * df) + NOISE_Z * np.sqrt(2 / (9 * df))) ** 3
+
+
+def save_bundle(bundle, path):
+    """Write a model bundle so readers only ever see the old or the new file"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp-{uuid.uuid4().hex}"
+    try:
+        joblib.dump(bundle, tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+# -----------------------------------------------------------
+# REFERENCE
+# -----------------------------------------------------------
+class DriftReference:
+    """Decile bin edges and counts of each training feature"""
+
+    def __init__(self, features, edges, counts, through):
+        self.features = list(features)
+        self.edges = [np.asarray(e, dtype=np.float64) for e in edges]
+        self.counts = np.asarray(counts, dtype=np.float64)  # (features, N_BINS), unused bins are 0
+        self.through = pd.Timestamp(through)
+
+    @property
+    def rows(self):
+        return int(self.counts[0].sum()) if len(self.counts) else 0
+
+    @property
+    def n_bins(self):
+        """Bins actually used per feature (fewer than N_BINS when deciles tie)"""
+        return np.array([len(e) + 1 for e in self.edges])
+
+    def bin(self, X):
+        """Bin index of every value, shape `(rows, features)`"""
+        if isinstance(X, pd.DataFrame):
+            X = X[self.features]
+        X = np.asarray(X, dtype=np.float64).reshape(-1, len(self.features))
+        return np.column_stack([
+            np.searchsorted(edges, X[:, j], side='right') for j, edges in enumerate(self.edges)
+        ]) if len(X) else np.zeros((0, len(self.features)), dtype=np.int64)
+
+
+def build_reference(X, through, n_bins=N_BINS):
+    """Reference histograms of training features `X`, whose last row is dated `through`"""
+    values = X.to_numpy(dtype=np.float64)
+    edges = [np.unique(np.quantile(values[:, j], np.linspace(0, 1, n_bins + 1)[1:-1]))
+             for j in range(values.shape[1])]
+    reference = DriftReference(X.columns, edges, np.zeros((values.shape[1], n_bins)), through)
+    bins = reference.bin(values)
+    for j in range(values.shape[1]):
+        reference.counts[j] = np.bincount(bins[:, j], minlength=n_bins)
+    return reference
+
+
+# -----------------------------------------------------------
+# MONITOR
+# -----------------------------------------------------------
+class DriftMonitor:
+    """Binned counts of the last `window` rows after the reference, compared with it"""
+
+    def __init__(self, reference, window=WINDOW):
+        self.reference = reference
+        self.window = window
+        k = len(reference.features)
+        self.rows = np.zeros((window, k), dtype=np.int64)  # ring buffer of bin indices
+        self.start = 0
+        self.size = 0
+        self.counts = np.zeros_like(reference.counts)
+        self.last_date = reference.through
+        self._features = np.arange(k)
+
+    def extend(self, X):
+        """Absorb new rows (oldest first); rows leaving the window are subtracted"""
+        bins = self.reference.bin(X)[-self.window:]
+        overflow = max(self.size + len(bins) - self.window, 0)
+        if overflow:
+            old = self.rows[(self.start + np.arange(overflow)) % self.window]
+            np.subtract.at(self.counts, (np.broadcast_to(self._features, old.shape), old), 1)
+            self.start = (self.start + overflow) % self.window
+            self.size -= overflow
+        slots = (self.start + self.size + np.arange(len(bins))) % self.window
+        self.rows[slots] = bins
+        np.add.at(self.counts, (np.broadcast_to(self._features, bins.shape), bins), 1)
+        self.size += len(bins)
+
+    def update_from(self, ml_df, date_col='date'):
+        """Absorb the rows of `ml_df` dated after `last_date`; returns how many were new"""
+        dates = pd.to_datetime(ml_df[date_col])
+        new = (dates > self.last_date).to_numpy()
+        if new.any():
+            self.extend(ml_df.loc[new, self.reference.features])
+            self.last_date = dates[new].max()
+        return int(new.sum())
+
+    def report(self):
+        """PSI and KS per feature, with the limits they are judged against"""
+        ref, cur = self.reference.counts, self.counts
+        m, n = self.reference.rows, self.size
+        with np.errstate(divide='ignore', invalid='ignore'):
+            p = np.maximum(ref / max(m, 1), EPSILON)
+            q = np.maximum(cur / max(n, 1), EPSILON)
+            psi = ((q - p) * np.log(q / p)).sum(axis=1)
+            ks = np.abs(np.cumsum(ref, axis=1) / max(m, 1) - np.cumsum(cur, axis=1) / max(n, 1)).max(axis=1)
+            scale = 1 / n + 1 / m if n and m else np.inf
+        psi_limit = np.maximum(PSI_THRESHOLD, _chi2_quantile(self.reference.n_bins - 1) * scale)
+        ks_limit = np.full(len(psi), KS_ALPHA_COEF * np.sqrt(scale))
+        report = pd.DataFrame({
+            'feature': self.reference.features,
+            'psi': psi if n else np.nan,
+            'psi_limit': psi_limit,
+            'ks': ks if n else np.nan,
+            'ks_limit': ks_limit,
+        })
+        report['drifted'] = (n >= MIN_ROWS) & ((report['psi'] >= psi_limit) | (report['ks'] >= ks_limit))
+        return report
+
+    def status(self, report=None):
+        """Summary verdict: new rows, drifted features and whether to retrain"""
+        report = self.report() if report is None else report
+        drifted = report.loc[report['drifted'], 'feature'].tolist()
+        share = len(drifted) / len(report) if len(report) else 0.0
+        return {
+            'rows': self.size,
+            'through': self.reference.through,
+            'drifted': drifted,
+            'share': share,
+            'ready': self.size >= MIN_ROWS,
+            'retrain': self.size >= MIN_ROWS and share >= DRIFT_SHARE,
+        }
+
+
+# -----------------------------------------------------------
+# BACKGROUND RETRAINING
+# -----------------------------------------------------------
+class BackgroundRetrainer:
+    """Runs at most one retrain at a time on a daemon thread
+
+    `train_fn()` returns `(bundle, accuracy)`; the bundle is saved to `path`
+    with `save_bundle`. Meant to be shared by every session of a process
+    (e.g. through `st.cache_resource`).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._thread = None
+        self.state = 'idle'
+        self.reason = None
+        self.started_at = None
+        self.finished_at = None
+        self.seconds = None
+        self.accuracy = None
+        self.error = None
+
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, train_fn, reason=None):
+        """Start a retrain unless one is running; returns whether it started"""
+        with self._lock:
+            if self.running():
+                return False
+            self.state, self.reason, self.error = 'running', reason, None
+            self.started_at = time.time()
+            self._thread = threading.Thread(target=self._run, args=(train_fn,), name="model-retrain", daemon=True)
+            self._thread.start()
+            return True
+
+    def _run(self, train_fn):
+        try:
+            bundle, accuracy = train_fn()
+            save_bundle(bundle, self.path)
+            self.accuracy, self.state = accuracy, 'done'
+        except Exception as e:  # reported in the dashboard, never raised into a session
+            self.error, self.state = f"{type(e).__name__}: {e}", 'failed'
+        self.finished_at = time.time()
+        self.seconds = self.finished_at - self.started_at
+
+    def snapshot(self):
+        return {
+            'state': self.state,
+            'reason': self.reason,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'seconds': self.seconds,
+            'accuracy': self.accuracy,
+            'error': self.error,
+        }
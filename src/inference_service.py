@@ -0,0 +1,400 @@
+"""
+Local HTTP inference service for the sentiment model.
+
+Loads `models/sentiment_rf.joblib` once and serves it to every dashboard and
+script on the machine through a small ASGI app (run it with uvicorn).
+Concurrent `/predict` requests are coalesced into micro-batches. The first
+queued request opens a window of a few milliseconds, and every request that
+arrives inside it is stacked and predicted in a single vectorized call. The
+bundle is reloaded when the file changes on disk, so a retrain in the
+dashboard takes effect without a restart.
+
+Endpoints:
+    POST /predict   {"rows": [[...], ...]} or {"rows": [{feature: value, ...}, ...]}
+    GET  /stats     request/batch counts, latency p50/p90/p99, throughput
+    GET  /health    model path, features and classes
+
+Run:
+    python -m src.inference_service --port 8765
+    MARKETMIND_INFERENCE_URL=http://127.0.0.1:8765 streamlit run app_v4.py
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import deque
+
+import joblib
+import numpy as np
+import requests
+
+MODEL_PATH = "models/sentiment_rf.joblib"
+INFERENCE_URL_ENV = "MARKETMIND_INFERENCE_URL"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_WINDOW_MS = 2.0
+DEFAULT_MAX_BATCH = 512
+MAX_ROWS_PER_REQUEST = 10_000
+STATS_WINDOW = 10_000
+REQUEST_TIMEOUT = 5
+
+
+class ModelUnavailable(Exception):
+    """No model bundle has been trained yet"""
+
+
+# -----------------------------------------------------------
+# MODEL
+# -----------------------------------------------------------
+class ModelHandle:
+    """The model bundle on disk, reloaded whenever the file changes"""
+
+    def __init__(self, path=MODEL_PATH):
+        self.path = path
+        self.model = None
+        self.label_encoder = None
+        self.feature_names = []
+        self.loaded_at = None
+        self.reloads = 0
+        self._mtime = None
+
+    def refresh(self):
+        """Load the bundle if it is new or changed on disk; keeps the old one if loading fails"""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            bundle = joblib.load(self.path)
+        except Exception:
+            # Most likely caught mid-write by a retrain; try again next batch.
+            return
+        self.model = bundle.get('flat_model', bundle['model'])
+        self.label_encoder = bundle['label_encoder']
+        self.feature_names = list(bundle['feature_names'])
+        self.reloads += self._mtime is not None
+        self.loaded_at = time.time()
+        self._mtime = mtime
+
+    def predict(self, X):
+        """Sentiment labels and class probabilities for a 2-D feature array"""
+        self.refresh()
+        if self.model is None:
+            raise ModelUnavailable(f"No trained model at {self.path}")
+        if hasattr(self.model, 'predict_with_proba'):
+            encoded, proba = self.model.predict_with_proba(X)
+        else:
+            encoded, proba = self.model.predict(X), self.model.predict_proba(X)
+        return self.label_encoder.inverse_transform(encoded), proba
+
+    def info(self):
+        return {
+            'path': self.path,
+            'loaded': self.model is not None,
+            'loaded_at': self.loaded_at,
+            'reloads': self.reloads,
+            'model': type(self.model).__name__ if self.model is not None else None,
+            'features': self.feature_names,
+            'classes': self.label_encoder.classes_.tolist() if self.label_encoder is not None else [],
+        }
+
+
+# -----------------------------------------------------------
+# STATS
+# -----------------------------------------------------------
+class LatencyStats:
+    """Request latency and throughput over the most recent `window` requests"""
+
+    def __init__(self, window=STATS_WINDOW):
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.rows = 0
+        self.errors = 0
+        self.batches = 0
+        self.latencies = deque(maxlen=window)
+        self.finished = deque(maxlen=window)
+        self.batch_rows = deque(maxlen=window)
+
+    def record_request(self, seconds, rows):
+        self.requests += 1
+        self.rows += rows
+        self.latencies.append(seconds)
+        self.finished.append((time.perf_counter(), rows))
+
+    def record_batch(self, rows):
+        self.batches += 1
+        self.batch_rows.append(rows)
+
+    def snapshot(self):
+        latencies = np.fromiter(self.latencies, dtype=float) * 1000
+        p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) if len(latencies) else (0.0, 0.0, 0.0)
+
+        requests_per_s = rows_per_s = 0.0
+        if len(self.finished) > 1:
+            span = self.finished[-1][0] - self.finished[0][0]
+            if span > 0:
+                requests_per_s = (len(self.finished) - 1) / span
+                rows_per_s = sum(rows for _, rows in list(self.finished)[1:]) / span
+
+        batch_rows = np.fromiter(self.batch_rows, dtype=float)
+        return {
+            'uptime_s': round(time.perf_counter() - self.started, 3),
+            'requests': self.requests,
+            'rows': self.rows,
+            'errors': self.errors,
+            'batches': self.batches,
+            'batch_rows': {
+                'mean': round(float(batch_rows.mean()), 2) if len(batch_rows) else 0.0,
+                'max': int(batch_rows.max()) if len(batch_rows) else 0,
+            },
+            'latency_ms': {
+                'p50': round(float(p50), 3),
+                'p90': round(float(p90), 3),
+                'p99': round(float(p99), 3),
+                'max': round(float(latencies.max()), 3) if len(latencies) else 0.0,
+            },
+            'throughput': {
+                'requests_per_s': round(requests_per_s, 1),
+                'rows_per_s': round(rows_per_s, 1),
+            },
+        }
+
+
+# -----------------------------------------------------------
+# MICRO-BATCHING
+# -----------------------------------------------------------
+class MicroBatcher:
+    """Coalesce concurrent predict calls into one vectorized call per window"""
+
+    def __init__(self, handle, stats, window_ms=DEFAULT_WINDOW_MS, max_batch=DEFAULT_MAX_BATCH):
+        self.handle = handle
+        self.stats = stats
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._queue = None
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, X):
+        """Queue `X` for the next batch; returns `(labels, probabilities)` for its rows"""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((X, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            rows = len(batch[0][0])
+            deadline = loop.time() + self.window
+            while rows < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                rows += len(item[0])
+            await self._predict(batch, rows)
+
+    async def _predict(self, batch, rows):
+        self.stats.record_batch(rows)
+        X = batch[0][0] if len(batch) == 1 else np.vstack([X for X, _ in batch])
+        try:
+            # Off the event loop, so the next batch keeps filling meanwhile.
+            labels, proba = await asyncio.get_running_loop().run_in_executor(None, self.handle.predict, X)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        start = 0
+        for X, future in batch:
+            stop = start + len(X)
+            if not future.done():
+                future.set_result((labels[start:stop], proba[start:stop]))
+            start = stop
+
+
+# -----------------------------------------------------------
+# ASGI APP
+# -----------------------------------------------------------
+def parse_rows(payload, feature_names):
+    """Feature matrix from a `{"rows": [...]}` payload of lists or feature dicts"""
+    rows = payload.get('rows') if isinstance(payload, dict) else None
+    if not rows or not isinstance(rows, list):
+        raise ValueError("Expected a non-empty 'rows' list")
+    if len(rows) > MAX_ROWS_PER_REQUEST:
+        raise ValueError(f"At most {MAX_ROWS_PER_REQUEST} rows per request")
+
+    if any(isinstance(row, dict) for row in rows):
+        if not all(isinstance(row, dict) for row in rows):
+            raise ValueError("Rows must be all lists or all feature dicts")
+        for i, row in enumerate(rows):
+            missing = [f for f in feature_names if f not in row]
+            if missing:
+                raise ValueError(f"Row {i}: missing features {missing}")
+        rows = [[row[f] for f in feature_names] for row in rows]
+
+    try:
+        X = np.asarray(rows, dtype=np.float64)
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Rows must hold numeric features: {e}") from e
+    if X.ndim != 2 or X.shape[1] != len(feature_names):
+        raise ValueError(f"Expected rows of {len(feature_names)} features, got shape {X.shape}")
+    return X
+
+
+class InferenceApp:
+    """ASGI application serving `/predict`, `/stats` and `/health`"""
+
+    def __init__(self, model_path=MODEL_PATH, window_ms=DEFAULT_WINDOW_MS, max_batch=DEFAULT_MAX_BATCH):
+        self.handle = ModelHandle(model_path)
+        self.handle.refresh()
+        self.stats = LatencyStats()
+        self.batcher = MicroBatcher(self.handle, self.stats, window_ms=window_ms, max_batch=max_batch)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self.batcher.start()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.batcher.stop()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _http(self, scope, receive, send):
+        route = (scope['method'], scope['path'].rstrip('/') or '/')
+        if route == ('POST', '/predict'):
+            status, body = await self._predict(await self._read_body(receive))
+        elif route == ('GET', '/stats'):
+            status, body = 200, self.stats.snapshot()
+        elif route == ('GET', '/health'):
+            self.handle.refresh()
+            status, body = (200 if self.handle.model is not None else 503), self.handle.info()
+        else:
+            status, body = 404, {'error': f"No route {route[0]} {route[1]}"}
+
+        payload = json.dumps(body).encode()
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(payload)).encode())],
+        })
+        await send({'type': 'http.response.body', 'body': payload})
+
+    @staticmethod
+    async def _read_body(receive):
+        chunks = []
+        while True:
+            message = await receive()
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body'):
+                return b''.join(chunks)
+
+    async def _predict(self, raw):
+        start = time.perf_counter()
+        try:
+            self.handle.refresh()
+            if self.handle.model is None:
+                raise ModelUnavailable(f"No trained model at {self.handle.path}")
+            X = parse_rows(json.loads(raw or b'null'), self.handle.feature_names)
+            labels, proba = await self.batcher.submit(X)
+        except ModelUnavailable as e:
+            self.stats.errors += 1
+            return 503, {'error': str(e)}
+        except ValueError as e:
+            self.stats.errors += 1
+            return 400, {'error': str(e)}
+        except Exception as e:
+            self.stats.errors += 1
+            return 500, {'error': f"Prediction failed: {e}"}
+
+        latency = time.perf_counter() - start
+        self.stats.record_request(latency, len(X))
+        return 200, {
+            'labels': labels.tolist(),
+            'probabilities': proba.tolist(),
+            'classes': self.handle.label_encoder.classes_.tolist(),
+            'latency_ms': round(latency * 1000, 3),
+        }
+
+
+# -----------------------------------------------------------
+# CLIENT
+# -----------------------------------------------------------
+_session = requests.Session()
+
+
+def predict_remote(url, X, timeout=REQUEST_TIMEOUT):
+    """Predict with a running service; returns `(labels, probabilities, classes)`
+
+    `X` is a DataFrame of lag features (sent by column name) or a 2-D array.
+    Raises on connection or HTTP errors.
+    """
+    rows = X.to_dict('records') if hasattr(X, 'to_dict') else np.asarray(X).tolist()
+    response = _session.post(f"{url.rstrip('/')}/predict", json={'rows': rows}, timeout=timeout)
+    response.raise_for_status()
+    data = response.json()
+    return data['labels'], np.asarray(data['probabilities']), data['classes']
+
+
+def service_stats(url, timeout=REQUEST_TIMEOUT):
+    response = _session.get(f"{url.rstrip('/')}/stats", timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+
+# -----------------------------------------------------------
+# CLI
+# -----------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the sentiment model over HTTP with micro-batching")
+    parser.add_argument("--model", default=MODEL_PATH, help=f"Model bundle (default: {MODEL_PATH})")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--window-ms", type=float, default=DEFAULT_WINDOW_MS,
+                        help="How long a batch stays open for more requests")
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH,
+                        help="Rows that close a batch early")
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    app = InferenceApp(args.model, window_ms=args.window_ms, max_batch=args.max_batch)
+    if app.handle.model is None:
+        print(f"⚠️  No model at {args.model} yet; /predict returns 503 until one is trained")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
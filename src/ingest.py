@@ -0,0 +1,98 @@
+"""
+Concurrent ingestion of trade logs split over many files.
+
+Exports often come as one file per day or per symbol, sometimes zipped. Each
+file (or zip member) is parsed, cleaned and reduced to mergeable daily sums
+(`partial_daily`) and rollups (`build_pyramid`) on its own worker process.
+The partials are then combined into weighted daily means (`combine_daily`)
+and one rollup pyramid, so the result is the same as aggregating the
+concatenated log. Progress is reported per file as workers
+finish, in completion order.
+"""
+
+import io
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from src.data_io import EXTENSIONS, format_of, read_trades
+from src.data_preprocessing import clean_trader_data, combine_daily, partial_daily
+from src.rollups import build_pyramid, merge_pyramids
+
+# Below this many input bytes, starting worker processes costs more than parsing
+MIN_BYTES_FOR_POOL = 8 * 1024 * 1024
+
+
+def expand_sources(files):
+    """`(name, bytes)` per trade file, with zip archives replaced by their data members
+
+    `files` holds `(name, bytes)` pairs or file-like uploads with a `name`.
+    """
+    sources = []
+    for item in files:
+        name, data = item if isinstance(item, tuple) else (item.name, item.getvalue())
+        if os.path.splitext(name)[1].lower() != '.zip':
+            sources.append((name, data))
+            continue
+        try:
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                for member in archive.infolist():
+                    base = os.path.basename(member.filename)
+                    if member.is_dir() or base.startswith('.') or member.filename.startswith('__MACOSX/'):
+                        continue
+                    if os.path.splitext(base)[1].lower() in EXTENSIONS:
+                        sources.append((f"{name}/{member.filename}", archive.read(member)))
+        except zipfile.BadZipFile as e:
+            raise ValueError(f"{name}: {e}") from e
+    if not sources:
+        raise ValueError("No trade files found (expected CSV, Parquet or Arrow, optionally zipped)")
+    return sources
+
+
+def ingest_member(name, data):
+    """Parse, clean, partially aggregate and roll up one file; runs on a worker process"""
+    start = time.perf_counter()
+    try:
+        trades = clean_trader_data(read_trades(io.BytesIO(data), fmt=format_of(name)))
+    except ValueError as e:
+        raise ValueError(f"{name}: {e}") from e
+    stats = {'name': name, 'rows': len(trades), 'bytes': len(data), 'seconds': time.perf_counter() - start}
+    return trades, partial_daily(trades), build_pyramid(trades), stats
+
+
+def ingest_trades(files, n_workers=None, on_progress=None):
+    """Load trades from several files or zip archives concurrently
+
+    Returns a dict with `trades` (the cleaned, concatenated log), `daily`
+    (same as `aggregate_daily(trades)`), `rollups` (same as
+    `build_pyramid(trades)`) and `files` (one row of rows/bytes/seconds per
+    parsed file). `on_progress(done, total, stats)` is called as
+    each file finishes.
+    """
+    sources = expand_sources(files)
+    n_workers = n_workers or os.cpu_count() or 1
+    results = [None] * len(sources)
+
+    def record(i, result, done):
+        results[i] = result
+        if on_progress is not None:
+            on_progress(done, len(sources), result[3])
+
+    if n_workers == 1 or len(sources) == 1 or sum(len(d) for _, d in sources) < MIN_BYTES_FOR_POOL:
+        for i, (name, data) in enumerate(sources):
+            record(i, ingest_member(name, data), i + 1)
+    else:
+        with ProcessPoolExecutor(max_workers=min(n_workers, len(sources))) as pool:
+            futures = {pool.submit(ingest_member, name, data): i for i, (name, data) in enumerate(sources)}
+            for done, future in enumerate(as_completed(futures), start=1):
+                record(futures[future], future.result(), done)
+
+    return {
+        'trades': pd.concat([r[0] for r in results], ignore_index=True),
+        'daily': combine_daily([r[1] for r in results]),
+        'rollups': merge_pyramids(r[2] for r in results),
+        'files': pd.DataFrame([r[3] for r in results]),
+    }
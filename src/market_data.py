@@ -0,0 +1,106 @@
+"""
+Market data fetchers (CoinGecko, Binance, alternative.me) without any Streamlit dependency.
+
+These raise on network/API errors; the dashboards wrap them with caching and
+user-facing warnings. The daily-close fetchers also go through the host-wide
+shared cache when one is configured (see `src.shared_cache`), so replicas on
+one host share a single upstream request per window.
+"""
+
+from datetime import datetime, timedelta
+
+import pandas as pd
+import requests
+
+from src import perf, shared_cache
+
+COINGECKO_MARKET_CHART_URL = "https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart"
+BINANCE_KLINES_URL = "https://api.binance.com/api/v3/klines"
+FEAR_GREED_URL = "https://api.alternative.me/fng/"
+REQUEST_TIMEOUT = 30
+DAILY_TTL = 300
+
+
+@shared_cache.cached(ttl=DAILY_TTL, name="coingecko")
+def fetch_coingecko_daily(coin_id="bitcoin", vs_currency="usd", days="max"):
+    """Daily closes from CoinGecko as a `date`, `<coin_id>_close` frame"""
+    url = COINGECKO_MARKET_CHART_URL.format(coin_id=coin_id)
+    params = {"vs_currency": vs_currency, "days": days}
+    response = requests.get(url, params=params, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    perf.incr("bytes_fetched_total", len(response.content), source="coingecko")
+    data = response.json()
+
+    # data['prices'] = list of [timestamp_ms, price]
+    prices = pd.DataFrame(data['prices'], columns=['ts', 'price'])
+    prices['date'] = pd.to_datetime(prices['ts'], unit='ms').dt.date
+    daily = prices.groupby('date').price.last().reset_index()
+    daily.columns = ['date', f'{coin_id}_close']
+    return daily
+
+
+def fetch_coingecko_market_chart(coin_id="bitcoin", vs_currency="usd", days=90):
+    """Raw CoinGecko price points as a `timestamp` (naive UTC), `price` frame"""
+    url = COINGECKO_MARKET_CHART_URL.format(coin_id=coin_id)
+    params = {"vs_currency": vs_currency, "days": days}
+    response = requests.get(url, params=params, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    perf.incr("bytes_fetched_total", len(response.content), source="coingecko")
+    prices = response.json().get("prices", [])
+    if not prices:
+        return pd.DataFrame(columns=["timestamp", "price"])
+
+    df = pd.DataFrame(prices, columns=["timestamp_ms", "price"])  # [ms, price]
+    df["timestamp"] = pd.to_datetime(df["timestamp_ms"], unit="ms", utc=True).dt.tz_convert(None)
+    return df.drop(columns=["timestamp_ms"]).sort_values("timestamp").reset_index(drop=True)
+
+
+def fetch_fear_greed_history(limit_days=365):
+    """Crypto Fear & Greed Index from alternative.me as a `date`, `value` frame"""
+    params = {"limit": 0, "format": "json"}
+    response = requests.get(FEAR_GREED_URL, params=params, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    perf.incr("bytes_fetched_total", len(response.content), source="alternative.me")
+    values = response.json().get("data", [])
+    if not values:
+        return pd.DataFrame(columns=["date", "value"])
+
+    # API provides timestamp (unix), value (string), time_until_update, classification
+    df = pd.DataFrame(values)
+    df["date"] = pd.to_datetime(df["timestamp"].astype(int), unit="s", utc=True).dt.tz_convert(None)
+    df["value"] = pd.to_numeric(df["value"], errors="coerce")
+    df = df[["date", "value"]].sort_values("date").reset_index(drop=True)
+    cutoff = datetime.now() - timedelta(days=limit_days)
+    return df[df["date"] >= cutoff].reset_index(drop=True)
+
+
+@shared_cache.cached(ttl=DAILY_TTL, name="binance")
+def fetch_binance_daily(symbol='BTCUSDT', limit=1000):
+    """Daily closes from Binance klines as a `date`, `btc_close` frame"""
+    params = {"symbol": symbol, "interval": "1d", "limit": limit}
+    response = requests.get(BINANCE_KLINES_URL, params=params, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    perf.incr("bytes_fetched_total", len(response.content), source="binance")
+    data = response.json()
+
+    # kline: [openTime, open, high, low, close, ...]
+    df = pd.DataFrame(data)
+    df['date'] = pd.to_datetime(df[0], unit='ms').dt.date
+    df['btc_close'] = df[4].astype(float)
+    return df[['date', 'btc_close']]
+
+
+def fetch_btc_daily(days=365):
+    """BTC daily closes as `date`, `bitcoin_close`, falling back to Binance
+
+    Returns an empty frame if both sources fail.
+    """
+    try:
+        return fetch_coingecko_daily(coin_id="bitcoin", days=days)
+    except Exception:
+        pass
+    try:
+        df = fetch_binance_daily(symbol='BTCUSDT', limit=min(days, 1000))
+        return df.rename(columns={'btc_close': 'bitcoin_close'})
+    except Exception:
+        return pd.DataFrame()
@@ -0,0 +1,219 @@
+"""
+Process-wide background poller for BTC prices and the Fear & Greed Index.
+
+One daemon thread refreshes both series on a schedule and keeps them as daily
+points in fixed-size NumPy ring buffers. Dashboard sessions read snapshots
+from memory and never touch the network, so API traffic stays the same
+however many viewers are open. `version` only moves when a poll actually
+changes the data. Sessions compare it with the version they last rendered
+and rerun only when it differs.
+
+Usage (Streamlit):
+    @st.cache_resource
+    def get_poller():
+        return MarketPoller().start()
+
+    snapshot = get_poller().snapshot(price_days=120, fgi_days=400)
+    if snapshot["version"] != st.session_state.get("market_version"): ...
+"""
+
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from src import market_data
+
+PRICE_INTERVAL = float(os.getenv("MARKETMIND_PRICE_POLL_SECONDS", "60"))
+FGI_INTERVAL = float(os.getenv("MARKETMIND_FGI_POLL_SECONDS", "600"))
+PRICE_DAYS = 240
+FGI_DAYS = 500
+CAPACITY = 1024
+MAX_BACKOFF = 900
+
+
+class RingBuffer:
+    """Fixed-capacity daily series in NumPy arrays; the oldest days drop off"""
+
+    def __init__(self, capacity=CAPACITY):
+        self.capacity = capacity
+        self.days = np.zeros(capacity, dtype="datetime64[D]")
+        self.values = np.full(capacity, np.nan)
+        self.start = 0
+        self.size = 0
+
+    def last_day(self):
+        return self.days[(self.start + self.size - 1) % self.capacity] if self.size else None
+
+    def upsert(self, days, values):
+        """Merge sorted daily points; returns True if anything changed
+
+        Days before the newest stored day are history and ignored; the newest
+        day is overwritten if its value moved, and later days are appended.
+        """
+        days = np.asarray(days, dtype="datetime64[D]")
+        values = np.asarray(values, dtype=np.float64)
+        changed = False
+
+        last = self.last_day()
+        if last is not None:
+            same = days == last
+            if same.any():
+                slot = (self.start + self.size - 1) % self.capacity
+                value = values[same][-1]
+                if value != self.values[slot]:
+                    self.values[slot] = value
+                    changed = True
+            keep = days > last
+            days, values = days[keep], values[keep]
+
+        if len(days):
+            days, values = days[-self.capacity:], values[-self.capacity:]
+            slots = (self.start + self.size + np.arange(len(days))) % self.capacity
+            self.days[slots] = days
+            self.values[slots] = values
+            overflow = max(self.size + len(days) - self.capacity, 0)
+            self.start = (self.start + overflow) % self.capacity
+            self.size = min(self.size + len(days), self.capacity)
+            changed = True
+        return changed
+
+    def tail(self, n_days=None):
+        """Copies of the last `n_days` days and values, oldest first"""
+        order = (self.start + np.arange(self.size)) % self.capacity
+        days, values = self.days[order], self.values[order]
+        if n_days is not None and self.size:
+            keep = days > days[-1] - np.timedelta64(n_days, "D")
+            days, values = days[keep], values[keep]
+        return days, values
+
+
+def daily_last(df, time_col, value_col):
+    """Last value per calendar day, as `(days, values)` arrays"""
+    if df.empty:
+        return np.array([], dtype="datetime64[D]"), np.array([])
+    daily = df.set_index(time_col)[value_col].resample("1D").last().dropna()
+    return daily.index.values.astype("datetime64[D]"), daily.to_numpy(dtype=np.float64)
+
+
+class MarketPoller:
+    """Background thread keeping BTC prices and FGI fresh for every session"""
+
+    def __init__(self, price_interval=PRICE_INTERVAL, fgi_interval=FGI_INTERVAL,
+                 price_days=PRICE_DAYS, fgi_days=FGI_DAYS, capacity=CAPACITY):
+        self.prices = RingBuffer(capacity)
+        self.fgi = RingBuffer(capacity)
+        self.version = 0
+        self.updated_at = None
+        self.errors = {}
+        self._sources = {
+            "price": (price_interval, self._poll_prices),
+            "fgi": (fgi_interval, self._poll_fgi),
+        }
+        self._price_days = price_days
+        self._fgi_days = fgi_days
+        self._due = dict.fromkeys(self._sources, 0.0)
+        self._failures = dict.fromkeys(self._sources, 0)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+        self._thread = None
+
+    # -------------------------------------------------------
+    # LIFECYCLE
+    # -------------------------------------------------------
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="marketmind-poller", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def refresh_now(self):
+        """Poll every source on the next loop iteration"""
+        with self._lock:
+            self._due = dict.fromkeys(self._sources, 0.0)
+        self._wake.set()
+
+    def wait_until_ready(self, timeout=None):
+        """Block until every source has been polled once (successfully or not)"""
+        return self._ready.wait(timeout)
+
+    # -------------------------------------------------------
+    # POLLING
+    # -------------------------------------------------------
+    def _run(self):
+        while not self._stop.is_set():
+            now = time.monotonic()
+            for name, (interval, poll) in self._sources.items():
+                if now >= self._due[name]:
+                    self._poll(name, interval, poll)
+            if all(self._due[name] > 0 for name in self._sources):
+                self._ready.set()
+
+            self._wake.wait(max(min(self._due.values()) - time.monotonic(), 0.0))
+            self._wake.clear()
+
+    def _poll(self, name, interval, poll):
+        try:
+            changed = poll()
+        except Exception as e:
+            # Back off exponentially on errors (rate limits, outages)
+            self._failures[name] += 1
+            delay = min(interval * 2 ** self._failures[name], max(MAX_BACKOFF, interval))
+            with self._lock:
+                self.errors[name] = f"{type(e).__name__}: {e}"
+                self._due[name] = time.monotonic() + delay
+            return
+
+        self._failures[name] = 0
+        with self._lock:
+            self.errors.pop(name, None)
+            self._due[name] = time.monotonic() + interval
+            if changed:
+                self.version += 1
+                self.updated_at = time.time()
+
+    def _poll_prices(self):
+        df = market_data.fetch_coingecko_market_chart(days=self._price_days)
+        days, values = daily_last(df, "timestamp", "price")
+        with self._lock:
+            return self.prices.upsert(days, values)
+
+    def _poll_fgi(self):
+        df = market_data.fetch_fear_greed_history(limit_days=self._fgi_days)
+        days, values = daily_last(df, "date", "value")
+        with self._lock:
+            return self.fgi.upsert(days, values)
+
+    # -------------------------------------------------------
+    # READING
+    # -------------------------------------------------------
+    def snapshot(self, price_days=None, fgi_days=None):
+        """Point-in-time copy of the data
+
+        Returns a dict with `version`, `price_df` (`timestamp`, `price`) and
+        `fgi_df` (`date`, `value`) shaped like the market_data fetchers'
+        output, `updated_at` (epoch seconds of the last change) and `errors`
+        (last error per failing source).
+        """
+        with self._lock:
+            price_days_, prices = self.prices.tail(price_days)
+            fgi_days_, fgi = self.fgi.tail(fgi_days)
+            version, updated_at, errors = self.version, self.updated_at, dict(self.errors)
+        return {
+            "version": version,
+            "price_df": pd.DataFrame({"timestamp": price_days_.astype("datetime64[ns]"), "price": prices}),
+            "fgi_df": pd.DataFrame({"date": fgi_days_.astype("datetime64[ns]"), "value": fgi}),
+            "updated_at": updated_at,
+            "errors": errors,
+        }
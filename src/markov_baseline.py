@@ -0,0 +1,169 @@
+"""
+Markov-chain baseline for next-day sentiment.
+
+Sentiment is strongly autocorrelated, so "tomorrow looks like today, moved
+along the historical transition odds" is the baseline any model has to beat.
+`MarkovBaseline` counts day-to-day regime transitions, optionally split by
+the bucket (down / flat / up tercile) of the day's BTC return. The counts are
+one `bincount` over the history, and each new day adds a single count.
+
+Transition rows are kept normalised, so a next-day forecast is one row
+lookup, and a k-day forecast is that row times the k-1th power of the
+unconditional matrix (future BTC returns being unknown). `walk_forward`
+scores the baseline on the same chronological test days as the Random
+Forest, updating day by day as it goes.
+"""
+
+import numpy as np
+import pandas as pd
+
+EXTREME_MERGE = {'Extreme Fear': 'Fear', 'Extreme Greed': 'Greed'}
+N_BUCKETS = 3
+SMOOTHING = 1.0  # Laplace prior on every transition
+FORECAST_DAYS = 7
+
+
+def collapse_extremes(labels):
+    """Fear/Neutral/Greed labels, folding the Extreme classes into their neighbours"""
+    return pd.Series(labels).replace(EXTREME_MERGE)
+
+
+class MarkovBaseline:
+    """Transition counts between sentiment classes, optionally conditioned on BTC return buckets
+
+    `bucket_edges` split the previous day's BTC return into buckets; with no
+    edges the chain is unconditional.
+    """
+
+    def __init__(self, classes, bucket_edges=(), smoothing=SMOOTHING):
+        self.classes = list(classes)
+        self.edges = np.asarray(bucket_edges, dtype=np.float64)
+        self.smoothing = smoothing
+        k = len(self.classes)
+        self.counts = np.zeros((len(self.edges) + 1, k, k))
+        self.last_state = None
+        self.last_bucket = 0
+        self.last_date = None
+        self._index = {label: i for i, label in enumerate(self.classes)}
+        self._refresh()
+
+    @classmethod
+    def fit(cls, labels, returns=None, dates=None, classes=None, n_buckets=N_BUCKETS, smoothing=SMOOTHING):
+        """Baseline over a labelled daily history in date order
+
+        Bucket edges are the `n_buckets`-quantiles of `returns`. A constant
+        return series (e.g. no price data) gives an unconditional chain.
+        """
+        labels = pd.Series(labels).astype(str)
+        edges = ()
+        if returns is not None and n_buckets > 1:
+            values = np.asarray(returns, dtype=np.float64)
+            values = values[np.isfinite(values)]
+            if len(values) and values.std() > 0:
+                edges = np.unique(np.quantile(values, np.linspace(0, 1, n_buckets + 1)[1:-1]))
+        model = cls(classes or sorted(labels.unique()), edges, smoothing)
+        model.extend(labels, returns, dates)
+        return model
+
+    # -------------------------------------------------------
+    # UPDATES
+    # -------------------------------------------------------
+    def states(self, labels):
+        try:
+            return np.array([self._index[label] for label in labels], dtype=np.int64)
+        except KeyError as e:
+            raise ValueError(f"Unknown sentiment class {e.args[0]!r} (have {', '.join(self.classes)})") from None
+
+    def buckets(self, returns, n):
+        if returns is None or not len(self.edges):
+            return np.zeros(n, dtype=np.int64)
+        values = np.nan_to_num(np.asarray(returns, dtype=np.float64))
+        return np.searchsorted(self.edges, values, side='right')
+
+    def extend(self, labels, returns=None, dates=None):
+        """Absorb days in date order; the first one continues from the last absorbed day"""
+        states = self.states(pd.Series(labels).astype(str))
+        if not len(states):
+            return
+        buckets = self.buckets(returns, len(states))
+        if self.last_state is not None:
+            states = np.concatenate([[self.last_state], states])
+            buckets = np.concatenate([[self.last_bucket], buckets])
+        k = len(self.classes)
+        # Transition t-1 -> t is filed under day t-1's return bucket
+        flat = buckets[:-1] * k * k + states[:-1] * k + states[1:]
+        self.counts += np.bincount(flat, minlength=self.counts.size).reshape(self.counts.shape)
+        self.last_state, self.last_bucket = int(states[-1]), int(buckets[-1])
+        if dates is not None:
+            self.last_date = pd.Timestamp(pd.Series(dates).iloc[-1])
+        self._refresh()
+
+    def update_from(self, df, label_col='Sentiment', return_col='btc_return', date_col='date'):
+        """Absorb the rows of `df` dated after `last_date`; returns how many were new"""
+        df = df.sort_values(date_col)
+        dates = pd.to_datetime(df[date_col])
+        new = (dates > self.last_date).to_numpy() if self.last_date is not None else np.ones(len(df), dtype=bool)
+        if new.any():
+            rows = df.loc[new]
+            self.extend(rows[label_col], rows[return_col] if return_col in rows else None, dates[new])
+        return int(new.sum())
+
+    def _refresh(self):
+        smoothed = self.counts + self.smoothing
+        self.matrices = smoothed / smoothed.sum(axis=2, keepdims=True)
+        marginal = self.counts.sum(axis=0) + self.smoothing
+        self.transition = marginal / marginal.sum(axis=1, keepdims=True)
+
+    # -------------------------------------------------------
+    # FORECASTS
+    # -------------------------------------------------------
+    def predict_proba(self, state=None, bucket=None):
+        """Next-day class probabilities from `state` and its return `bucket` (default: the last day)"""
+        state = self.last_state if state is None else state
+        bucket = self.last_bucket if bucket is None else bucket
+        return self.matrices[bucket, state]
+
+    def predict(self):
+        """Most likely class for the day after the last absorbed one"""
+        return self.classes[int(np.argmax(self.predict_proba()))]
+
+    def forecast(self, days=FORECAST_DAYS):
+        """Class probabilities for each of the next `days` days (rows 1..days)"""
+        probs = np.empty((days, len(self.classes)))
+        probs[0] = self.predict_proba()
+        for h in range(1, days):
+            probs[h] = probs[h - 1] @ self.transition
+        return pd.DataFrame(probs, index=pd.RangeIndex(1, days + 1, name='days ahead'), columns=self.classes)
+
+    def stationary(self):
+        """Long-run share of days in each class"""
+        return pd.Series(np.linalg.matrix_power(self.transition, 512)[0], index=self.classes)
+
+
+def walk_forward(df, start_date, collapse=False, n_buckets=N_BUCKETS, label_col='Sentiment',
+                 return_col='btc_return', date_col='date'):
+    """Accuracy of next-day baseline forecasts for the days from `start_date` on
+
+    The chain is fitted on the earlier days, then predicts each test day from
+    the day before and absorbs it before moving on. Returns
+    `(accuracy, predictions)`, with one row per test day.
+    """
+    df = df.sort_values(date_col).drop_duplicates(date_col, keep='last')
+    labels = collapse_extremes(df[label_col]) if collapse else df[label_col].astype(str)
+    returns = df[return_col] if return_col in df else None
+    train = (pd.to_datetime(df[date_col]) < pd.Timestamp(start_date)).to_numpy()
+    if not train.any() or train.all():
+        return float('nan'), pd.DataFrame(columns=[date_col, 'actual', 'predicted'])
+
+    model = MarkovBaseline.fit(
+        labels[train], None if returns is None else returns[train],
+        classes=sorted(labels.unique()), n_buckets=n_buckets,
+    )
+    test_labels = labels[~train].tolist()
+    test_returns = [None] * len(test_labels) if returns is None else returns[~train].tolist()
+    predicted = []
+    for label, ret in zip(test_labels, test_returns):
+        predicted.append(model.predict())
+        model.extend([label], None if ret is None else [ret])
+    predictions = pd.DataFrame({date_col: df.loc[~train, date_col].to_numpy(), 'actual': test_labels, 'predicted': predicted})
+    return float((predictions['actual'] == predictions['predicted']).mean()), predictions
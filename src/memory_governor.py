@@ -0,0 +1,279 @@
+"""
+Per-session memory accounting with one byte budget for the whole process.
+
+Sessions keep large objects between reruns: parsed uploads, rollups, cached
+exports. Each one is kept in session state with no overall limit, so a few
+users uploading big files can push a small host out of memory. Instead,
+sessions `put` these objects in the process-wide `MemoryGovernor`, which:
+
+- estimates each object's size (DataFrames deep, arrays, containers and
+  plain objects recursively);
+- keeps the in-memory total under `budget_bytes` by evicting the largest
+  objects of the least recently active sessions first;
+- spills evicted objects to `spill_dir` as pickles and loads them back on
+  the next `get`. Objects put with `spill=False` are dropped instead,
+  because their owner can rebuild them from cached inputs. Pickles are
+  written after the lock is released, so a large spill never blocks other
+  sessions' reruns;
+- forgets sessions idle for longer than `SESSION_IDLE_SECONDS`, and deletes
+  their spill files.
+
+Objects under `MIN_BYTES` are counted but never evicted.
+"""
+
+import os
+import pickle
+import sys
+import threading
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+BUDGET_MB = float(os.getenv("MARKETMIND_SESSION_MEMORY_MB", "1024"))
+SPILL_DIR = os.getenv("MARKETMIND_SPILL_DIR", os.path.join("data", "spill"))
+SESSION_IDLE_SECONDS = 6 * 3600
+MIN_BYTES = 1024 * 1024
+
+
+def estimate_bytes(obj, _seen=None):
+    """Approximate memory held by `obj`, counting shared sub-objects once"""
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = obj.memory_usage(deep=True)
+        return int(usage.sum() if hasattr(usage, 'sum') else usage)
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, (bytes, bytearray, memoryview, str)):
+        return sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_bytes(k, seen) + estimate_bytes(v, seen) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(estimate_bytes(v, seen) for v in obj)
+    if hasattr(obj, '__dict__'):
+        return sys.getsizeof(obj) + estimate_bytes(vars(obj), seen)
+    return sys.getsizeof(obj)
+
+
+def process_rss_bytes():
+    """Resident set size of this process, or None where /proc is unavailable"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+class _Entry:
+    def __init__(self, value, nbytes, spill):
+        self.value = value
+        self.nbytes = nbytes
+        self.spill = spill
+        self.path = None      # spill file while evicted
+        self.spilling = None  # value being written to disk, outside the lock
+
+
+class _Session:
+    def __init__(self, user=None):
+        self.user = user
+        self.last_active = time.time()
+        self.entries = {}
+
+
+class MemoryGovernor:
+    """Process-wide store of sessions' large objects under one byte budget; thread-safe"""
+
+    def __init__(self, budget_bytes=BUDGET_MB * 1024 * 1024, spill_dir=SPILL_DIR, idle_seconds=SESSION_IDLE_SECONDS):
+        self.budget_bytes = budget_bytes
+        self.spill_dir = spill_dir
+        self.idle_seconds = idle_seconds
+        self.evictions = 0
+        self.reloads = 0
+        self._sessions = {}
+        self._lock = threading.RLock()
+
+    # -------------------------------------------------------
+    # SESSIONS
+    # -------------------------------------------------------
+    def touch(self, session_id, user=None):
+        """Mark a session active (call once per rerun) and forget long-idle sessions"""
+        with self._lock:
+            session = self._sessions.setdefault(session_id, _Session(user))
+            session.last_active = time.time()
+            session.user = user or session.user
+            self._expire()
+
+    def _expire(self):
+        cutoff = time.time() - self.idle_seconds
+        for session_id in [s for s, session in self._sessions.items() if session.last_active < cutoff]:
+            self.forget(session_id)
+
+    def forget(self, session_id):
+        """Drop everything a session holds, including spill files"""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            for entry in (session.entries.values() if session else ()):
+                self._remove_spill(entry)
+
+    # -------------------------------------------------------
+    # OBJECTS
+    # -------------------------------------------------------
+    def put(self, session_id, name, value, spill=True):
+        """Hold `value` for the session under `name`, then enforce the budget
+
+        The new object itself is evicted last, only if it alone exceeds the budget.
+        """
+        with self._lock:
+            session = self._sessions.setdefault(session_id, _Session())
+            session.last_active = time.time()
+            old = session.entries.pop(name, None)
+            if old is not None:
+                self._remove_spill(old)
+            session.entries[name] = _Entry(value, estimate_bytes(value), spill)
+            pending = self._enforce(keep=(session_id, name))
+        self._spill(pending)
+        return value
+
+    def get(self, session_id, name, default=None):
+        """The session's object, loaded back from disk if it was spilled; `default` if dropped or never put"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            entry = session.entries.get(name) if session else None
+            if entry is None:
+                return default
+            session.last_active = time.time()
+            if entry.value is not None:
+                return entry.value
+            if entry.spilling is not None:
+                # Still being written: take it back, the writer will discard its file
+                entry.value, entry.spilling = entry.spilling, None
+                self.reloads += 1
+            elif entry.path is not None:
+                path = entry.path
+            else:
+                del session.entries[name]
+                return default
+        value = None
+        if entry.value is None:
+            # Read outside the lock; if another `get` reloaded it first the file may be gone
+            try:
+                with open(path, 'rb') as f:
+                    value = pickle.load(f)
+            except OSError:
+                pass
+        with self._lock:
+            if entry.value is None:
+                if value is None:
+                    return default
+                entry.value = value
+                self.reloads += 1
+            self._remove_spill(entry)
+            pending = self._enforce(keep=(session_id, name)) if session.entries.get(name) is entry else []
+            value = entry.value
+        self._spill(pending)
+        return value
+
+    def discard(self, session_id, name):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            entry = session.entries.pop(name, None) if session else None
+            if entry is not None:
+                self._remove_spill(entry)
+
+    # -------------------------------------------------------
+    # BUDGET
+    # -------------------------------------------------------
+    def in_memory_bytes(self):
+        with self._lock:
+            return sum(e.nbytes for s in self._sessions.values() for e in s.entries.values() if e.value is not None)
+
+    def _enforce(self, keep):
+        """Evict until the budget holds; returns the `(entry, value)` spills to write after releasing the lock"""
+        total = self.in_memory_bytes()
+        pending = []
+        if total <= self.budget_bytes:
+            return pending
+        # Least recently active sessions first, largest objects first within a session
+        candidates = sorted(
+            ((session.last_active, -entry.nbytes, session_id, name)
+             for session_id, session in self._sessions.items()
+             for name, entry in session.entries.items()
+             if entry.value is not None and entry.nbytes >= MIN_BYTES and (session_id, name) != keep),
+        )
+        for _, _, session_id, name in candidates:
+            if total <= self.budget_bytes:
+                return pending
+            total -= self._evict(self._sessions[session_id].entries[name], session_id, name, pending)
+        entry = self._sessions[keep[0]].entries[keep[1]]
+        if total > self.budget_bytes and entry.nbytes >= MIN_BYTES:
+            self._evict(entry, *keep, pending)
+        return pending
+
+    def _evict(self, entry, session_id, name, pending):
+        if entry.spill:
+            path = os.path.join(self.spill_dir, f"{session_id}-{name}-{uuid.uuid4().hex}.pkl")
+            entry.spilling = entry.value
+            pending.append((entry, path))
+        entry.value = None
+        self.evictions += 1
+        return entry.nbytes
+
+    def _spill(self, pending):
+        """Write evicted values to disk without holding the lock"""
+        for entry, path in pending:
+            value = entry.spilling
+            if value is None:  # taken back by a `get` before we got to it
+                continue
+            os.makedirs(self.spill_dir, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            with self._lock:
+                if entry.spilling is value and self._holds(entry):
+                    entry.path, entry.spilling = path, None
+                    continue
+            # Reloaded, replaced or discarded while writing
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _holds(self, entry):
+        return any(entry is e for session in self._sessions.values() for e in session.entries.values())
+
+    @staticmethod
+    def _remove_spill(entry):
+        if entry.path is not None:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+            entry.path = None
+
+    # -------------------------------------------------------
+    # REPORTING
+    # -------------------------------------------------------
+    def usage(self, session_id=None):
+        """One row per session: user, idle seconds, bytes in memory and on disk, object names"""
+        now = time.time()
+        with self._lock:
+            rows = [{
+                'session': sid,
+                'user': session.user,
+                'idle_s': now - session.last_active,
+                'in_memory': sum(e.nbytes for e in session.entries.values() if e.value is not None),
+                'spilled': sum(e.nbytes for e in session.entries.values() if e.path is not None or e.spilling is not None),
+                'objects': ', '.join(
+                    f"{name}{'' if e.value is not None else ' (spilled)' if e.path or e.spilling is not None else ' (dropped)'}"
+                    for name, e in session.entries.items()
+                ),
+            } for sid, session in self._sessions.items() if session_id is None or sid == session_id]
+        return pd.DataFrame(rows, columns=['session', 'user', 'idle_s', 'in_memory', 'spilled', 'objects'])
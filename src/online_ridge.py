@@ -0,0 +1,163 @@
+"""
+Incremental Ridge regression with an online standard scaler.
+
+`OnlineRidge` keeps the sufficient statistics of the training rows: the count,
+the feature and target means, and the centred co-moments X'X and X'y. These
+are merged with Chan's parallel update, so absorbing a new row costs
+O(features²) and needs none of the old rows. The coefficients are solved on
+demand from the statistics and reproduce
+`Pipeline([StandardScaler(), Ridge(alpha)])` fitted on the same rows, up to
+floating-point round-off.
+
+The state persists to a small `.npz` file together with the last absorbed
+date, so the dashboard only has to feed in the days it has not seen yet.
+"""
+
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+
+
+class OnlineRidge:
+    """Ridge regression on standardised features, updated row by row"""
+
+    def __init__(self, feature_names, alpha=1.0):
+        self.feature_names = list(feature_names)
+        self.alpha = float(alpha)
+        p = len(self.feature_names)
+        self.n = 0
+        self.x_mean = np.zeros(p)
+        self.y_mean = 0.0
+        self.xx = np.zeros((p, p))
+        self.xy = np.zeros(p)
+        self.last_date = None
+        self._solution = None
+
+    # -------------------------------------------------------
+    # UPDATES
+    # -------------------------------------------------------
+    def partial_fit(self, X, y, last_date=None):
+        """Absorb rows `X`, `y`; `last_date` records how far the data goes"""
+        X = np.asarray(X, dtype=np.float64).reshape(-1, len(self.feature_names))
+        y = np.asarray(y, dtype=np.float64).ravel()
+        if len(X):
+            x_mean, y_mean = X.mean(axis=0), y.mean()
+            dx, dy = X - x_mean, y - y_mean
+            self._merge(len(X), x_mean, y_mean, dx.T @ dx, dx.T @ dy)
+        if last_date is not None:
+            self.last_date = pd.Timestamp(last_date)
+        return self
+
+    def _merge(self, n_b, x_mean_b, y_mean_b, xx_b, xy_b):
+        n_a, n = self.n, self.n + n_b
+        dx = x_mean_b - self.x_mean
+        dy = y_mean_b - self.y_mean
+        weight = n_a * n_b / n
+        self.xx += xx_b + np.outer(dx, dx) * weight
+        self.xy += xy_b + dx * dy * weight
+        self.x_mean += dx * n_b / n
+        self.y_mean += dy * n_b / n
+        self.n = n
+        self._solution = None
+
+    # -------------------------------------------------------
+    # SOLUTION
+    # -------------------------------------------------------
+    @property
+    def scale_(self):
+        """Feature standard deviations (ddof=0); constant features keep scale 1 like StandardScaler"""
+        n = max(self.n, 1)
+        var = np.clip(np.diag(self.xx), 0, None) / n
+        eps = np.finfo(np.float64).eps
+        constant = var <= n * eps * var + (n * self.x_mean * eps) ** 2
+        return np.where(constant, 1.0, np.sqrt(var))
+
+    def _solve(self):
+        if self._solution is None:
+            if self.n == 0:
+                raise ValueError("OnlineRidge has not absorbed any rows yet")
+            scale = self.scale_
+            # Normal equations of the scaled, centred problem: (Z'Z + aI) w = Z'y
+            gram = self.xx / np.outer(scale, scale) + self.alpha * np.eye(len(scale))
+            coef = np.linalg.solve(gram, self.xy / scale)
+            self._solution = (coef, scale)
+        return self._solution
+
+    @property
+    def coef_(self):
+        """Coefficients on standardised features, as in the sklearn Pipeline's Ridge step"""
+        return self._solve()[0]
+
+    @property
+    def intercept_(self):
+        return self.y_mean
+
+    def predict(self, X):
+        if isinstance(X, pd.DataFrame):
+            X = X[self.feature_names]
+        coef, scale = self._solve()
+        X = np.asarray(X, dtype=np.float64).reshape(-1, len(self.feature_names))
+        return (X - self.x_mean) / scale @ coef + self.y_mean
+
+    # -------------------------------------------------------
+    # PERSISTENCE
+    # -------------------------------------------------------
+    def save(self, path):
+        """Write the state to `path` atomically"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp-{uuid.uuid4().hex}"
+        try:
+            with open(tmp_path, "wb") as f:
+                np.savez(
+                    f,
+                    feature_names=np.asarray(self.feature_names),
+                    alpha=self.alpha,
+                    n=self.n,
+                    x_mean=self.x_mean,
+                    y_mean=self.y_mean,
+                    xx=self.xx,
+                    xy=self.xy,
+                    last_date=str(self.last_date) if self.last_date is not None else "",
+                )
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as state:
+            model = cls(state["feature_names"].tolist(), alpha=float(state["alpha"]))
+            model.n = int(state["n"])
+            model.x_mean = state["x_mean"].copy()
+            model.y_mean = float(state["y_mean"])
+            model.xx = state["xx"].copy()
+            model.xy = state["xy"].copy()
+            last_date = str(state["last_date"])
+        model.last_date = pd.Timestamp(last_date) if last_date else None
+        return model
+
+    # -------------------------------------------------------
+    # SYNC
+    # -------------------------------------------------------
+    def update_from(self, X, y, dates):
+        """Absorb only the rows dated after `last_date`; returns how many were new"""
+        dates = pd.to_datetime(pd.Series(dates, index=X.index))
+        new = dates > self.last_date if self.last_date is not None else np.ones(len(X), dtype=bool)
+        if new.any():
+            self.partial_fit(X.loc[new, self.feature_names], y[new], last_date=dates[new].max())
+        return int(new.sum())
+
+
+def load_or_create(path, feature_names, alpha=1.0):
+    """The saved model at `path`, or a fresh one if missing or trained on other features/alpha"""
+    if os.path.exists(path):
+        try:
+            model = OnlineRidge.load(path)
+        except (OSError, ValueError, KeyError):
+            model = None
+        if model is not None and model.feature_names == list(feature_names) and model.alpha == alpha:
+            return model
+    return OnlineRidge(feature_names, alpha=alpha)
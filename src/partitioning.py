@@ -0,0 +1,98 @@
+"""
+Partitioned execution of the trade log.
+
+Trades are hash-partitioned on their group keys (`symbol`, `trader_type`)
+at ingestion, so every group lives in exactly one partition. Each
+partition is cleaned, aggregated and risk-scored independently on a
+process pool and the per-partition results are concatenated.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.clustering_and_risk import compute_risk_metrics
+from src.data_preprocessing import clean_trader_data
+
+PARTITION_KEYS = ['symbol', 'trader_type']
+
+# Below this many rows the pickling cost of a process pool outweighs the work.
+MIN_ROWS_FOR_POOL = 200_000
+
+
+def available_keys(trader_df, keys=PARTITION_KEYS):
+    """Partition keys present in the trade log"""
+    return [k for k in keys if k in trader_df.columns]
+
+
+def ingest_trades(trader_df, keys=PARTITION_KEYS):
+    """Store group keys as categoricals so hashing and grouping stay cheap"""
+    keys = available_keys(trader_df, keys)
+    converted = {
+        k: trader_df[k].astype('category')
+        for k in keys
+        if not isinstance(trader_df[k].dtype, pd.CategoricalDtype)
+    }
+    return trader_df.assign(**converted) if converted else trader_df
+
+
+def partition_trades(trader_df, n_partitions, keys=PARTITION_KEYS):
+    """Split trades into `n_partitions` frames by a hash of the group keys"""
+    keys = available_keys(trader_df, keys)
+    if not keys or n_partitions <= 1:
+        return [trader_df]
+
+    hashes = pd.util.hash_pandas_object(trader_df[keys], index=False).to_numpy()
+    buckets = hashes % np.uint64(n_partitions)
+    order = np.argsort(buckets, kind='stable')
+    bounds = np.searchsorted(buckets[order], np.arange(1, n_partitions))
+    return [
+        trader_df.iloc[idx]
+        for idx in np.split(order, bounds)
+        if len(idx)
+    ]
+
+
+def process_partition(trader_df, keys):
+    """Clean, aggregate and risk-score one partition"""
+    df = clean_trader_data(trader_df)
+    df = df.assign(win=df['closedPnL'] > 0)
+
+    daily = df.groupby(keys + ['date'], observed=True, sort=True).agg(
+        closedPnL=('closedPnL', 'mean'),
+        pnl_sum=('closedPnL', 'sum'),
+        pnl_std=('closedPnL', 'std'),
+        leverage=('leverage', 'mean'),
+        max_leverage=('leverage', 'max'),
+        size=('size', 'sum'),
+        trades=('closedPnL', 'size'),
+        wins=('win', 'sum'),
+    ).reset_index()
+
+    risk = compute_risk_metrics(daily, by=keys)
+    return daily, risk
+
+
+def run_partitioned_pipeline(trader_df, keys=PARTITION_KEYS, n_workers=None):
+    """Process the trade log partition-by-partition and merge the results
+
+    Returns a `(daily, risk)` tuple: daily aggregates per group and day, and
+    one row of risk metrics per group.
+    """
+    keys = available_keys(trader_df, keys)
+    n_workers = n_workers or os.cpu_count() or 1
+    trader_df = ingest_trades(trader_df, keys)
+
+    if n_workers == 1 or len(trader_df) < MIN_ROWS_FOR_POOL:
+        parts = partition_trades(trader_df, 1, keys)
+        results = [process_partition(part, keys) for part in parts]
+    else:
+        parts = partition_trades(trader_df, n_workers * 2, keys)
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            results = list(pool.map(process_partition, parts, [keys] * len(parts)))
+
+    daily = pd.concat([r[0] for r in results], ignore_index=True)
+    risk = pd.concat([r[1] for r in results], ignore_index=True)
+    return daily.sort_values(keys + ['date']).reset_index(drop=True), risk.sort_values(keys).reset_index(drop=True)
@@ -0,0 +1,208 @@
+"""
+Lightweight span timing and counters for the dashboard hot paths.
+
+Usage:
+    from src import perf
+
+    perf.begin_run(enabled=True)
+    with perf.span("load"):
+        ...
+    perf.incr("bytes_fetched_total", len(payload), source="coingecko")
+    perf.end_run()
+
+Recording is per script run (one Streamlit session thread each), while
+totals are aggregated process-wide for the JSONL/Prometheus exports. When
+recording is off, `span()` returns a shared no-op context manager and
+`incr()` returns immediately, so instrumented code pays one attribute lookup.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+PERF_ENV = os.getenv("MARKETMIND_PERF", "0") == "1"
+PERF_DIR = os.getenv("MARKETMIND_PERF_DIR", "perf")
+JSONL_FILE = "metrics.jsonl"
+PROMETHEUS_FILE = "metrics.prom"
+
+_local = threading.local()
+_lock = threading.Lock()
+_span_totals = defaultdict(lambda: [0, 0.0])   # name -> [count, seconds]
+_counter_totals = defaultdict(float)           # (name, labels) -> value
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("name", "start", "depth")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.depth = _local.depth
+        _local.depth += 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        _local.depth -= 1
+        _local.spans.append((self.name, elapsed, self.depth))
+        with _lock:
+            total = _span_totals[self.name]
+            total[0] += 1
+            total[1] += elapsed
+        return False
+
+
+# -----------------------------------------------------------
+# RECORDING
+# -----------------------------------------------------------
+def enabled():
+    """Whether the current thread is recording"""
+    return getattr(_local, "enabled", False)
+
+
+def begin_run(enabled=PERF_ENV):
+    """Start a fresh recording for the current script run"""
+    _local.enabled = enabled
+    _local.spans = []
+    _local.counters = defaultdict(float)
+    _local.depth = 0
+    _local.started = time.time()
+
+
+def span(name):
+    """Context manager timing the enclosed block as `name`"""
+    if not getattr(_local, "enabled", False):
+        return _NOOP
+    return _Span(name)
+
+
+def incr(name, value=1, **labels):
+    """Add `value` to a counter, optionally labelled"""
+    if not getattr(_local, "enabled", False):
+        return
+    key = (name, tuple(sorted(labels.items())))
+    _local.counters[key] += value
+    with _lock:
+        _counter_totals[key] += value
+
+
+def instrument_cache(name, cache_decorator):
+    """Wrap a caching decorator (e.g. `st.cache_data(ttl=300)`) to count lookups and misses
+
+    The inner wrapper only runs when the cache misses, so
+    hits = cache_lookups_total - cache_misses_total.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def on_miss(*args, **kwargs):
+            incr("cache_misses_total", cache=name)
+            return func(*args, **kwargs)
+
+        cached = cache_decorator(on_miss)
+
+        @functools.wraps(func)
+        def lookup(*args, **kwargs):
+            incr("cache_lookups_total", cache=name)
+            return cached(*args, **kwargs)
+
+        lookup.clear = getattr(cached, "clear", None)
+        return lookup
+
+    return decorate
+
+
+# -----------------------------------------------------------
+# REPORTING
+# -----------------------------------------------------------
+def run_spans():
+    """Spans recorded in the current run as `(name, seconds, depth)`, in completion order"""
+    return list(getattr(_local, "spans", []))
+
+
+def run_counters():
+    """Counters recorded in the current run as `{(name, labels): value}`"""
+    return dict(getattr(_local, "counters", {}))
+
+
+def cache_stats(counters):
+    """Per-cache `{name: (hits, misses)}` from a counter mapping"""
+    lookups, misses = defaultdict(float), defaultdict(float)
+    for (name, labels), value in counters.items():
+        cache = dict(labels).get("cache")
+        if name == "cache_lookups_total":
+            lookups[cache] += value
+        elif name == "cache_misses_total":
+            misses[cache] += value
+    return {cache: (int(lookups[cache] - misses[cache]), int(misses[cache])) for cache in lookups}
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+def prometheus_text():
+    """Process-wide totals in the Prometheus text exposition format"""
+    with _lock:
+        spans = {name: tuple(total) for name, total in _span_totals.items()}
+        counters = dict(_counter_totals)
+
+    lines = [
+        "# HELP marketmind_span_seconds Time spent in instrumented dashboard sections.",
+        "# TYPE marketmind_span_seconds summary",
+    ]
+    for name, (count, seconds) in sorted(spans.items()):
+        lines.append(f'marketmind_span_seconds_sum{{span="{name}"}} {seconds:.6f}')
+        lines.append(f'marketmind_span_seconds_count{{span="{name}"}} {count}')
+
+    for name in sorted({key[0] for key in counters}):
+        lines.append(f"# TYPE marketmind_{name} counter")
+        for (counter, labels), value in sorted(counters.items()):
+            if counter == name:
+                lines.append(f"marketmind_{name}{_format_labels(labels)} {value:g}")
+    return "\n".join(lines) + "\n"
+
+
+def end_run(directory=PERF_DIR, **context):
+    """Append this run to the JSONL log and refresh the Prometheus file"""
+    if not getattr(_local, "enabled", False):
+        return
+
+    record = {
+        "ts": _local.started,
+        **context,
+        "spans": [{"name": n, "seconds": round(s, 6), "depth": d} for n, s, d in _local.spans],
+        "counters": [
+            {"name": name, "labels": dict(labels), "value": value}
+            for (name, labels), value in _local.counters.items()
+        ],
+    }
+
+    os.makedirs(directory, exist_ok=True)
+    with _lock:
+        with open(os.path.join(directory, JSONL_FILE), "a") as f:
+            f.write(json.dumps(record) + "\n")
+    prom_path = os.path.join(directory, PROMETHEUS_FILE)
+    tmp_path = f"{prom_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(prometheus_text())
+    os.replace(tmp_path, prom_path)
@@ -0,0 +1,127 @@
+"""
+On-demand profiling of a single script run.
+
+A background thread samples the profiled thread's stack at a fixed interval
+and aggregates the samples into collapsed stacks (the `folded` format read by
+flamegraph.pl, speedscope and inferno). Optionally cProfile runs alongside
+for exact call counts. Each capture writes a `.folded` file, a top-N text
+table and, in deterministic mode, a `.prof` pstats dump.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+PROFILE_DIR = os.getenv("MARKETMIND_PROFILE_DIR", "profiles")
+DEFAULT_INTERVAL = 0.005
+DEFAULT_TOP_N = 25
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class RunProfiler:
+    """Profile the calling thread between `start()` and `stop()`"""
+
+    def __init__(self, deterministic=False, interval=DEFAULT_INTERVAL):
+        self.deterministic = deterministic
+        self.interval = interval
+        self.samples = Counter()
+        self.elapsed = 0.0
+        self._profile = None
+        self._stop = threading.Event()
+        self._sampler = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def start(self):
+        target = threading.get_ident()
+        self._stop.clear()
+        self._sampler = threading.Thread(
+            target=self._sample, args=(target,), name="marketmind-profiler", daemon=True
+        )
+        self._started = time.perf_counter()
+        self._sampler.start()
+        if self.deterministic:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def stop(self):
+        if self._profile is not None:
+            self._profile.disable()
+        self._stop.set()
+        self._sampler.join()
+        self.elapsed = time.perf_counter() - self._started
+
+    def _sample(self, target):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(target)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    # -------------------------------------------------------
+    # OUTPUT
+    # -------------------------------------------------------
+    def folded(self):
+        """Collapsed stacks, one `frame;frame;... count` line per unique stack"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def top_table(self, n=DEFAULT_TOP_N):
+        """Top-N functions as text: pstats when deterministic, else sample counts"""
+        if self._profile is not None:
+            out = io.StringIO()
+            stats = pstats.Stats(self._profile, stream=out)
+            stats.strip_dirs().sort_stats("cumulative").print_stats(n)
+            return out.getvalue()
+
+        total = sum(self.samples.values()) or 1
+        self_counts, inclusive = Counter(), Counter()
+        for stack, count in self.samples.items():
+            frames = stack.split(";")
+            self_counts[frames[-1]] += count
+            for frame in set(frames):
+                inclusive[frame] += count
+
+        lines = [
+            f"{total} samples every {self.interval * 1000:.1f} ms over {self.elapsed:.2f}s",
+            "",
+            f"{'self %':>7} {'total %':>8}  function",
+        ]
+        ranked = sorted(inclusive, key=lambda f: (self_counts[f], inclusive[f]), reverse=True)
+        for frame in ranked[:n]:
+            count = inclusive[frame]
+            lines.append(f"{100 * self_counts[frame] / total:>6.1f}% {100 * count / total:>7.1f}%  {frame}")
+        return "\n".join(lines) + "\n"
+
+    def save(self, directory=PROFILE_DIR, label="run", top_n=DEFAULT_TOP_N):
+        """Write the capture to `directory`; returns `{kind: path}`"""
+        os.makedirs(directory, exist_ok=True)
+        stem = os.path.join(directory, f"{datetime.now():%Y%m%d-%H%M%S}-{label}")
+        paths = {"folded": f"{stem}.folded", "top": f"{stem}_top.txt"}
+
+        with open(paths["folded"], "w") as f:
+            f.write(self.folded())
+        with open(paths["top"], "w") as f:
+            f.write(self.top_table(top_n))
+        if self._profile is not None:
+            paths["pstats"] = f"{stem}.prof"
+            self._profile.dump_stats(paths["pstats"])
+        return paths
@@ -0,0 +1,228 @@
+"""
+Rolling-window correlations, Sharpe ratios and z-scores from running sums.
+
+`RollingStats` keeps, for each window length, the running count, column sums
+and cross-products of the most recent rows. Every statistic (means,
+covariances, correlations, Sharpe, z-scores) is derived from those sums, so:
+
+- a bulk `extend` over multi-year history is one vectorised O(n) pass over
+  cumulative sums, for all windows at once;
+- appending a single day is O(columns²) per window: the new row is added and
+  the row leaving the window subtracted, with no recomputation of history.
+
+Values are centred on the first batch's means before summing, which keeps the
+differences of cumulative sums accurate. The running sums of single-row
+appends are resynchronised from the stored rows every `max(windows)` appends,
+so float drift can't accumulate.
+"""
+
+import numpy as np
+import pandas as pd
+
+WINDOWS = (30, 90, 365)
+MIN_PERIODS = 10
+PERIODS_PER_YEAR = 365
+# Ordinal stand-in for the Fear & Greed value when the sentiment data has none
+SENTIMENT_SCORES = {'Extreme Fear': 10, 'Fear': 35, 'Neutral': 50, 'Greed': 65, 'Extreme Greed': 90}
+
+
+class RollingStats:
+    """Statistics of several columns over several trailing windows, updated incrementally
+
+    `corr_pairs` are `(a, b)` column pairs to correlate, `sharpe` columns get
+    an annualised mean/std ratio and `zscore` columns the latest value's
+    distance from the window mean in standard deviations. Statistics are NaN
+    until a window holds `min(min_periods, window)` rows.
+    """
+
+    def __init__(self, columns, windows=WINDOWS, corr_pairs=(), sharpe=(), zscore=(),
+                 min_periods=MIN_PERIODS, periods_per_year=PERIODS_PER_YEAR):
+        self.columns = list(columns)
+        self.windows = sorted({int(w) for w in windows})
+        self.corr_pairs = [tuple(pair) for pair in corr_pairs]
+        self.sharpe = list(sharpe)
+        self.zscore = list(zscore)
+        self.min_periods = min_periods
+        self.periods_per_year = periods_per_year
+
+        k = len(self.columns)
+        self.capacity = self.windows[-1]
+        self.rows = np.zeros((self.capacity, k))  # ring buffer of centred rows
+        self.start = 0
+        self.size = 0
+        self.center = None
+        self.n = dict.fromkeys(self.windows, 0)
+        self.sums = {w: np.zeros(k) for w in self.windows}
+        self.products = {w: np.zeros((k, k)) for w in self.windows}
+        self.last_date = None
+        self._appends = 0
+        self._frames = []
+
+    # -------------------------------------------------------
+    # UPDATES
+    # -------------------------------------------------------
+    def extend(self, rows, index=None):
+        """Absorb `rows` (oldest first); returns their statistics as a frame
+
+        The result has one row per input row and `(window, metric)` columns.
+        """
+        if isinstance(rows, pd.DataFrame):
+            index = rows.index if index is None else index
+            rows = rows[self.columns]
+        X = np.asarray(rows, dtype=np.float64).reshape(-1, len(self.columns))
+        if not np.isfinite(X).all():
+            raise ValueError("RollingStats needs finite values; fill gaps before extending")
+        if self.center is None:
+            self.center = X.mean(axis=0) if len(X) else np.zeros(len(self.columns))
+        X = X - self.center
+
+        if len(X) == 1:
+            window_sums = self._append(X[0])
+        else:
+            window_sums = self._extend_block(X)
+        frame = self._metrics(X, window_sums, index)
+        self._frames.append(frame)
+        return frame
+
+    def update_from(self, df, date_col='date'):
+        """Absorb only the rows of `df` dated after `last_date`; returns how many were new"""
+        dates = pd.to_datetime(df[date_col])
+        new = (dates > self.last_date).to_numpy() if self.last_date is not None else np.ones(len(df), dtype=bool)
+        if new.any():
+            self.extend(df.loc[new, self.columns], index=pd.DatetimeIndex(dates[new], name=date_col))
+            self.last_date = dates[new].max()
+        return int(new.sum())
+
+    def _tail(self):
+        order = (self.start + np.arange(self.size)) % self.capacity
+        return self.rows[order]
+
+    def _push(self, X):
+        X = X[-self.capacity:]
+        slots = (self.start + self.size + np.arange(len(X))) % self.capacity
+        self.rows[slots] = X
+        overflow = max(self.size + len(X) - self.capacity, 0)
+        self.start = (self.start + overflow) % self.capacity
+        self.size = min(self.size + len(X), self.capacity)
+
+    def _extend_block(self, X):
+        """Window sums after each row of `X`, from cumulative sums over the stored tail + `X`"""
+        tail = self._tail()
+        block = np.vstack([tail, X])
+        k = block.shape[1]
+        csum = np.vstack([np.zeros((1, k)), np.cumsum(block, axis=0)])
+        cprod = np.concatenate([np.zeros((1, k, k)), np.cumsum(block[:, :, None] * block[:, None, :], axis=0)])
+
+        # The tail holds every stored row a window can reach, so a window
+        # starting before it is still filling up and starts at row 0
+        ends = np.arange(len(tail) + 1, len(block) + 1)
+        window_sums = {}
+        for w in self.windows:
+            starts = np.maximum(ends - w, 0)
+            n = ends - starts
+            sums = csum[ends] - csum[starts]
+            products = cprod[ends] - cprod[starts]
+            window_sums[w] = (n, sums, products)
+            self.n[w], self.sums[w], self.products[w] = int(n[-1]), sums[-1].copy(), products[-1].copy()
+
+        self._push(X)
+        self._appends = 0
+        return window_sums
+
+    def _append(self, x):
+        """Window sums after adding one row: add it, subtract the row leaving each window"""
+        tail = self._tail()
+        outer = np.outer(x, x)
+        window_sums = {}
+        for w in self.windows:
+            if self.n[w] == w:
+                old = tail[len(tail) - w]
+                self.sums[w] -= old
+                self.products[w] -= np.outer(old, old)
+            else:
+                self.n[w] += 1
+            self.sums[w] += x
+            self.products[w] += outer
+            window_sums[w] = (np.array([self.n[w]]), self.sums[w][None].copy(), self.products[w][None].copy())
+
+        self._push(x[None])
+        self._appends += 1
+        if self._appends >= self.capacity:
+            self._resync()
+        return window_sums
+
+    def _resync(self):
+        """Recompute the running sums exactly from the stored rows"""
+        tail = self._tail()
+        for w in self.windows:
+            rows = tail[-w:]
+            self.n[w] = len(rows)
+            self.sums[w] = rows.sum(axis=0)
+            self.products[w] = rows.T @ rows
+        self._appends = 0
+
+    # -------------------------------------------------------
+    # STATISTICS
+    # -------------------------------------------------------
+    def _metrics(self, X, window_sums, index):
+        col = {name: i for i, name in enumerate(self.columns)}
+        out = {}
+        for w, (n, sums, products) in window_sums.items():
+            n = n.astype(np.float64)
+            valid = n >= max(min(self.min_periods, w), 2)
+            safe_n = np.where(valid, n, np.nan)
+            mean = sums / safe_n[:, None]
+            cov = (products - sums[:, :, None] * sums[:, None, :] / safe_n[:, None, None]) / (safe_n - 1)[:, None, None]
+            var = np.clip(np.diagonal(cov, axis1=1, axis2=2), 0, None)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                std = np.sqrt(var)
+                for a, b in self.corr_pairs:
+                    i, j = col[a], col[b]
+                    out[(w, f'corr({a}, {b})')] = np.clip(cov[:, i, j] / (std[:, i] * std[:, j]), -1, 1)
+                for c in self.sharpe:
+                    i = col[c]
+                    out[(w, f'sharpe({c})')] = (mean[:, i] + self.center[i]) / std[:, i] * np.sqrt(self.periods_per_year)
+                for c in self.zscore:
+                    i = col[c]
+                    out[(w, f'zscore({c})')] = (X[:, i] - mean[:, i]) / std[:, i]
+        frame = pd.DataFrame(out, index=index)
+        frame.columns = pd.MultiIndex.from_tuples(frame.columns, names=['window', 'metric'])
+        return frame.replace([np.inf, -np.inf], np.nan)
+
+    @property
+    def frame(self):
+        """Statistics of every row absorbed so far"""
+        if not self._frames:
+            return pd.DataFrame()
+        if len(self._frames) > 1:
+            self._frames = [pd.concat(self._frames)]
+        return self._frames[0]
+
+
+def rolling_input(merged_df, sentiment_df):
+    """Daily `date`, closedPnL, leverage, btc_return, fgi rows for `sentiment_rolling_stats`
+
+    `fgi` is the sentiment file's `value` column when it has one, otherwise an
+    ordinal score of the day's classification. Gaps are carried forward.
+    """
+    df = merged_df[['date', 'closedPnL', 'leverage', 'btc_return', 'Sentiment']].sort_values('date')
+    if 'value' in sentiment_df.columns:
+        values = sentiment_df.drop_duplicates('date', keep='last').set_index('date')['value']
+        fgi = df['date'].map(values)
+    else:
+        fgi = df['Sentiment'].map(SENTIMENT_SCORES)
+    df = df.drop(columns='Sentiment').assign(fgi=pd.to_numeric(fgi, errors='coerce'))
+    value_cols = ['closedPnL', 'leverage', 'btc_return', 'fgi']
+    df[value_cols] = df[value_cols].ffill().fillna(0.0)
+    return df.reset_index(drop=True)
+
+
+def sentiment_rolling_stats(windows=WINDOWS):
+    """The dashboard's rolling view: PnL/leverage vs BTC return and FGI, PnL Sharpe, leverage z-score"""
+    return RollingStats(
+        ['closedPnL', 'leverage', 'btc_return', 'fgi'],
+        windows=windows,
+        corr_pairs=[('closedPnL', 'btc_return'), ('leverage', 'btc_return'), ('closedPnL', 'fgi'), ('leverage', 'fgi')],
+        sharpe=['closedPnL'],
+        zscore=['leverage'],
+    )
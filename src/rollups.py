@@ -0,0 +1,220 @@
+"""
+Multi-resolution rollups of the trade log: minute → hour → day → week.
+
+`build_pyramid` reads the raw trades once and builds the minute level. Each
+coarser level is then rolled up from the one below it. Every aggregate is
+mergeable: sums, counts, minima and maxima, and for the hour level and above
+a log-scale histogram sketch of PnL that gives approximate quantiles. So a
+pyramid built per file at ingestion can be merged (`merge_pyramids`) into the
+pyramid of the whole log, and any level can be rebuilt from a finer one
+without touching the raw rows.
+
+Charts ask `RollupPyramid.query` for a time range. It picks the coarsest
+level that still gives at least `min_points` buckets across the range, and
+slices it with a binary search. A year costs about as much as zooming into a
+single day.
+"""
+
+import numpy as np
+import pandas as pd
+
+LEVELS = ['minute', 'hour', 'day', 'week']
+LEVEL_STEPS = {
+    'minute': np.timedelta64(1, 'm'),
+    'hour': np.timedelta64(1, 'h'),
+    'day': np.timedelta64(1, 'D'),
+    'week': np.timedelta64(7, 'D'),
+}
+MIN_POINTS = 100
+
+# PnL sketch: signed log10(1 + |pnl|) in equal-width bins over ±SKETCH_DECADES
+SKETCH_BINS = 64
+SKETCH_DECADES = 7.0
+SKETCH_COLUMNS = [f'q{i}' for i in range(SKETCH_BINS)]
+
+AGGREGATES = {
+    'trades': 'sum',
+    'pnl_sum': 'sum',
+    'pnl_sq_sum': 'sum',
+    'pnl_min': 'min',
+    'pnl_max': 'max',
+    'wins': 'sum',
+    'leverage_sum': 'sum',
+    'leverage_max': 'max',
+    'size': 'sum',
+}
+
+METRICS = {
+    'Avg PnL': lambda f: f['pnl_sum'] / f['trades'],
+    'Total PnL': lambda f: f['pnl_sum'],
+    'PnL Std': lambda f: np.sqrt(np.clip(
+        (f['pnl_sq_sum'] - f['pnl_sum'] ** 2 / f['trades']) / (f['trades'] - 1), 0, None
+    )),
+    'Min PnL': lambda f: f['pnl_min'],
+    'Max PnL': lambda f: f['pnl_max'],
+    'Win Rate': lambda f: f['wins'] / f['trades'],
+    'Avg Leverage': lambda f: f['leverage_sum'] / f['trades'],
+    'Max Leverage': lambda f: f['leverage_max'],
+    'Volume': lambda f: f['size'],
+    'Trades': lambda f: f['trades'],
+}
+# Read from the PnL sketch, so NaN at minute level
+METRIC_NAMES = list(METRICS) + ['Median PnL']
+
+
+# -----------------------------------------------------------
+# BUCKETS & SKETCHES
+# -----------------------------------------------------------
+def floor_time(times, level):
+    """Start of the `level` bucket holding each timestamp (weeks start on Monday)"""
+    times = np.asarray(times, dtype='datetime64[ns]')
+    if level == 'minute':
+        return times.astype('datetime64[m]').astype('datetime64[ns]')
+    if level == 'hour':
+        return times.astype('datetime64[h]').astype('datetime64[ns]')
+    days = times.astype('datetime64[D]')
+    if level == 'week':
+        # 1970-01-01 was a Thursday, so Mondays are 4 days after a multiple of 7
+        days = days - ((days.astype(np.int64) - 4) % 7).astype('timedelta64[D]')
+    return days.astype('datetime64[ns]')
+
+
+def sketch_bins(pnl):
+    scaled = np.sign(pnl) * np.log10(1 + np.abs(pnl))
+    bins = np.floor((scaled + SKETCH_DECADES) / (2 * SKETCH_DECADES) * SKETCH_BINS)
+    return np.clip(bins, 0, SKETCH_BINS - 1).astype(np.int64)
+
+
+def sketch_quantile(counts, q):
+    """Approximate `q` quantile of PnL per row of sketch `counts`, interpolated within its bin"""
+    counts = np.asarray(counts, dtype=np.float64).reshape(-1, SKETCH_BINS)
+    cumulative = np.cumsum(counts, axis=1)
+    total = cumulative[:, -1]
+    target = np.maximum(q * total, 1e-12)
+    bins = np.minimum((cumulative < target[:, None]).sum(axis=1), SKETCH_BINS - 1)
+    rows = np.arange(len(counts))
+    in_bin = counts[rows, bins]
+    before = cumulative[rows, bins] - in_bin
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fraction = np.where(in_bin > 0, (target - before) / in_bin, 0.5)
+    scaled = (bins + fraction) / SKETCH_BINS * 2 * SKETCH_DECADES - SKETCH_DECADES
+    values = np.sign(scaled) * (10 ** np.abs(scaled) - 1)
+    return np.where(total > 0, values, np.nan)
+
+
+def _roll_up(frame, level):
+    """Merge buckets of a finer level into `level` buckets"""
+    aggregates = {col: AGGREGATES.get(col, 'sum') for col in frame.columns}
+    return frame.groupby(floor_time(frame.index.values, level), sort=True).agg(aggregates).rename_axis('time')
+
+
+# -----------------------------------------------------------
+# PYRAMID
+# -----------------------------------------------------------
+class RollupPyramid:
+    """Aggregates of the trade log at minute, hour, day and week resolution"""
+
+    def __init__(self, levels):
+        self.levels = levels
+
+    def __len__(self):
+        return int(self.levels['week']['trades'].sum()) if len(self.levels['week']) else 0
+
+    def span(self):
+        """First and last minute bucket, or `(None, None)` if empty"""
+        minute = self.levels['minute']
+        if not len(minute):
+            return None, None
+        return minute.index[0], minute.index[-1]
+
+    def choose_level(self, start, end, min_points=MIN_POINTS):
+        """Coarsest level giving at least `min_points` buckets over `[start, end)`"""
+        length = np.datetime64(pd.Timestamp(end), 'ns') - np.datetime64(pd.Timestamp(start), 'ns')
+        for level in reversed(LEVELS):
+            if length / LEVEL_STEPS[level] >= min_points:
+                return level
+        return LEVELS[0]
+
+    def slice(self, level, start, end):
+        """Buckets of `level` starting in `[start, end)`, found by binary search"""
+        frame = self.levels[level]
+        index = frame.index.values
+        lo = np.searchsorted(index, np.datetime64(pd.Timestamp(start), 'ns'), side='left')
+        hi = np.searchsorted(index, np.datetime64(pd.Timestamp(end), 'ns'), side='left')
+        return frame.iloc[lo:hi]
+
+    def query(self, start, end, metrics=None, min_points=MIN_POINTS):
+        """`(level, frame)` with one row per bucket of the chosen level and the requested metrics
+
+        `Median PnL` is available from the hour level up (it is read from the
+        PnL sketch); at minute level it is NaN.
+        """
+        level = self.choose_level(start, end, min_points)
+        return level, self.metrics(self.slice(level, start, end), metrics)
+
+    def totals(self, start, end):
+        """Trade-weighted metrics over the whole range: from day buckets for whole days, else minutes"""
+        level = 'day'
+        if pd.Timestamp(start) != pd.Timestamp(start).normalize() or pd.Timestamp(end) != pd.Timestamp(end).normalize():
+            level = 'minute'
+        frame = self.slice(level, start, end)
+        merged = frame.agg({col: AGGREGATES.get(col, 'sum') for col in frame.columns}).to_frame().T
+        return self.metrics(merged).iloc[0].to_dict() if len(frame) else {}
+
+    @staticmethod
+    def metrics(frame, metrics=None):
+        out = {}
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for name in metrics or METRIC_NAMES:
+                if name == 'Median PnL':
+                    out[name] = (sketch_quantile(frame[SKETCH_COLUMNS].to_numpy(), 0.5)
+                                 if SKETCH_COLUMNS[0] in frame.columns else np.full(len(frame), np.nan))
+                else:
+                    out[name] = np.asarray(METRICS[name](frame), dtype=np.float64)
+        return pd.DataFrame(out, index=frame.index)
+
+
+def build_pyramid(trader_df):
+    """Rollups of a cleaned trade log (`time`, `closedPnL`, `leverage`, `size`)"""
+    df = trader_df.dropna(subset=['time'])
+    times = df['time'].to_numpy(dtype='datetime64[ns]')
+    pnl = df['closedPnL'].to_numpy(dtype=np.float64)
+
+    minute = pd.DataFrame({
+        'time': floor_time(times, 'minute'),
+        'trades': np.ones(len(df), dtype=np.int64),
+        'pnl_sum': pnl,
+        'pnl_sq_sum': pnl * pnl,
+        'pnl_min': pnl,
+        'pnl_max': pnl,
+        'wins': (pnl > 0).astype(np.int64),
+        'leverage_sum': df['leverage'].to_numpy(dtype=np.float64),
+        'leverage_max': df['leverage'].to_numpy(dtype=np.float64),
+        'size': df['size'].to_numpy(dtype=np.float64),
+    }).groupby('time', sort=True).agg(AGGREGATES)
+
+    levels = {'minute': minute}
+    levels['hour'] = _roll_up(minute, 'hour')
+
+    # The PnL sketch starts at hour level: per-minute histograms would cost more than the raw rows
+    hours, slot = np.unique(floor_time(times, 'hour'), return_inverse=True)
+    counts = np.bincount(slot * SKETCH_BINS + sketch_bins(pnl), minlength=len(hours) * SKETCH_BINS)
+    sketch = pd.DataFrame(counts.reshape(len(hours), SKETCH_BINS), index=levels['hour'].index, columns=SKETCH_COLUMNS)
+    levels['hour'] = pd.concat([levels['hour'], sketch], axis=1)
+
+    levels['day'] = _roll_up(levels['hour'], 'day')
+    levels['week'] = _roll_up(levels['day'], 'week')
+    return RollupPyramid(levels)
+
+
+def merge_pyramids(pyramids):
+    """One pyramid equivalent to building from all the pyramids' trades together"""
+    pyramids = list(pyramids)
+    if len(pyramids) == 1:
+        return pyramids[0]
+    levels = {}
+    for level in LEVELS:
+        frame = pd.concat([p.levels[level] for p in pyramids])
+        aggregates = {col: AGGREGATES.get(col, 'sum') for col in frame.columns}
+        levels[level] = frame.groupby(level=0, sort=True).agg(aggregates).rename_axis('time')
+    return RollupPyramid(levels)
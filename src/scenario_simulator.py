@@ -0,0 +1,219 @@
+"""
+Monte Carlo leverage scenarios, bootstrapped per sentiment regime.
+
+Daily returns (BTC's, or the traders' PnL per dollar traded) are pooled by
+the sentiment of their day. A simulated path draws each day's return from
+the pool of that day's regime. The regime either stays fixed, or moves along
+the Fear/Greed transition chain estimated from the same history. Each
+leverage scenario holds a fixed-notional position for the whole horizon.
+The position is liquidated the first time its loss reaches the margin less
+the maintenance requirement, and a liquidated path loses 100% of its margin.
+
+Paths are simulated in chunks of `CHUNK_PATHS`, each from its own seed, so
+memory stays at one chunk however many paths are asked for, and the result
+doesn't depend on how chunks are spread over worker processes. Every chunk
+only adds to fixed-size histograms of log equity per leverage, and those
+merge by addition. Percentiles, VaR, expected shortfall and liquidation
+probabilities are read from the merged histograms, to within 0.2% of equity.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+HORIZON = 30
+N_PATHS = 100_000
+CHUNK_PATHS = 10_000
+LEVERAGES = (1, 2, 5, 10, 20)
+MAINTENANCE_MARGIN = 0.005
+MIN_REGIME_DAYS = 5          # sparser regimes draw from the whole history
+MIN_PATHS_FOR_POOL = 200_000  # below this, starting worker processes costs more than it saves
+
+# Histogram of log(equity multiple) in [LOG_MIN, LOG_MAX); bin 0 also holds total losses
+LOG_MIN, LOG_MAX = np.log(1e-4), np.log(1e3)
+HIST_BINS = 8192
+PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+
+
+# -----------------------------------------------------------
+# RESULTS
+# -----------------------------------------------------------
+class ScenarioResult:
+    """Mergeable outcome histograms of every leverage scenario"""
+
+    def __init__(self, leverages, counts=None, liquidated=None, paths=0):
+        self.leverages = list(leverages)
+        k = len(self.leverages)
+        self.counts = np.zeros((k, HIST_BINS), dtype=np.int64) if counts is None else counts
+        self.liquidated = np.zeros(k, dtype=np.int64) if liquidated is None else liquidated
+        self.paths = paths
+
+    def add(self, returns, liquidated):
+        """Record final equity returns `(leverages, paths)` and liquidation flags"""
+        log_equity = np.log(np.maximum(1 + returns, 1e-12))
+        bins = np.clip(((log_equity - LOG_MIN) / (LOG_MAX - LOG_MIN) * HIST_BINS).astype(np.int64), 0, HIST_BINS - 1)
+        bins[liquidated] = 0
+        for i in range(len(self.leverages)):
+            self.counts[i] += np.bincount(bins[i], minlength=HIST_BINS)
+        self.liquidated += liquidated.sum(axis=1)
+        self.paths += returns.shape[1]
+
+    def merge(self, other):
+        self.counts += other.counts
+        self.liquidated += other.liquidated
+        self.paths += other.paths
+        return self
+
+    @staticmethod
+    def _bin_returns():
+        centers = LOG_MIN + (np.arange(HIST_BINS) + 0.5) * (LOG_MAX - LOG_MIN) / HIST_BINS
+        values = np.exp(centers) - 1
+        values[0] = -1.0
+        return values
+
+    def summary(self, percentiles=PERCENTILES, tail=0.05):
+        """One row per leverage: mean, percentiles, VaR/ES at `tail` and liquidation probability (fractions of margin)"""
+        values = self._bin_returns()
+        rows = []
+        for i, leverage in enumerate(self.leverages):
+            counts = self.counts[i]
+            cumulative = np.cumsum(counts)
+            row = {'leverage': leverage, 'mean': float(counts @ values / max(self.paths, 1))}
+            for p in percentiles:
+                row[f'p{p}'] = float(values[min(np.searchsorted(cumulative, p / 100 * self.paths), HIST_BINS - 1)])
+            # VaR: loss at the `tail` quantile; expected shortfall: mean loss of the worst `tail` share of paths
+            n_tail = max(tail * self.paths, 1)
+            in_tail = np.minimum(counts, np.maximum(n_tail - (cumulative - counts), 0))
+            level = round(100 * (1 - tail))
+            row[f'var_{level}'] = -float(values[min(np.searchsorted(cumulative, n_tail), HIST_BINS - 1)])
+            row[f'es_{level}'] = float(-(in_tail @ values) / n_tail)
+            row['liquidation_prob'] = float(self.liquidated[i] / max(self.paths, 1))
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+
+# -----------------------------------------------------------
+# SIMULATOR
+# -----------------------------------------------------------
+def transition_matrix(states, k):
+    """Row-normalised counts of day-to-day regime moves; unseen regimes stay put"""
+    counts = np.bincount(states[:-1] * k + states[1:], minlength=k * k).reshape(k, k).astype(np.float64)
+    rows = counts.sum(axis=1, keepdims=True)
+    return np.where(rows > 0, counts / np.maximum(rows, 1), np.eye(k))
+
+
+class ScenarioSimulator:
+    """Bootstrap of daily returns by sentiment regime, with leverage scenarios
+
+    `returns` and `regimes` are aligned daily series in date order. With
+    `markov=True` each path's regime follows the transition chain estimated
+    from `regimes`; otherwise it keeps its starting regime. `side` is 1 for
+    long positions and -1 for short.
+    """
+
+    def __init__(self, returns, regimes, horizon=HORIZON, leverages=LEVERAGES, markov=True,
+                 side=1, maintenance_margin=MAINTENANCE_MARGIN):
+        returns = np.asarray(returns, dtype=np.float64)
+        regimes = pd.Series(regimes).astype(str).to_numpy()
+        keep = np.isfinite(returns)
+        returns, regimes = returns[keep], regimes[keep]
+        if len(returns) < 2:
+            raise ValueError("Need at least two days of returns to simulate")
+
+        self.regimes = sorted(set(regimes))
+        self.states = np.searchsorted(self.regimes, regimes)
+        self.horizon = int(horizon)
+        self.leverages = list(leverages)
+        self.markov = markov
+        self.side = 1 if side >= 0 else -1
+        self.maintenance_margin = maintenance_margin
+
+        k = len(self.regimes)
+        self.transitions = transition_matrix(self.states, k)
+        self._cdf = np.cumsum(self.transitions, axis=1)
+        self._cdf[:, -1] = 1.0
+
+        # Returns grouped by regime, as one array with per-regime offsets for vectorised draws
+        order = np.argsort(self.states, kind='stable')
+        self._pool = returns[order]
+        days = np.bincount(self.states, minlength=k)
+        self._offsets = np.concatenate([[0], np.cumsum(days)[:-1]])
+        self._sizes = days.copy()
+        self.pooled = [r for r, n in zip(self.regimes, days) if n < MIN_REGIME_DAYS]
+        sparse = days < MIN_REGIME_DAYS
+        self._offsets[sparse] = 0
+        self._sizes[sparse] = len(self._pool)
+        self.days = dict(zip(self.regimes, days.tolist()))
+
+    def state_of(self, regime):
+        if regime not in self.regimes:
+            raise ValueError(f"Unknown regime '{regime}' (have {', '.join(self.regimes)})")
+        return self.regimes.index(regime)
+
+    def _paths(self, n, start, rng):
+        """Daily returns `(n, horizon)` of `n` paths starting in regime index `start`"""
+        states = np.full(n, start)
+        returns = np.empty((n, self.horizon))
+        for t in range(self.horizon):
+            if self.markov and t:
+                u = rng.random(n)
+                states = (u[:, None] > self._cdf[states]).sum(axis=1)
+            draws = self._offsets[states] + (rng.random(n) * self._sizes[states]).astype(np.int64)
+            returns[:, t] = self._pool[draws]
+        return returns
+
+    def simulate_chunk(self, n, start, seed):
+        """`ScenarioResult` of `n` paths from one seed"""
+        rng = np.random.default_rng(seed)
+        # Fixed-notional position: the short's return is minus the long's, not a daily-rebalanced (1 - r) product
+        path = self.side * (np.cumprod(1 + self._paths(n, start, rng), axis=1) - 1)
+        worst = path.min(axis=1)
+        leverage = np.asarray(self.leverages, dtype=np.float64)[:, None]
+        # Liquidated once the loss eats the margin down to the maintenance requirement
+        liquidated = worst[None, :] <= -(1 / leverage - self.maintenance_margin)
+        final = np.where(liquidated, -1.0, leverage * path[None, :, -1])
+        result = ScenarioResult(self.leverages)
+        result.add(final, liquidated)
+        return result
+
+    def run(self, regime, n_paths=N_PATHS, seed=42, chunk=CHUNK_PATHS, n_workers=1):
+        """Simulate `n_paths` paths starting in `regime`; returns a merged `ScenarioResult`
+
+        Chunk seeds come from one `SeedSequence`, so the result is the same
+        for any `n_workers`.
+        """
+        start = self.state_of(regime)
+        sizes = [chunk] * (n_paths // chunk) + ([n_paths % chunk] if n_paths % chunk else [])
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        n_workers = n_workers or os.cpu_count() or 1
+
+        result = ScenarioResult(self.leverages)
+        if n_workers == 1 or len(sizes) == 1 or n_paths < MIN_PATHS_FOR_POOL:
+            for size, chunk_seed in zip(sizes, seeds):
+                result.merge(self.simulate_chunk(size, start, chunk_seed))
+        else:
+            with ProcessPoolExecutor(max_workers=min(n_workers, len(sizes))) as pool:
+                for part in pool.map(self.simulate_chunk, sizes, [start] * len(sizes), seeds):
+                    result.merge(part)
+        return result
+
+
+def scenario_input(merged_df, returns=None):
+    """Daily `date`, `Sentiment`, `ret` rows for `ScenarioSimulator`
+
+    `ret` is the BTC daily return, or `returns` (a Series indexed by date)
+    when given, e.g. the traders' PnL per dollar traded. Days without a
+    return are dropped.
+    """
+    df = merged_df[['date', 'Sentiment'] + [c for c in ('btc_return', 'bitcoin_close') if c in merged_df.columns]]
+    df = df.sort_values('date').drop_duplicates('date', keep='last')
+    if returns is not None:
+        ret = df['date'].map(returns)
+    elif 'bitcoin_close' in df.columns:
+        # The first priced day has no previous close
+        ret = df['bitcoin_close'].pct_change(fill_method=None)
+    else:
+        ret = pd.Series(np.nan, index=df.index)
+    return df[['date', 'Sentiment']].assign(ret=ret.to_numpy()).dropna(subset=['ret']).reset_index(drop=True)
@@ -0,0 +1,102 @@
+"""
+Sentiment prediction model: lag-feature dataset, Random Forest training and
+next-day prediction.
+"""
+
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
+from sklearn.preprocessing import LabelEncoder
+
+from src.drift_monitor import build_reference
+from src.forest_inference import FlatForest
+
+
+def prepare_ml_dataset(df, n_lags=3):
+    """Prepare dataset for ML model with lag features"""
+    df = df.sort_values('date').reset_index(drop=True)
+    ml = df[['date', 'closedPnL', 'leverage', 'size', 'btc_return', 'Sentiment']].copy()
+    
+    # Encode sentiment labels
+    le = LabelEncoder()
+    ml['label'] = le.fit_transform(ml['Sentiment'])
+    
+    # Create lag features
+    for lag in range(1, n_lags + 1):
+        ml[f'closedPnL_lag{lag}'] = ml['closedPnL'].shift(lag)
+        ml[f'leverage_lag{lag}'] = ml['leverage'].shift(lag)
+        ml[f'size_lag{lag}'] = ml['size'].shift(lag)
+        ml[f'btc_return_lag{lag}'] = ml['btc_return'].shift(lag)
+    
+    # Drop rows with NaN from lagging
+    ml = ml.dropna().reset_index(drop=True)
+    
+    # Feature columns
+    feature_cols = [c for c in ml.columns if 'lag' in c]
+    X = ml[feature_cols]
+    y = ml['label']
+    
+    return X, y, le, ml
+
+def train_and_evaluate_model(X, y):
+    """Train Random Forest classifier and return metrics"""
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, shuffle=False, random_state=42
+    )
+    
+    model = RandomForestClassifier(
+        n_estimators=200,
+        max_depth=10,
+        random_state=42,
+        n_jobs=-1
+    )
+    model.fit(X_train, y_train)
+    
+    preds = model.predict(X_test)
+    acc = accuracy_score(y_test, preds)
+    clf_report = classification_report(y_test, preds, output_dict=True)
+    cm = confusion_matrix(y_test, preds)
+    
+    return model, acc, clf_report, cm, X_train, X_test, y_train, y_test
+
+def compile_model(model, X_check):
+    """Flatten a trained forest for fast inference, verified against sklearn on `X_check`"""
+    flat_model = FlatForest.from_sklearn(model)
+    flat_model.verify(model, X_check)
+    return flat_model
+
+def build_model_bundle(X, y, label_encoder, ml_df):
+    """Train and package a model for `models/`; returns `(bundle, model, acc, cm)`
+
+    The bundle holds the sklearn model, its flattened copy, the label encoder,
+    the feature names, the drift reference histograms of the training rows, and the test
+    accuracy with the first test day (for comparing baselines on the same days).
+    """
+    model, acc, clf_report, cm, X_train, X_test, *_ = train_and_evaluate_model(X, y)
+    bundle = {
+        'model': model,
+        'flat_model': compile_model(model, X_test),
+        'label_encoder': label_encoder,
+        'feature_names': X.columns.tolist(),
+        'drift_reference': build_reference(X_train, ml_df['date'].iloc[len(X_train) - 1]),
+        'accuracy': acc,
+        'test_start': ml_df['date'].iloc[len(X_train)],
+    }
+    return bundle, model, acc, cm
+
+def predict_next_day(model, label_encoder, ml_df, n_lags=3):
+    """Predict tomorrow's sentiment"""
+    X_next = ml_df.filter(regex='lag').tail(1)
+    
+    if X_next.empty:
+        return "Unknown", [0.5, 0.5]
+    
+    if hasattr(model, 'predict_with_proba'):
+        preds, probs = model.predict_with_proba(X_next.to_numpy())
+        pred, prob = preds[0], probs[0]
+    else:
+        pred = model.predict(X_next)[0]
+        prob = model.predict_proba(X_next)[0]
+    label = label_encoder.inverse_transform([pred])[0]
+    
+    return label, prob
@@ -0,0 +1,243 @@
+"""
+Shared on-disk cache tier for running several dashboard processes on one host.
+
+`st.cache_data` is per process. When several Streamlit replicas run behind a
+proxy, each one would fetch the same prices and rebuild the same frames.
+`cached()` adds a second tier under it that all processes on the host share:
+
+    @st.cache_data(ttl=300)            # per-process tier
+    @shared_cache.cached(ttl=300)      # host-wide tier
+    def fetch_prices(days): ...
+
+Each entry is a directory written under a temporary name and renamed into
+place, so readers never see a partial entry. DataFrames, and tuples of them,
+are stored as uncompressed Arrow IPC files. Readers memory-map those files
+instead of deserialising them: numeric columns come back as read-only views
+of the OS page cache, which every process shares. Other values are pickled.
+Least recently used entries are evicted once the directory exceeds its size
+bound.
+
+The tier is off unless MARKETMIND_SHARED_CACHE_DIR is set; `cached()` then
+returns the function unchanged. As with `st.cache_data`, parameters whose
+names start with an underscore are left out of the cache key.
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import shutil
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from src import perf
+
+try:
+    import pyarrow as pa
+except ImportError:  # pickle-only fallback
+    pa = None
+
+CACHE_DIR = os.getenv("MARKETMIND_SHARED_CACHE_DIR")
+MAX_BYTES = int(float(os.getenv("MARKETMIND_SHARED_CACHE_MB", "1024")) * 1024 * 1024)
+META_FILE = "meta.json"
+
+
+# -----------------------------------------------------------
+# KEYS
+# -----------------------------------------------------------
+def _hash_value(value, digest):
+    """Feed a stable representation of `value` into `digest`"""
+    if isinstance(value, pd.DataFrame):
+        digest.update(repr((list(value.columns), list(map(str, value.dtypes)))).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, pd.Series):
+        digest.update(repr((value.name, str(value.dtype))).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(repr((value.dtype.str, value.shape)).encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"{type(value).__name__}{len(value)}".encode())
+        for item in value:
+            _hash_value(item, digest)
+    elif isinstance(value, dict):
+        digest.update(f"dict{len(value)}".encode())
+        for key in sorted(value, key=repr):
+            _hash_value(key, digest)
+            _hash_value(value[key], digest)
+    elif value is None or isinstance(value, (str, bytes, int, float, bool)):
+        digest.update(repr(value).encode())
+    else:
+        digest.update(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def make_key(func, args, kwargs):
+    """Cache key for a call: function identity plus the hashed non-underscore arguments"""
+    bound = inspect.signature(func).bind(*args, **kwargs)
+    bound.apply_defaults()
+    digest = hashlib.sha256(f"{func.__module__}.{func.__qualname__}".encode())
+    for name, value in bound.arguments.items():
+        if not name.startswith("_"):
+            digest.update(name.encode())
+            _hash_value(value, digest)
+    return digest.hexdigest()[:32]
+
+
+# -----------------------------------------------------------
+# STORAGE
+# -----------------------------------------------------------
+def _frames_of(value):
+    """The DataFrames to store as Arrow, or None if `value` must be pickled"""
+    if pa is None:
+        return None
+    if isinstance(value, pd.DataFrame):
+        return [value]
+    if isinstance(value, tuple) and value and all(isinstance(v, pd.DataFrame) for v in value):
+        return list(value)
+    return None
+
+
+def _write_arrow(path, frame):
+    table = pa.Table.from_pandas(frame)
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _read_arrow(path):
+    with pa.memory_map(path, "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    # split_blocks keeps numeric columns as zero-copy views of the mapped file
+    return table.to_pandas(split_blocks=True)
+
+
+def _entry_size(path):
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+class SharedCache:
+    """Directory of cache entries shared by every process on the host"""
+
+    def __init__(self, directory, max_bytes=MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def get(self, key, ttl=None):
+        """`(True, value)` on a hit, `(False, None)` on a miss or expired entry"""
+        path = self._path(key)
+        try:
+            with open(os.path.join(path, META_FILE)) as f:
+                meta = json.load(f)
+            if ttl is not None and time.time() - meta["created"] > ttl:
+                return False, None
+            if meta["kind"] == "pickle":
+                with open(os.path.join(path, "value.pkl"), "rb") as f:
+                    value = pickle.load(f)
+            else:
+                frames = [_read_arrow(os.path.join(path, f"{i}.arrow")) for i in range(meta["count"])]
+                value = frames[0] if meta["kind"] == "frame" else tuple(frames)
+            os.utime(path)  # LRU: mark as recently used
+        except (OSError, ValueError, KeyError, EOFError, pickle.UnpicklingError):
+            # Missing, half-evicted or unreadable; treat as a miss
+            return False, None
+        return True, value
+
+    def set(self, key, value):
+        """Store `value` under `key`, replacing any older entry, then enforce the size bound"""
+        tmp_path = self._path(f".tmp-{key}-{uuid.uuid4().hex}")
+        os.makedirs(tmp_path)
+        try:
+            frames = _frames_of(value)
+            try:
+                if frames is None:
+                    raise TypeError("not a frame")
+                for i, frame in enumerate(frames):
+                    _write_arrow(os.path.join(tmp_path, f"{i}.arrow"), frame)
+                meta = {"kind": "frame" if isinstance(value, pd.DataFrame) else "frames", "count": len(frames)}
+            except (TypeError, ValueError, pa.ArrowException if pa else TypeError):
+                # Not Arrow-representable (e.g. mixed object columns): pickle instead
+                for name in os.listdir(tmp_path):
+                    os.remove(os.path.join(tmp_path, name))
+                with open(os.path.join(tmp_path, "value.pkl"), "wb") as f:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                meta = {"kind": "pickle"}
+
+            meta["created"] = time.time()
+            with open(os.path.join(tmp_path, META_FILE), "w") as f:
+                json.dump(meta, f)
+
+            path = self._path(key)
+            if os.path.exists(path):
+                # A directory can't be renamed over a non-empty one: move the stale entry aside first
+                old_path = self._path(f".old-{key}-{uuid.uuid4().hex}")
+                os.rename(path, old_path)
+                shutil.rmtree(old_path, ignore_errors=True)
+            os.rename(tmp_path, path)
+        except OSError:
+            # Another process won the race (or the disk is full); theirs is as good as ours
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in `max_bytes`"""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_dir() and not entry.name.startswith("."):
+                try:
+                    entries.append((entry.stat().st_mtime, _entry_size(entry.path), entry.path))
+                except OSError:
+                    continue
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+        os.makedirs(self.directory, exist_ok=True)
+
+
+_caches = {}
+
+
+def get_cache(directory=None):
+    """The process's SharedCache for `directory` (default: MARKETMIND_SHARED_CACHE_DIR)"""
+    directory = directory or CACHE_DIR
+    if directory not in _caches:
+        _caches[directory] = SharedCache(directory)
+    return _caches[directory]
+
+
+def cached(ttl=None, name=None, directory=None):
+    """Decorator adding the host-wide tier; a no-op when no cache directory is configured"""
+    def decorate(func):
+        if not (directory or CACHE_DIR):
+            return func
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache = get_cache(directory)
+            key = make_key(func, args, kwargs)
+            hit, value = cache.get(key, ttl=ttl)
+            perf.incr("shared_cache_lookups_total", cache=label)
+            if hit:
+                return value
+            perf.incr("shared_cache_misses_total", cache=label)
+            value = func(*args, **kwargs)
+            cache.set(key, value)
+            return value
+
+        return wrapper
+
+    return decorate
@@ -0,0 +1,272 @@
+"""
+Streaming covariance and correlation over wide feature sets.
+
+`CovarianceAccumulator` holds the count, means and co-moments of every
+column pair and absorbs data one chunk at a time: each chunk's statistics
+are computed around its own means with two matrix products, then folded in
+with the parallel (Chan et al.) update of Welford's algorithm. Two
+accumulators built on different partitions, files or date ranges `merge` to
+exactly what one pass over all the rows would give, so nothing ever needs
+more than one chunk in memory.
+
+Missing values are dropped pairwise, as in `DataFrame.corr()`: each pair's
+statistics only count rows where both columns are present, so sparse
+columns (a symbol that trades on some days only) don't shrink the others.
+
+`GroupedCovariance` keeps one accumulator per key (a day, a sentiment
+regime, a partition). With days as keys, one pass yields the full matrix of
+any date range and the sentiment-conditional matrices, by merging the
+relevant days.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.data_preprocessing import VALUE_COLUMNS, clean_trader_data
+from src.rolling_stats import SENTIMENT_SCORES
+
+CHUNK_ROWS = 100_000
+MIN_PERIODS = 3     # fewer shared rows give a NaN correlation
+N_LAGS = 3
+MAX_SYMBOLS = 8     # per-symbol columns for the most traded symbols only
+LAG_COLUMNS = VALUE_COLUMNS + ['btc_return']
+
+
+# -----------------------------------------------------------
+# ACCUMULATORS
+# -----------------------------------------------------------
+class CovarianceAccumulator:
+    """Pairwise counts, means and co-moments of `columns`, mergeable across chunks
+
+    For a column pair `(i, j)` over the rows where both are present:
+    `n[i, j]` is their count, `mean[i, j]` the mean of column `i`,
+    `comoment[i, j]` the sum of products of both deviations and
+    `sq_dev[i, j]` the sum of squared deviations of column `i`.
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.n = np.zeros((k, k))
+        self.mean = np.zeros((k, k))
+        self.comoment = np.zeros((k, k))
+        self.sq_dev = np.zeros((k, k))
+
+    @classmethod
+    def from_chunk(cls, X, columns):
+        """Statistics of one chunk `(rows, columns)`; NaN and inf count as missing"""
+        acc = cls(columns)
+        X = np.asarray(X, dtype=np.float64).reshape(-1, len(acc.columns))
+        present = np.isfinite(X)
+        if not present.any():
+            return acc
+        # Centre on the chunk's column means so the products below don't lose precision
+        shift = np.where(present, X, 0.0).sum(axis=0) / np.maximum(present.sum(axis=0), 1)
+        mask = present.astype(np.float64)
+        X0 = np.where(present, X - shift, 0.0)
+        n = mask.T @ mask
+        sums = X0.T @ mask  # sums[i, j]: column i over rows where j is present too
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = np.where(n > 0, sums / n, 0.0)
+        acc.n = n
+        acc.mean = mean + shift[:, None]
+        acc.comoment = X0.T @ X0 - sums * mean.T
+        acc.sq_dev = (X0 * X0).T @ mask - sums * mean
+        return acc
+
+    def update(self, X):
+        """Absorb a chunk of rows"""
+        return self.merge(self.from_chunk(X, self.columns))
+
+    def merge(self, other):
+        """Fold in another accumulator over the same columns; returns self"""
+        if other.columns != self.columns:
+            raise ValueError("Can only merge accumulators over the same columns")
+        n = self.n + other.n
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weight = np.where(n > 0, self.n * other.n / n, 0.0)
+            step = np.where(n > 0, other.n / n, 0.0)
+        delta = other.mean - self.mean
+        self.comoment += other.comoment + delta * delta.T * weight
+        self.sq_dev += other.sq_dev + delta * delta * weight
+        self.mean += delta * step
+        self.n = n
+        return self
+
+    def copy(self):
+        acc = CovarianceAccumulator(self.columns)
+        acc.n, acc.mean = self.n.copy(), self.mean.copy()
+        acc.comoment, acc.sq_dev = self.comoment.copy(), self.sq_dev.copy()
+        return acc
+
+    @property
+    def rows(self):
+        """Rows seen with at least the most complete column present"""
+        return int(np.diag(self.n).max()) if len(self.columns) else 0
+
+    def count(self):
+        return pd.DataFrame(self.n.astype(np.int64), index=self.columns, columns=self.columns)
+
+    def means(self):
+        return pd.Series(np.diag(self.mean), index=self.columns)
+
+    def covariance(self, min_periods=MIN_PERIODS):
+        """Sample covariance matrix (pairwise complete rows)"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cov = np.where(self.n >= max(min_periods, 2), self.comoment / (self.n - 1), np.nan)
+        return pd.DataFrame(cov, index=self.columns, columns=self.columns)
+
+    def correlation(self, min_periods=MIN_PERIODS):
+        """Pearson correlation matrix (pairwise complete rows), NaN for constant or sparse pairs"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = self.comoment / np.sqrt(self.sq_dev * self.sq_dev.T)
+        corr = np.where((self.n >= max(min_periods, 2)) & np.isfinite(corr), np.clip(corr, -1, 1), np.nan)
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+
+class GroupedCovariance:
+    """One `CovarianceAccumulator` per key, filled in the same pass"""
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.groups = {}
+
+    def update(self, X, keys):
+        """Absorb a chunk of rows, each filed under its entry of `keys`"""
+        X = np.asarray(X, dtype=np.float64).reshape(-1, len(self.columns))
+        keys = pd.Series(keys)
+        codes, uniques = pd.factorize(keys, sort=True)
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(1, len(uniques)))
+        for key, rows in zip(uniques, np.split(order, bounds)):
+            chunk = CovarianceAccumulator.from_chunk(X[rows], self.columns)
+            if key in self.groups:
+                self.groups[key].merge(chunk)
+            else:
+                self.groups[key] = chunk
+        return self
+
+    def merge(self, other):
+        """Fold in another grouping over the same columns, key by key; returns self"""
+        for key, acc in other.groups.items():
+            if key in self.groups:
+                self.groups[key].merge(acc)
+            else:
+                self.groups[key] = acc.copy()
+        return self
+
+    def total(self, keys=None):
+        """Merged accumulator of `keys` (default: every group)"""
+        acc = CovarianceAccumulator(self.columns)
+        for key in (self.groups if keys is None else keys):
+            if key in self.groups:
+                acc.merge(self.groups[key])
+        return acc
+
+    def by_label(self, labels, keys=None):
+        """Merged accumulator per label, where `labels` maps each key to its label (e.g. day to sentiment)"""
+        merged = {}
+        for key in (self.groups if keys is None else keys):
+            label = labels.get(key)
+            if key in self.groups and label is not None:
+                merged.setdefault(label, CovarianceAccumulator(self.columns)).merge(self.groups[key])
+        return merged
+
+
+def stream_covariance(chunks, columns, key=None):
+    """One pass over an iterable of DataFrame chunks
+
+    Returns a `CovarianceAccumulator` over `columns`, or a `GroupedCovariance`
+    keyed by the `key` column when given.
+    """
+    acc = GroupedCovariance(columns) if key is not None else CovarianceAccumulator(columns)
+    for chunk in chunks:
+        X = chunk.reindex(columns=acc.columns).to_numpy(dtype=np.float64)
+        if key is not None:
+            acc.update(X, chunk[key].to_numpy())
+        else:
+            acc.update(X)
+    return acc
+
+
+def iter_chunks(df, chunk_rows=CHUNK_ROWS):
+    """Consecutive row slices of an in-memory frame"""
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+# -----------------------------------------------------------
+# FEATURES
+# -----------------------------------------------------------
+def daily_features(merged_df, sentiment_df=None, partition_daily=None, asset_returns=None,
+                   n_lags=N_LAGS, max_symbols=MAX_SYMBOLS):
+    """Wide per-day feature frame indexed by `date`, with the day's `Sentiment`
+
+    Columns: the day's closedPnL, leverage and size; BTC and other asset
+    returns (`asset_returns` maps a name to a return Series indexed by date);
+    `fgi`, the sentiment file's `value` or an ordinal score of the
+    classification; per-symbol `<symbol>:closedPnL/leverage/size` for the
+    `max_symbols` most traded symbols of `partition_daily`; and `n_lags`
+    lags of the day's aggregates and BTC return.
+    """
+    df = merged_df.sort_values('date').drop_duplicates('date', keep='last').set_index('date')
+    features = df[[c for c in LAG_COLUMNS if c in df.columns]].astype(np.float64)
+
+    for name, returns in (asset_returns or {}).items():
+        features[f"{name}_return"] = pd.Series(features.index.map(returns), index=features.index, dtype=np.float64)
+
+    if sentiment_df is not None and 'value' in sentiment_df.columns:
+        values = sentiment_df.drop_duplicates('date', keep='last').set_index('date')['value']
+        fgi = features.index.map(values)
+    else:
+        fgi = df['Sentiment'].map(SENTIMENT_SCORES)
+    features['fgi'] = pd.to_numeric(pd.Series(np.asarray(fgi), index=features.index), errors='coerce')
+
+    if partition_daily is not None and 'symbol' in partition_daily.columns:
+        per_symbol = partition_daily.assign(
+            leverage_sum=partition_daily['leverage'] * partition_daily['trades']
+        ).groupby(['symbol', 'date'], observed=True)[['pnl_sum', 'leverage_sum', 'size', 'trades']].sum()
+        top = per_symbol['trades'].groupby(level='symbol', observed=True).sum().nlargest(max_symbols).index
+        per_symbol = per_symbol[per_symbol.index.get_level_values('symbol').isin(top)]
+        wide = pd.DataFrame({
+            'closedPnL': per_symbol['pnl_sum'] / per_symbol['trades'],
+            'leverage': per_symbol['leverage_sum'] / per_symbol['trades'],
+            'size': per_symbol['size'],
+        }).unstack('symbol')
+        wide.columns = [f"{symbol}:{value}" for value, symbol in wide.columns]
+        features = features.join(wide[sorted(wide.columns)], how='left')
+
+    lagged = features[[c for c in LAG_COLUMNS if c in features.columns]]
+    for lag in range(1, n_lags + 1):
+        features = features.join(lagged.shift(lag).add_suffix(f'_lag{lag}'))
+    return features.assign(Sentiment=df['Sentiment'])
+
+
+def context_columns(features):
+    """Columns of `daily_features` known before the day's trades: market returns, FGI and lags"""
+    return [
+        c for c in features.columns
+        if c != 'Sentiment' and c not in VALUE_COLUMNS and ':' not in c
+    ]
+
+
+def trade_covariance(trader_df, features, chunk_rows=CHUNK_ROWS):
+    """Per-day `GroupedCovariance` of each trade's PnL, leverage and size with its day's market context
+
+    The trade log is cleaned and joined with `features` one chunk at a time,
+    so the wide trade-level frame is never materialised in full.
+    """
+    context = context_columns(features)
+    acc = GroupedCovariance(VALUE_COLUMNS + context)
+    day_context = features[context]
+    for chunk in iter_chunks(trader_df, chunk_rows):
+        trades = clean_trader_data(chunk)
+        trades = trades[trades['date'].notna()]
+        if not len(trades):
+            continue
+        X = np.hstack([
+            trades[VALUE_COLUMNS].to_numpy(dtype=np.float64),
+            day_context.reindex(trades['date']).to_numpy(dtype=np.float64),
+        ])
+        acc.update(X, trades['date'].to_numpy())
+    return acc
@@ -0,0 +1,250 @@
+"""
+Synthetic trade log and sentiment generator.
+
+Rows are produced in independent, deterministically seeded chunks so they can
+be generated on a process pool and streamed to CSV, Parquet or Arrow IPC
+without ever holding the full log in memory. A daily sentiment regime drawn
+from a Markov chain drives PnL drift/volatility and leverage, so the data has
+the same sentiment/behaviour coupling the dashboard looks for.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+SYMBOLS = ['BTC/USDT', 'ETH/USDT', 'BNB/USDT', 'SOL/USDT', 'ADA/USDT']
+SYMBOL_WEIGHTS = [0.35, 0.25, 0.15, 0.15, 0.10]
+SYMBOL_VOL = [1.0, 1.2, 1.1, 1.6, 1.4]
+
+TRADER_TYPES = ['Retail', 'Institutional', 'Whale', 'Market Maker']
+TRADER_WEIGHTS = [0.55, 0.20, 0.05, 0.20]
+TRADER_LEVERAGE = [1.4, 0.8, 1.0, 0.5]
+TRADER_SIZE = [2_000.0, 25_000.0, 250_000.0, 50_000.0]
+
+REGIMES = ['Extreme Fear', 'Fear', 'Neutral', 'Greed', 'Extreme Greed']
+# Daily regime transitions: sticky, mostly moving to neighbouring regimes.
+REGIME_TRANSITIONS = np.array([
+    [0.80, 0.15, 0.04, 0.01, 0.00],
+    [0.08, 0.75, 0.14, 0.03, 0.00],
+    [0.02, 0.12, 0.72, 0.12, 0.02],
+    [0.00, 0.03, 0.14, 0.75, 0.08],
+    [0.00, 0.01, 0.04, 0.15, 0.80],
+])
+# Per regime: mean return per trade, return volatility, typical leverage.
+REGIME_DRIFT = np.array([-0.012, -0.005, 0.000, 0.004, 0.008])
+REGIME_VOL = np.array([0.045, 0.030, 0.020, 0.028, 0.040])
+REGIME_LEVERAGE = np.array([3.0, 4.5, 6.0, 9.0, 14.0])
+# Fear & Greed index value range per regime (inclusive low, exclusive high).
+REGIME_FGI = np.array([[0, 25], [25, 45], [45, 55], [55, 75], [75, 101]])
+
+SIZE_TIERS = {
+    'tiny': 10_000,
+    'small': 250_000,
+    'medium': 750_000,
+    'large': 10_000_000,
+    'xlarge': 100_000_000,
+}
+
+# Demo-mode datasets: name -> (trade rows, days of history)
+DEMO_SIZES = {
+    'sample': (9_000, 90),
+    'year': (250_000, 365),
+    'million': (1_000_000, 3 * 365),
+    'production': (5_000_000, 3 * 365),
+}
+
+DEFAULT_START = pd.Timestamp('2020-01-01')
+DEFAULT_CHUNK_ROWS = 1_000_000
+# Logs longer than this are packed more densely than one trade per minute.
+MAX_DAYS = 3 * 365
+
+
+# -----------------------------------------------------------
+# GENERATION
+# -----------------------------------------------------------
+def default_days(n_rows):
+    """One trade per minute, capped at MAX_DAYS of history"""
+    return int(min(max(np.ceil(n_rows / 1440), 1), MAX_DAYS))
+
+
+def generate_regimes(days, seed=42):
+    """Daily regime codes (indices into REGIMES) from the Markov chain"""
+    rng = np.random.default_rng(np.random.SeedSequence([seed, 0]))
+    cumulative = REGIME_TRANSITIONS.cumsum(axis=1)
+    draws = rng.random(days)
+    regimes = np.empty(days, dtype=np.int8)
+    state = 2
+    for i in range(days):
+        state = int(np.searchsorted(cumulative[state], draws[i], side='right'))
+        regimes[i] = min(state, len(REGIMES) - 1)
+    return regimes
+
+
+def generate_sentiment(days, seed=42, start=DEFAULT_START):
+    """Daily sentiment frame (`Date`, `Classification`, `value`) matching the trades"""
+    regimes = generate_regimes(days, seed)
+    rng = np.random.default_rng(np.random.SeedSequence([seed, 1]))
+    bounds = REGIME_FGI[regimes]
+    return pd.DataFrame({
+        'Date': pd.date_range(start, periods=days, freq='D'),
+        'Classification': np.asarray(REGIMES)[regimes],
+        'value': rng.integers(bounds[:, 0], bounds[:, 1]),
+    })
+
+
+def generate_trades_chunk(lo, hi, n_rows, days, regimes, seed=42, start=DEFAULT_START):
+    """Rows `lo:hi` of an `n_rows` trade log spread evenly over `days` days"""
+    rng = np.random.default_rng(np.random.SeedSequence([seed, 2, lo]))
+    n = hi - lo
+    step = pd.Timedelta(days=days) / n_rows
+    step = step.floor('s') if step >= pd.Timedelta(seconds=1) else step.floor('ms')
+    time = pd.date_range(start + step * lo, periods=n, freq=step)
+
+    day = ((time - start) // pd.Timedelta(days=1)).to_numpy()
+    regime = regimes[np.minimum(day, len(regimes) - 1)]
+    symbol = rng.choice(len(SYMBOLS), n, p=SYMBOL_WEIGHTS).astype(np.int8)
+    trader = rng.choice(len(TRADER_TYPES), n, p=TRADER_WEIGHTS).astype(np.int8)
+
+    leverage = REGIME_LEVERAGE[regime] * np.asarray(TRADER_LEVERAGE)[trader]
+    leverage = np.clip(leverage * rng.lognormal(0.0, 0.35, n), 1.0, 100.0)
+    size = np.asarray(TRADER_SIZE)[trader] * rng.lognormal(0.0, 0.6, n)
+    ret = rng.normal(
+        REGIME_DRIFT[regime],
+        REGIME_VOL[regime] * np.asarray(SYMBOL_VOL)[symbol],
+    )
+    closed_pnl = size * leverage * ret / 10.0
+
+    return pd.DataFrame({
+        'time': time,
+        'symbol': pd.Categorical.from_codes(symbol, SYMBOLS),
+        'trader_type': pd.Categorical.from_codes(trader, TRADER_TYPES),
+        'closedPnL': closed_pnl.round(2),
+        'leverage': leverage.round(2),
+        'size': size.round(2),
+    })
+
+
+def generate_trades(n_rows, days=None, seed=42, start=DEFAULT_START):
+    """Generate a whole trade log in memory (use `write_dataset` for big tiers)"""
+    days = days or default_days(n_rows)
+    return generate_trades_chunk(0, n_rows, n_rows, days, generate_regimes(days, seed), seed, start)
+
+
+def generate_csv_chunk(lo, hi, n_rows, days, regimes, seed=42, start=DEFAULT_START):
+    """Same as `generate_trades_chunk` but already encoded as CSV text"""
+    chunk = generate_trades_chunk(lo, hi, n_rows, days, regimes, seed, start)
+    return chunk.to_csv(index=False, header=(lo == 0))
+
+
+def iter_chunks(n_rows, days=None, seed=42, start=DEFAULT_START,
+                chunk_rows=DEFAULT_CHUNK_ROWS, workers=1, as_csv=False):
+    """Yield the trade log chunk by chunk, in order, optionally from a process pool
+
+    With `as_csv=True` chunks are yielded as CSV text, so the (slow) text
+    encoding also runs on the workers.
+    """
+    days = days or default_days(n_rows)
+    regimes = generate_regimes(days, seed)
+    bounds = [(lo, min(lo + chunk_rows, n_rows)) for lo in range(0, n_rows, chunk_rows)]
+    make_chunk = generate_csv_chunk if as_csv else generate_trades_chunk
+
+    if workers <= 1 or len(bounds) == 1:
+        for lo, hi in bounds:
+            yield make_chunk(lo, hi, n_rows, days, regimes, seed, start)
+        return
+
+    # Keep a bounded window of chunks in flight so memory stays flat.
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for lo, hi in bounds:
+            pending.append(pool.submit(make_chunk, lo, hi, n_rows, days, regimes, seed, start))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def freeze(df):
+    """Make the arrays behind `df` read-only, so in-place writes raise instead of
+    silently changing a frame that is shared between sessions"""
+    for col in df.columns:
+        values = df[col].array
+        arrays = [values.codes] if isinstance(values, pd.Categorical) else [np.asarray(values)]
+        while arrays:
+            arr = arrays.pop()
+            if isinstance(arr, np.ndarray):
+                arr.flags.writeable = False
+                arrays.append(arr.base)
+    return df
+
+
+def demo_dataset(size='sample', seed=42, end=None, workers=1):
+    """Seeded trades and sentiment for demo mode, ending on `end` (default: today)
+
+    The same (size, seed, end) always gives the same data. Both frames are
+    read-only (see `freeze`) so they can be cached and shared as-is.
+    """
+    n_rows, days = DEMO_SIZES[size]
+    end = pd.Timestamp(end if end is not None else pd.Timestamp.now()).normalize()
+    start = end - pd.Timedelta(days=days - 1)
+    trades = pd.concat(list(iter_chunks(n_rows, days, seed, start, workers=workers)), ignore_index=True)
+    return freeze(trades), freeze(generate_sentiment(days, seed, start))
+
+
+# -----------------------------------------------------------
+# WRITERS
+# -----------------------------------------------------------
+FORMATS = {'csv': '.csv', 'parquet': '.parquet', 'arrow': '.arrow', 'feather': '.feather'}
+
+
+def format_from_path(path):
+    """Infer the output format from a file extension"""
+    ext = os.path.splitext(path)[1].lower()
+    for fmt, fmt_ext in FORMATS.items():
+        if ext == fmt_ext:
+            return fmt
+    raise ValueError(f"Unsupported output extension '{ext}' (expected one of {', '.join(FORMATS.values())})")
+
+
+def write_dataset(path, chunks, fmt=None):
+    """Stream frames to CSV, Parquet or Arrow IPC; returns rows written
+
+    For CSV, chunks may also be pre-encoded text from `iter_chunks(as_csv=True)`.
+    """
+    fmt = fmt or format_from_path(path)
+    rows = 0
+
+    if fmt == 'csv':
+        with open(path, 'w', newline='') as f:
+            for i, chunk in enumerate(chunks):
+                if isinstance(chunk, str):
+                    f.write(chunk)
+                    rows += chunk.count('\n') - (i == 0)
+                else:
+                    chunk.to_csv(f, index=False, header=(i == 0))
+                    rows += len(chunk)
+        return rows
+
+    import pyarrow as pa
+
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                if fmt == 'parquet':
+                    import pyarrow.parquet as pq
+                    writer = pq.ParquetWriter(path, table.schema)
+                elif fmt in ('arrow', 'feather'):
+                    writer = pa.ipc.new_file(path, table.schema)
+                else:
+                    raise ValueError(f"Unsupported format '{fmt}'")
+            writer.write_table(table)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
@@ -0,0 +1,229 @@
+"""
+Trade-level drill-down store: the cleaned trade log in an embedded SQLite file.
+
+Daily aggregates drop the individual trades. This store keeps them on disk,
+clustered by time: a `WITHOUT ROWID` table whose primary key is
+`(ts, seq)`, so one day's trades are a contiguous index range. A secondary
+index on `(symbol, ts)` serves per-symbol drill-downs the same way. Fetching
+a page of a day's trades is a range scan that touches only those rows,
+instead of re-reading and filtering the raw upload.
+
+Stores are built once per dataset, into a temporary file renamed into place,
+and reused across sessions and restarts. Only the `MAX_STORES` most recently
+used are kept: queries refresh a store's mtime, and stores held open by this
+process are never pruned.
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+import uuid
+import weakref
+
+import numpy as np
+import pandas as pd
+
+STORE_DIR = os.getenv("MARKETMIND_TRADE_STORE_DIR", os.path.join("data", "trade_store"))
+MAX_STORES = 8
+PAGE_SIZE = 100
+INSERT_CHUNK = 50_000
+SCHEMA_VERSION = 1
+TOUCH_SECONDS = 60  # refresh a store's "recently used" mtime at most this often
+
+_open_stores = weakref.WeakSet()  # TradeStore objects alive in this process
+
+SCHEMA = """
+CREATE TABLE trades (
+    ts INTEGER NOT NULL,          -- nanoseconds since the epoch (naive UTC)
+    seq INTEGER NOT NULL,         -- load order, breaks ties between trades in the same instant
+    symbol TEXT,
+    trader_type TEXT,
+    closedPnL REAL,
+    leverage REAL,
+    size REAL,
+    PRIMARY KEY (ts, seq)
+) WITHOUT ROWID;
+"""
+# Created after the bulk load, which is faster than maintaining it row by row
+INDEXES = "CREATE INDEX trades_symbol_ts ON trades (symbol, ts);"
+COLUMNS = ['ts', 'seq', 'symbol', 'trader_type', 'closedPnL', 'leverage', 'size']
+
+
+def store_path(dataset_key, directory=STORE_DIR):
+    """File for a dataset's store, named by a hash of its cache key"""
+    digest = hashlib.sha256(repr(dataset_key).encode()).hexdigest()[:24]
+    return os.path.join(directory, f"trades-{digest}.sqlite")
+
+
+def _text_column(df, name):
+    if name not in df.columns:
+        return [None] * len(df)
+    return df[name].astype(object).where(df[name].notna(), None).tolist()
+
+
+def build_store(trader_df, path):
+    """Write the cleaned trades in `trader_df` to a new store at `path`; returns rows written"""
+    df = trader_df.dropna(subset=['time'])
+    ts = df['time'].to_numpy(dtype='datetime64[ns]').astype(np.int64)
+    order = np.argsort(ts, kind='stable')
+    ts = ts[order]
+    df = df.iloc[order]
+    rows = zip(
+        ts.tolist(), range(len(ts)),
+        _text_column(df, 'symbol'), _text_column(df, 'trader_type'),
+        df['closedPnL'].tolist(), df['leverage'].tolist(), df['size'].tolist(),
+    )
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp-{uuid.uuid4().hex}"
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.executescript(SCHEMA)
+        insert = f"INSERT INTO trades VALUES ({', '.join('?' * len(COLUMNS))})"
+        while True:
+            chunk = [row for _, row in zip(range(INSERT_CHUNK), rows)]
+            if not chunk:
+                break
+            conn.executemany(insert, chunk)
+        conn.executescript(INDEXES)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, path)
+    return len(ts)
+
+
+def prune_stores(directory=STORE_DIR, keep=MAX_STORES):
+    """Delete all but the `keep` most recently used stores in `directory`, sparing those open in this process"""
+    if not os.path.isdir(directory):
+        return
+    in_use = {os.path.abspath(store.path) for store in list(_open_stores)}
+    stores = sorted(
+        (os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".sqlite")),
+        key=os.path.getmtime,
+        reverse=True,
+    )
+    for path in stores[keep:]:
+        if os.path.abspath(path) in in_use:
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class TradeStore:
+    """Read-only access to a built store; safe to share between threads"""
+
+    def __init__(self, path):
+        self.path = path
+        self._symbols = None
+        self._touched = 0.0
+        _open_stores.add(self)
+
+    @classmethod
+    def open_or_build(cls, trader_df, dataset_key, directory=STORE_DIR):
+        """The store for `dataset_key`, building it from `trader_df` the first time"""
+        path = store_path(dataset_key, directory)
+        store = cls(path)
+        if not store.is_built():
+            build_store(trader_df, path)
+            prune_stores(directory)
+        store._touch(force=True)
+        return store
+
+    def _touch(self, force=False):
+        """Mark the store most recently used, so pruning in other processes spares it"""
+        now = time.time()
+        if force or now - self._touched >= TOUCH_SECONDS:
+            try:
+                os.utime(self.path)
+                self._touched = now
+            except OSError:
+                pass
+
+    def _connect(self):
+        # One short-lived read-only connection per query keeps sessions' threads independent
+        self._touch()
+        return sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+
+    def is_built(self):
+        if not os.path.exists(self.path):
+            return False
+        try:
+            conn = self._connect()
+            try:
+                return conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return False
+
+    @staticmethod
+    def _day_bounds(day):
+        start = pd.Timestamp(day).normalize()
+        return start.value, (start + pd.Timedelta(days=1)).value
+
+    def _where(self, day, symbol):
+        lo, hi = self._day_bounds(day)
+        if symbol is None:
+            return "ts >= ? AND ts < ?", [lo, hi]
+        return "symbol = ? AND ts >= ? AND ts < ?", [symbol, lo, hi]
+
+    def count_day(self, day, symbol=None):
+        """Number of trades on `day` (optionally for one symbol)"""
+        where, params = self._where(day, symbol)
+        conn = self._connect()
+        try:
+            return conn.execute(f"SELECT COUNT(*) FROM trades WHERE {where}", params).fetchone()[0]
+        finally:
+            conn.close()
+
+    def symbols(self):
+        """Distinct symbols in the store (read once, then remembered)"""
+        if self._symbols is None:
+            conn = self._connect()
+            try:
+                rows = conn.execute("SELECT DISTINCT symbol FROM trades WHERE symbol IS NOT NULL ORDER BY symbol")
+                self._symbols = [row[0] for row in rows]
+            finally:
+                conn.close()
+        return self._symbols
+
+    def fetch_day(self, day, symbol=None, page=0, page_size=PAGE_SIZE):
+        """Page `page` (0-based) of `day`'s trades in time order
+
+        Returns `(frame, seconds)`: the trades with a `time` column, and how
+        long the index range scan took.
+        """
+        where, params = self._where(day, symbol)
+        start = time.perf_counter()
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM trades WHERE {where} ORDER BY ts, seq LIMIT ? OFFSET ?",
+                params + [page_size, page * page_size],
+            ).fetchall()
+        finally:
+            conn.close()
+        elapsed = time.perf_counter() - start
+
+        df = pd.DataFrame(rows, columns=COLUMNS)
+        df.insert(0, 'time', pd.to_datetime(df['ts'], unit='ns'))
+        return df.drop(columns=['ts', 'seq']), elapsed
+
+    def query_plan(self, day, symbol=None):
+        """SQLite's plan for a day fetch, to check it is an index range scan"""
+        where, params = self._where(day, symbol)
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                f"EXPLAIN QUERY PLAN SELECT * FROM trades WHERE {where} ORDER BY ts, seq LIMIT 1", params
+            ).fetchall()
+            return [row[-1] for row in rows]
+        finally:
+            conn.close()